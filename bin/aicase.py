@@ -39,6 +39,10 @@ AI Summary Features:
     
     If AI Toolkit is unavailable, falls back to a structured summary without AI.
 
+Run Metrics:
+    With [settings] enabled = true in ta_gen_ai_cim_perf.conf, each run
+    writes its stage timings and case-status counts to ta_gen_ai_cim_perf.log.
+
 Copyright 2026 Splunk Inc.
 Licensed under Apache License 2.0
 """
@@ -55,19 +59,18 @@ lib_path = os.path.join(app_root, 'lib')
 if lib_path not in sys.path:
     sys.path.insert(0, lib_path)
 
-# Shared ServiceNow client (config, OAuth, HTTP) lives in sync_snow_asset.py
+# Shared ServiceNow client (config, OAuth, HTTP) lives in sync_snow_asset.py.
+# It is imported on first use: importing it configures a log file handler
+# and loads csv/gzip/urllib, which is wasted on records that never reach
+# ServiceNow.
 bin_path = os.path.dirname(os.path.abspath(__file__))
 if bin_path not in sys.path:
     sys.path.insert(0, bin_path)
 
-from sync_snow_asset import (
-    get_snow_config as _shared_get_snow_config,
-    make_snow_request as _shared_make_snow_request,
-)
-
 # Splunk SDK imports
 from splunklib.searchcommands import dispatch, StreamingCommand, Configuration, Option, validators
-import splunklib.client as client
+from ta_gen_ai_cim_splunkd import connect as splunkd_connect
+import ta_gen_ai_cim_perf as perf
 
 
 @Configuration()
@@ -127,12 +130,34 @@ class AICaseCommand(StreamingCommand):
         validate=validators.Boolean()
     )
     
+    # Event fields read by stream(), in lookup order
+    _EVENT_ID_FIELDS = ('gen_ai.event.id', 'gen_ai_event_id', 'event_id')
+    _SERVICE_NAME_FIELDS = ('gen_ai.service.name', 'gen_ai.app.name', 'service_name', 'service.name')
+
     def __init__(self):
         super(AICaseCommand, self).__init__()
         self._snow_config = None
         self._kv_store = None
         self._service = None
+        # Run metrics (ta_gen_ai_cim_perf.conf); a no-op unless enabled
+        self._perf = perf.start_run('aicase')
         
+    def prepare(self):
+        """Declare the command's input fields during getinfo.
+
+        Only the fields stream() reads are shipped through the chunked
+        protocol: the event ID fields (unless event_id= overrides them) and,
+        for mode=create, the service name fields. Case details are fetched
+        separately by _fetch_event_details.
+        """
+        self._perf.set('mode', self.mode)
+        fields = ['_time']
+        if self.event_id is None:
+            fields.extend(self._EVENT_ID_FIELDS)
+        if self.mode == 'create':
+            fields.extend(self._SERVICE_NAME_FIELDS)
+        self.configuration.required_fields = fields
+
     def _get_service(self):
         """Get Splunk service connection.
 
@@ -144,15 +169,8 @@ class AICaseCommand(StreamingCommand):
         """
         if self._service is None:
             searchinfo = self.metadata.searchinfo
-            uri = urlsplit(searchinfo.splunkd_uri, allow_fragments=False)
-            self._service = client.connect(
-                scheme=uri.scheme,
-                host=uri.hostname,
-                port=uri.port,
-                token=searchinfo.session_key,
-                owner='nobody',
-                app='TA-gen_ai_cim'
-            )
+            self._service = splunkd_connect(
+                searchinfo.session_key, searchinfo.splunkd_uri)
         return self._service
     
     def _get_snow_config(self):
@@ -163,6 +181,7 @@ class AICaseCommand(StreamingCommand):
             return self._snow_config
 
         try:
+            from sync_snow_asset import get_snow_config as _shared_get_snow_config
             service = self._get_service()
             self._snow_config = _shared_get_snow_config(None, service=service)
         except Exception as e:
@@ -217,6 +236,7 @@ class AICaseCommand(StreamingCommand):
     
     def _make_snow_request(self, method, url, data=None, config=None):
         """Make HTTP request to ServiceNow via the shared client."""
+        from sync_snow_asset import make_snow_request as _shared_make_snow_request
         if config is None:
             config = self._get_snow_config()
         return _shared_make_snow_request(method, url, data=data, config=config)
@@ -308,14 +328,18 @@ class AICaseCommand(StreamingCommand):
                 'count': 1
             }
             
+            from splunklib.results import StreamingJSONResultsReader, Message
             search_results = service.jobs.oneshot(search_query, **kwargs_oneshot)
 
-            # Parse JSON results
-            results_data = search_results.read().decode('utf-8')
-            results_json = json.loads(results_data)
+            # Decode the JSON results incrementally and keep the first row
+            event = None
+            for item in StreamingJSONResultsReader(search_results):
+                if isinstance(item, Message):
+                    self.logger.debug("Event details search message: {}".format(item))
+                elif event is None:
+                    event = item
             
-            if results_json.get('results') and len(results_json['results']) > 0:
-                event = results_json['results'][0]
+            if event:
                 self.logger.info("Fetched aggregated event details for event_id={}".format(event_id))
                 return event
             else:
@@ -491,22 +515,27 @@ class AICaseCommand(StreamingCommand):
                 time.sleep(0.5)
             
             # Get results
+            from splunklib.results import StreamingJSONResultsReader, Message
             results_stream = job.results(output_mode='json', count=10)
-            results_data = results_stream.read().decode('utf-8')
+            result_row = None
+            messages = []
+            for item in StreamingJSONResultsReader(results_stream):
+                if isinstance(item, Message):
+                    messages.append(item)
+                elif result_row is None:
+                    result_row = item
             
             # Clean up job
             job.cancel()
             
             self.logger.info("AI Toolkit search completed, parsing results")
-            results_json = json.loads(results_data)
             
             # Raw results carry prompt/response content (potential PII) —
             # log at debug only.
-            self.logger.debug("AI Toolkit raw results (first 500 chars): {}".format(results_data[:500] if len(results_data) > 500 else results_data))
+            self.logger.debug("AI Toolkit first result row: {}".format(result_row))
             
-            if results_json.get('results') and len(results_json['results']) > 0:
+            if result_row:
                 # The | ai command outputs to ai_result_1 field
-                result_row = results_json['results'][0]
                 self.logger.info("AI Toolkit result keys: {}".format(list(result_row.keys())))
                 response = result_row.get('ai_result_1', '')
                 if response:
@@ -520,7 +549,7 @@ class AICaseCommand(StreamingCommand):
                     # Log all keys and values for debugging
                     self.logger.debug("AI Toolkit result row contents: {}".format(result_row))
             else:
-                self.logger.warning("AI Toolkit returned no results. Full response: {}".format(results_data))
+                self.logger.warning("AI Toolkit returned no results. Search messages: {}".format(messages))
             
             self.logger.warning("AI Toolkit returned empty response for event_id={}".format(event_id))
             return None
@@ -704,16 +733,16 @@ class AICaseCommand(StreamingCommand):
         """Process each record through the command"""
         
         # Get ServiceNow config once
-        snow_config = self._get_snow_config()
+        with self._perf.stage('config_load'):
+            snow_config = self._get_snow_config()
         
         for record in records:
+            self._perf.incr('records')
             # Get event_id from parameter override or event field
             evt_id = self.event_id
             if evt_id is None:
                 # Try multiple field name formats
-                evt_id = record.get('gen_ai.event.id') or \
-                         record.get('gen_ai_event_id') or \
-                         record.get('event_id')
+                evt_id = next((record.get(f) for f in self._EVENT_ID_FIELDS if record.get(f)), None)
             
             # Initialize output fields
             record['snow_case_url'] = ''
@@ -725,6 +754,7 @@ class AICaseCommand(StreamingCommand):
             if not evt_id:
                 record['snow_case_status'] = 'error'
                 record['snow_case_message'] = 'No gen_ai.event.id found in event'
+                self._perf.incr('status_error')
                 yield record
                 continue
             
@@ -732,6 +762,7 @@ class AICaseCommand(StreamingCommand):
             if not snow_config.get('configured'):
                 record['snow_case_status'] = 'error'
                 record['snow_case_message'] = snow_config.get('error', 'ServiceNow not configured')
+                self._perf.incr('status_error')
                 yield record
                 continue
             
@@ -740,7 +771,8 @@ class AICaseCommand(StreamingCommand):
                 # abort this record: treating it as "no case" would create a
                 # duplicate ServiceNow case on every KV Store hiccup.
                 try:
-                    existing = self._get_kv_store_record(evt_id)
+                    with self._perf.stage('kv'):
+                        existing = self._get_kv_store_record(evt_id)
                 except Exception as e:
                     self.logger.error(
                         "KV Store lookup failed for event_id={}; not creating a "
@@ -748,6 +780,7 @@ class AICaseCommand(StreamingCommand):
                     record['snow_case_status'] = 'error'
                     record['snow_case_message'] = \
                         'KV Store lookup failed; case not created: {}'.format(str(e))
+                    self._perf.incr('status_error')
                     yield record
                     continue
 
@@ -776,17 +809,17 @@ class AICaseCommand(StreamingCommand):
                 else:
                     # Create new case (mode=create)
                     # Get service name from record
-                    service_name = record.get('gen_ai.service.name') or \
-                                   record.get('gen_ai.app.name') or \
-                                   record.get('service_name') or \
-                                   record.get('service.name')
+                    service_name = next(
+                        (record.get(f) for f in self._SERVICE_NAME_FIELDS if record.get(f)), None)
                     
                     # Fetch full event details and generate AI summary
-                    event_details = self._fetch_event_details(evt_id)
+                    with self._perf.stage('search'):
+                        event_details = self._fetch_event_details(evt_id)
                     
                     ai_summary = None
                     if self.include_summary:
-                        ai_summary = self._generate_ai_summary(event_details, evt_id)
+                        with self._perf.stage('summary'):
+                            ai_summary = self._generate_ai_summary(event_details, evt_id)
                         self.logger.info("Generated AI summary for event_id={}".format(evt_id))
                     
                     case_result = self._create_snow_case(
@@ -802,12 +835,13 @@ class AICaseCommand(StreamingCommand):
                         case_number = case_result.get('number', case_result.get('short_description', ''))
                         
                         # Save mapping to KV Store
-                        self._save_kv_store_record(
-                            evt_id,
-                            sys_id,
-                            snow_config['instance'],
-                            snow_config['username']
-                        )
+                        with self._perf.stage('kv'):
+                            self._save_kv_store_record(
+                                evt_id,
+                                sys_id,
+                                snow_config['instance'],
+                                snow_config['username']
+                            )
                         
                         record['snow_case_url'] = self._get_case_url(sys_id, snow_config['instance'])
                         record['snow_case_sys_id'] = sys_id
@@ -823,8 +857,12 @@ class AICaseCommand(StreamingCommand):
                 record['snow_case_message'] = str(e)
                 self.logger.error("aicase command error: {}".format(str(e)))
             
+            self._perf.incr('status_{}'.format(record['snow_case_status'] or 'none'))
             yield record
 
+        if getattr(self, '_finished', False):
+            self._perf.finish()
+
 
 # Entry point
 if __name__ == '__main__':
@@ -32,9 +32,10 @@ from sync_snow_asset import (
     setup_logging,
     get_snow_config as _get_account_config,
     make_snow_request,
+    log_run_summary,
 )
-
-import splunklib.client as client
+from ta_gen_ai_cim_splunkd import connect as splunkd_connect
+import ta_gen_ai_cim_perf as perf
 
 
 APP_NAME = 'TA-gen_ai_cim'
@@ -59,9 +60,10 @@ def check_existing_case(service, event_id):
     is indistinguishable from "no case exists", and proceeding would create
     a duplicate ServiceNow case. Callers must abort on exception.
     """
-    collection = service.kvstore[KV_COLLECTION]
-    query = json.dumps({'event_id': event_id})
-    results = collection.data.query(query=query)
+    with perf.stage('kv'):
+        collection = service.kvstore[KV_COLLECTION]
+        query = json.dumps({'event_id': event_id})
+        results = collection.data.query(query=query)
 
     if results and len(results) > 0:
         return results[0]
@@ -71,20 +73,21 @@ def check_existing_case(service, event_id):
 def save_case_mapping(service, event_id, sys_id, sn_instance, username):
     """Save case mapping to KV Store"""
     try:
-        collection = service.kvstore[KV_COLLECTION]
-        now_epoch = int(time.time())
+        with perf.stage('kv'):
+            collection = service.kvstore[KV_COLLECTION]
+            now_epoch = int(time.time())
         
-        record = {
-            'event_id': event_id,
-            'sys_id': sys_id,
-            'sn_instance': sn_instance,
-            'created_at': now_epoch,
-            'updated_at': now_epoch,
-            'created_by': username
-        }
+            record = {
+                'event_id': event_id,
+                'sys_id': sys_id,
+                'sn_instance': sn_instance,
+                'created_at': now_epoch,
+                'updated_at': now_epoch,
+                'created_by': username
+            }
         
-        collection.data.insert(json.dumps(record))
-        return True
+            collection.data.insert(json.dumps(record))
+            return True
     except Exception:
         return False
 
@@ -157,7 +160,8 @@ def main():
         print(json.dumps({'success': False, 'message': 'No session key available'}))
         sys.exit(1)
 
-    snow_config, error = get_snow_config(session_key)
+    with perf.stage('config_load'):
+        snow_config, error = get_snow_config(session_key)
     if error:
         logger.error("ServiceNow config error: {}".format(error))
         print(json.dumps({'success': False, 'message': 'ServiceNow configuration error: {}'.format(error)}))
@@ -166,7 +170,7 @@ def main():
     logger.info("ServiceNow configured - instance: {}".format(snow_config.get('instance')))
 
     try:
-        service = client.connect(token=session_key, owner='nobody', app=APP_NAME)
+        service = splunkd_connect(session_key, app=APP_NAME)
     except Exception as e:
         logger.error("Splunk connection error: {}".format(str(e)))
         print(json.dumps({'success': False, 'message': 'Splunk connection error: {}'.format(str(e))}))
@@ -189,6 +193,7 @@ def main():
             'success': True, 'status': 'existing',
             'message': 'Existing case found for event_id={}'.format(event_id),
             'case_url': case_url, 'sys_id': existing.get('sys_id')}))
+        perf.incr('existing')
         sys.exit(0)
 
     result, error = create_snow_case(snow_config, event_id, case_description)
@@ -204,6 +209,7 @@ def main():
         case_url = 'https://{}.service-now.com/{}.do?sys_id={}'.format(
             snow_config['instance'], SNOW_TABLE, sys_id)
         logger.info("Case created for event_id={}: sys_id={}".format(event_id, sys_id))
+        perf.incr('created')
         print(json.dumps({
             'success': True, 'status': 'created',
             'message': 'New case created for event_id={}'.format(event_id),
@@ -216,4 +222,8 @@ def main():
 
 
 if __name__ == '__main__':
-    main()
+    with perf.run('create_snow_case'):
+        try:
+            main()
+        finally:
+            log_run_summary(logger)
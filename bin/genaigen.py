@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# encoding=utf-8
+"""
+genaigen.py - Generating command for synthetic GenAI telemetry
+
+Emits seeded, deterministic synthetic inference events from every provider
+shape the TA normalizes (Anthropic, OpenAI, Bedrock, Vertex AI, Azure flat
+JSON and the nested internal medadvice format), with a controllable share
+of PII and prompt-injection content, for load-testing genaiscore, the
+escalation searches and the cost dashboards. Generation is delegated to
+ta_gen_ai_cim_telemetry.py, which streams events with constant memory.
+
+Usage:
+    | genaigen count=<n> [seed=<int>] [pii_rate=<0-1>] [injection_rate=<0-1>]
+        [error_rate=<0-1>] [providers=<csv>] [interval=<seconds>] [message_shape=<shape>]
+
+Parameters:
+    count          - Required. Number of events to generate
+    seed           - Optional. RNG seed (default: 1)
+    pii_rate       - Optional. Fraction of prompts with synthetic PII (default: 0.1)
+    injection_rate - Optional. Fraction of prompt-injection attempts (default: 0.02)
+    error_rate     - Optional. Fraction of failed requests (default: 0.01)
+    providers      - Optional. Comma-separated subset of anthropic, openai,
+                     bedrock, vertexai, azure, internal (default: all)
+    interval       - Optional. Mean seconds between events; the last event
+                     is at about now (default: 1)
+    message_shape  - Optional. mixed (default), objects, strings or string
+
+Output Fields:
+    _time, _raw (event JSON), sourcetype (genai:synthetic:json or
+    medadvice:json), source (genai_synthetic). Index the results with
+    | collect index=gen_ai_log output_format=hec so the per-event
+    sourcetype is kept and the index and sourcetype props normalize them.
+
+Copyright 2026 Splunk Inc.
+Licensed under Apache License 2.0
+"""
+
+import os
+import sys
+import json
+
+# Add Splunk SDK paths - use lib directory in this app
+app_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+lib_path = os.path.join(app_root, 'lib')
+if lib_path not in sys.path:
+    sys.path.insert(0, lib_path)
+
+bin_path = os.path.dirname(os.path.abspath(__file__))
+if bin_path not in sys.path:
+    sys.path.insert(0, bin_path)
+
+# Splunk SDK imports
+from splunklib.searchcommands import dispatch, GeneratingCommand, Configuration, Option, validators
+from ta_gen_ai_cim_telemetry import generate_events, PROVIDERS, SOURCE
+
+
+@Configuration()
+class GenAIGenCommand(GeneratingCommand):
+    """
+    Generating command that emits synthetic multi-provider GenAI telemetry.
+
+    ##Syntax
+
+    | genaigen count=<n> [seed=<int>] [pii_rate=<0-1>] [injection_rate=<0-1>]
+
+    ##Description
+
+    Generates count seeded synthetic inference events. The same seed and
+    options produce the same event content; timestamps end at about now.
+
+    ##Examples
+
+    Preview 100 events:
+    | genaigen count=100
+
+    Index a load-test data set:
+    | genaigen count=100000 seed=42 pii_rate=0.2 injection_rate=0.05
+    | collect index=gen_ai_log output_format=hec
+
+    OpenAI and Anthropic only, with string message arrays:
+    | genaigen count=1000 providers="openai,anthropic" message_shape=strings
+    """
+
+    count = Option(
+        doc='''
+        **Syntax:** **count=***<int>*
+        **Description:** Number of events to generate''',
+        require=True,
+        validate=validators.Integer(1)
+    )
+
+    seed = Option(
+        doc='''
+        **Syntax:** **seed=***<int>*
+        **Description:** RNG seed; the same seed gives the same events (default: 1)''',
+        require=False,
+        default=1,
+        validate=validators.Integer()
+    )
+
+    pii_rate = Option(
+        doc='''
+        **Syntax:** **pii_rate=***<float>*
+        **Description:** Fraction of prompts containing synthetic PII, 0-1 (default: 0.1)''',
+        require=False,
+        default=0.1,
+        validate=validators.Float(0.0, 1.0)
+    )
+
+    injection_rate = Option(
+        doc='''
+        **Syntax:** **injection_rate=***<float>*
+        **Description:** Fraction of prompt-injection attempts, 0-1 (default: 0.02)''',
+        require=False,
+        default=0.02,
+        validate=validators.Float(0.0, 1.0)
+    )
+
+    error_rate = Option(
+        doc='''
+        **Syntax:** **error_rate=***<float>*
+        **Description:** Fraction of failed requests, 0-1 (default: 0.01)''',
+        require=False,
+        default=0.01,
+        validate=validators.Float(0.0, 1.0)
+    )
+
+    providers = Option(
+        doc='''
+        **Syntax:** **providers=***<csv>*
+        **Description:** Comma-separated subset of anthropic, openai, bedrock, vertexai, azure, internal''',
+        require=False,
+        default=None
+    )
+
+    interval = Option(
+        doc='''
+        **Syntax:** **interval=***<float>*
+        **Description:** Mean seconds between events (default: 1)''',
+        require=False,
+        default=1.0,
+        validate=validators.Float(0.0)
+    )
+
+    message_shape = Option(
+        doc='''
+        **Syntax:** **message_shape=***<mixed|objects|strings|string>*
+        **Description:** input_messages/output_messages shape for flat events (default: mixed)''',
+        require=False,
+        default='mixed',
+        validate=validators.Set('mixed', 'objects', 'strings', 'string')
+    )
+
+    def generate(self):
+        providers = None
+        if self.providers:
+            providers = [p.strip().lower() for p in self.providers.split(',') if p.strip()]
+            unknown = [p for p in providers if p not in PROVIDERS]
+            if unknown:
+                self.write_error('Unknown provider(s): {}. Valid: {}'.format(
+                    ', '.join(unknown), ', '.join(PROVIDERS)))
+                return
+
+        for sourcetype, event_time, event in generate_events(
+                self.count, self.seed, self.pii_rate, self.injection_rate, self.error_rate,
+                providers, None, self.interval, self.message_shape):
+            yield {
+                '_time': round(event_time, 3),
+                '_raw': json.dumps(event, separators=(',', ':')),
+                'sourcetype': sourcetype,
+                'source': SOURCE,
+            }
+
+
+if __name__ == '__main__':
+    dispatch(GenAIGenCommand, sys.argv, sys.stdin, sys.stdout, __name__)
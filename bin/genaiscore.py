@@ -9,13 +9,21 @@ configured in Splunk AI Toolkit's Connection Management, parses the
 structured JSON response, and enriches events with scoring fields.
 
 The LLM is called directly via HTTP rather than through a sub-search,
-which avoids SPL string-escaping issues with event data.
+which avoids SPL string-escaping issues with event data. Requests run on an
+asyncio event loop inside each chunk's stream() call, up to the pipeline's
+max_concurrency at a time.
 
 Usage:
-    | genaiscore pipeline=pipeline_1
+    | genaiscore pipeline=pipeline_1 [checkpoint=<bool>] [time_budget=<seconds>]
 
 Parameters:
-    pipeline - Required. The pipeline stanza name (pipeline_1 through pipeline_10)
+    pipeline   - Required. The pipeline stanza name (pipeline_1 through pipeline_10)
+    checkpoint - Optional. Skip events an earlier run handled and commit the
+                 pipeline's _indextime watermark when the run finishes
+                 (default: false; see Checkpoints below)
+    time_budget - Optional. Seconds from the command's start after which no
+                 further LLM calls are made; events are scored highest
+                 priority first (default: no limit; see Time Budget below)
 
 Output Fields (where <name> is the pipeline name from config):
     gen_ai.<name>.risk_score       - Float 0.0-1.0, risk probability
@@ -23,9 +31,34 @@ Output Fields (where <name> is the pipeline name from config):
     gen_ai.<name>.confidence       - very_high, high, medium, low, very_low
     gen_ai.<name>.explanation      - LLM reasoning text
     gen_ai.<name>.types            - Multi-value list of detected sub-types
-    genai_scoring_status           - "success" or "error"
+    genai_scoring_status           - "success", "error", "duplicate"
+                                     (checkpoint=true: handled by an earlier run)
+                                     or "deferred" (time_budget: not scored
+                                     before the budget ran out)
     genai_scoring_pipeline         - Pipeline name for downstream filtering
     genai_scoring_error            - Error message if status is "error"
+    genai_scoring_reused_from      - gen_ai.event.id whose score was reused
+                                     (near-duplicate reuse only)
+    genai_scoring_similarity       - Estimated similarity to that event
+    genai_scoring_gate             - passed, sampled or skipped (pipelines
+                                     with a cheap-score gate only)
+    genai_scoring_gate_score       - Value of the pipeline's gate_field
+    genai_scoring_priority         - Priority the event was ordered by
+                                     (time_budget only)
+    genai_scoring_connection       - AI Toolkit connection whose score was used
+                                     (pipelines with a connections list only)
+    genai_scoring_latency_ms       - Duration of the LLM call, milliseconds
+    genai_scoring_input_tokens     - Prompt tokens reported by the provider
+    genai_scoring_cached_input_tokens - Of those, tokens read from the
+                                     provider's prompt cache
+    genai_scoring_output_tokens    - Completion tokens reported by the provider
+    genai_scoring_provider         - Provider, as a gen_ai.provider.name value
+    genai_scoring_model            - Model that answered (as reported by the
+                                     provider)
+    genai_scoring_request_model    - Model requested from the connection
+    genai_scoring_request_id       - Provider request id, for support cases
+                                     (the eight fields above: LLM-scored
+                                     events only)
 
 Prerequisites:
     - Splunk AI Toolkit (ML Toolkit) must be installed
@@ -36,6 +69,55 @@ Prerequisites:
 Supported LLM Providers:
     OpenAI, Azure OpenAI, Groq, Ollama, Anthropic, Gemini
 
+Structured Output:
+    With structured_output = true (default) in [settings], the scoring
+    JSON schema (SCORE_SCHEMA) is sent as the provider's native output
+    constraint: response_format json_schema (OpenAI, Ollama, Azure OpenAI
+    api-version 2024-08-01 or later; json_object before), a forced tool
+    call (Anthropic) or responseSchema (Gemini). A connection that rejects
+    it with HTTP 400 is retried once and then used without it for the rest
+    of the process. Replies and parse failures are counted per provider.
+
+Pipeline Overrides:
+    A pipeline stanza may set model, max_tokens, temperature and timeout;
+    each replaces the connection's value for that pipeline's requests
+    (see _parse_llm_overrides).
+
+Prompt Caching:
+    With prompt_cache = true (default) in [settings], the system prompt and
+    SCORING TASK text every request starts with are sent in a cacheable
+    layout: Anthropic cache_control breakpoints, an OpenAI prompt_cache_key
+    (api.openai.com), or a Gemini cachedContents resource kept alive for
+    prompt_cache_ttl seconds (ta_gen_ai_cim_prompt_cache.py). OpenAI,
+    Azure OpenAI and Groq cache the unchanged prefix automatically. Cache
+    reads are reported per event (genai_scoring_cached_input_tokens) and
+    per run.
+
+Checkpoints:
+    The scheduled pipeline searches select events by _indextime: a
+    genaiwatermark subsearch returns the window indexed since the
+    pipeline's watermark in the gen_ai_scoring_checkpoint KV Store
+    collection, and checkpoint=true skips events handled within the
+    overlap and commits the window when the last chunk has been scored
+    (ta_gen_ai_cim_checkpoint.py). The command then runs on the search
+    head only. Failed events hold the watermark for retry_window seconds;
+    a cancelled run commits nothing.
+
+Time Budget:
+    With time_budget=<seconds>, the records of each chunk are returned in
+    priority order: the weighted sum of the pipeline's priority_fields
+    (by default the PII and prompt-injection ML scores and the guardrail
+    and safety flags; see _parse_priority_fields). LLM calls are started
+    highest priority first until time_budget seconds after the command
+    started; later events, and requests still in flight at that point,
+    are emitted with genai_scoring_status=deferred. With checkpoint=true a
+    deferred event holds the watermark, so the next run scores it.
+
+Run Metrics:
+    With [settings] enabled = true in ta_gen_ai_cim_perf.conf, each run
+    writes its stage timings and counters to ta_gen_ai_cim_perf.log
+    (see ta_gen_ai_cim_perf.py).
+
 Copyright 2026 Splunk Inc.
 Licensed under Apache License 2.0
 """
@@ -45,46 +127,47 @@ import os
 import sys
 import json
 import re
-import ssl
 import logging
+import random
+import signal
 import time
+import zlib
+from collections import deque
 from datetime import datetime, timezone
-from urllib.parse import urlsplit
 
 app_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
-# Splunk Cloud / AppInspect: app directory is read-only at runtime, so logs
-# must be written to $SPLUNK_HOME/var/log/splunk/. Fall back to a temp dir if
-# SPLUNK_HOME is not set (e.g., unit-test invocation outside Splunk).
-_splunk_home = os.environ.get('SPLUNK_HOME')
-if _splunk_home:
-    _log_dir = os.path.join(_splunk_home, 'var', 'log', 'splunk')
-else:
-    import tempfile
-    _log_dir = tempfile.gettempdir()
+lib_path = os.path.join(app_root, 'lib')
+if lib_path not in sys.path:
+    sys.path.insert(0, lib_path)
+
+bin_path = os.path.dirname(os.path.abspath(__file__))
+if bin_path not in sys.path:
+    sys.path.insert(0, bin_path)
+
+from splunklib.searchcommands import dispatch, StreamingCommand, Configuration, Option, validators
+from ta_gen_ai_cim_splunkd import connect as splunkd_connect
+from ta_gen_ai_cim_credentials import get_lookup_stats, get_password
+import ta_gen_ai_cim_perf as perf
+from ta_gen_ai_cim_logging import LogSampler, log_dir, setup_logger
+from ta_gen_ai_cim_prompt_cache import GeminiContextCache, prefix_hash
 
+# Splunk Cloud / AppInspect: app directory is read-only at runtime, so logs
+# must be written to $SPLUNK_HOME/var/log/splunk/ (a temp dir if SPLUNK_HOME
+# is not set, e.g. when run outside Splunk).
 try:
-    os.makedirs(_log_dir, exist_ok=True)
+    os.makedirs(log_dir(), exist_ok=True)
 except OSError:
     pass
 
-debug_log_path = os.path.join(_log_dir, 'genaiscore.log')
-debug_logger = logging.getLogger('genaiscore_debug')
 # Default to INFO: prompt/response/event content is only logged at DEBUG,
 # which is opt-in via debug_logging = true in ta_gen_ai_cim_genai_scoring.conf
 # [settings] (this TA scores events that may contain PII/PHI — content must
 # not land in plaintext logs unless an admin explicitly asks for it).
-debug_logger.setLevel(logging.INFO)
-_fh = logging.FileHandler(debug_log_path)
-_fh.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
-debug_logger.addHandler(_fh)
-
-lib_path = os.path.join(app_root, 'lib')
-if lib_path not in sys.path:
-    sys.path.insert(0, lib_path)
-
-from splunklib.searchcommands import dispatch, StreamingCommand, Configuration, Option, validators
-import splunklib.client as client
+# Records are written by a background thread (ta_gen_ai_cim_logging.py) that
+# starts with the first record, so neither the event loop nor process
+# startup waits on the log file.
+debug_logger = setup_logger('genaiscore_debug', os.path.join(log_dir(), 'genaiscore.log'))
 
 MLTK_APP = 'Splunk_ML_Toolkit'
 # Legacy AI Toolkit schema (older MLTK versions).
@@ -94,6 +177,40 @@ SECRET_REALM = 'mltk_llm_tokens'
 AITK_LLM_CONNECTION_COLLECTION = 'aitk_llm_connection'
 AITK_DEFAULT_LLM_MAPPING_COLLECTION = 'aitk_llm_default_mappings'
 AITK_SECRET_REALM = 'aitk_llm_secrets'
+# The scoring object every pipeline returns (see _parse_llm_response), as a
+# JSON Schema for the providers' structured-output modes. risk_score bounds
+# are stated in the description: strict modes reject minimum/maximum.
+SCORE_FIELDS = ('risk_score', 'genai_detected', 'confidence', 'explanation', 'types')
+CONFIDENCE_LEVELS = ('very_high', 'high', 'medium', 'low', 'very_low')
+SCORE_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'risk_score': {'type': 'number', 'description': 'Risk probability from 0.0 to 1.0'},
+        'genai_detected': {'type': 'boolean'},
+        'confidence': {'type': 'string', 'enum': list(CONFIDENCE_LEVELS)},
+        'explanation': {'type': 'string'},
+        'types': {'type': 'array', 'items': {'type': 'string'}},
+    },
+    'required': list(SCORE_FIELDS),
+    'additionalProperties': False,
+}
+# Anthropic returns the score as the input of this (forced) tool call
+SCORE_TOOL_NAME = 'record_score'
+# Azure OpenAI accepts response_format json_schema from this api-version on
+AZURE_JSON_SCHEMA_VERSION = '2024-08-01'
+# LLM requests in flight per process (per-pipeline max_concurrency).
+DEFAULT_MAX_CONCURRENCY = 8
+MAX_CONCURRENCY_LIMIT = 1024
+# AI Toolkit provider -> gen_ai.provider.name, the key genai_token_cost prices
+# are stored under.
+SCORING_PROVIDER_NAMES = {
+    'openai': 'openai',
+    'azureopenai': 'azure.ai.openai',
+    'anthropic': 'anthropic',
+    'gemini': 'gcp.gemini',
+    'groq': 'groq',
+    'ollama': 'ollama',
+}
 
 
 @Configuration()
@@ -124,14 +241,130 @@ class GenAIScoreCommand(StreamingCommand):
         require=True
     )
 
+    checkpoint = Option(
+        doc='''
+        **Syntax:** **checkpoint=***<bool>*
+        **Description:** Skip events handled by an earlier run and commit the pipeline's _indextime watermark (set by a genaiwatermark subsearch) when the run finishes''',
+        require=False,
+        default=False,
+        validate=validators.Boolean()
+    )
+
+    time_budget = Option(
+        doc='''
+        **Syntax:** **time_budget=***<seconds>*
+        **Description:** Stop starting LLM calls this many seconds after the command started, scoring the highest-priority events first; the rest are emitted with genai_scoring_status=deferred''',
+        require=False,
+        default=None,
+        validate=validators.Float(1.0)
+    )
+
+    # Cheap priority signals used for time_budget when a pipeline sets no
+    # priority_fields: computed by the ML scoring macros and the sourcetype
+    # props, missing values count as 0
+    _DEFAULT_PRIORITY_FIELDS = (
+        ('gen_ai.prompt_injection.risk_score', 1.0),
+        ('gen_ai.pii.risk_score', 1.0),
+        ('gen_ai.guardrail.triggered', 1.0),
+        ('gen_ai.safety.violated', 1.0),
+    )
+
+    # priority_fields values that are words rather than numbers
+    _PRIORITY_WORDS = {
+        'true': 1.0, 'false': 0.0, 'yes': 1.0, 'no': 0.0,
+        'critical': 1.0, 'high': 0.75, 'medium': 0.5, 'low': 0.25, 'none': 0.0,
+    }
+
     def __init__(self):
         super(GenAIScoreCommand, self).__init__()
+        self._started = time.monotonic()
         self._service = None
         self._mltk_service = None
         self._pipeline_config = None
         self._system_prompt = None
         self._llm_config = None
-        self._api_key = None
+        self._llm_configs = None
+        self._llm_overrides = {}
+        self._aitk_connections = None
+        self._legacy_llm_records = None
+        self._api_keys = {}
+        self._neardup_settings = {}
+        self._gate = None
+        self._routing = None
+        self._router = None
+        self._connections = None
+        self._loop = None
+        self._semaphore = None
+        self._http_pool = None
+        self._ssl_contexts = {}
+        self._cancelled = False
+        self._previous_sigterm = None
+        self._routing_stats = {'hedged': 0, 'hedge_wins': 0, 'failovers': 0, 'cancelled': 0}
+        self._usage_stats = {'calls': 0, 'input_tokens': 0, 'output_tokens': 0,
+                             'cached_input_tokens': 0, 'latency_ms': 0.0}
+        self._run_counts = {'events': 0, 'scored': 0, 'deferred': 0}
+        self._gate_counts = {'passed': 0, 'sampled': 0, 'skipped': 0}
+        # Structured output ([settings] structured_output); connections that
+        # rejected it, by (provider, endpoint, model); replies and parse
+        # failures by provider
+        self._structured_output = True
+        self._structured_unsupported = set()
+        self._parse_stats = {}
+        # Prompt-prefix caching ([settings] prompt_cache, prompt_cache_ttl):
+        # the SCORING TASK text every request of the run starts with, and
+        # the Gemini cachedContents names holding it by (endpoint, model)
+        self._prompt_cache = True
+        self._prompt_cache_ttl = None
+        self._prompt_prefix = None
+        self._gemini_cache = None
+        self._cached_contents = {}
+        # Near-duplicate index (near_duplicate_reuse), opened on the first
+        # chunk and saved when the run finishes
+        self._neardup_index = None
+        self._neardup_store = None
+        self._neardup_opened = False
+        # _indextime checkpoint (checkpoint=true), opened on the first chunk
+        self._checkpoint_run = None
+        self._checkpoint_store = None
+        self._checkpoint_opened = False
+        # time_budget: deadline (monotonic) and the pipeline's priority fields
+        self._deadline = None
+        self._priority_fields = self._DEFAULT_PRIORITY_FIELDS
+        # Per-event INFO lines are sampled; debug_logging = true logs them all
+        self._log_sampler = LogSampler()
+        # Run metrics (ta_gen_ai_cim_perf.conf); a no-op unless enabled
+        self._perf = perf.start_run('genaiscore')
+
+    def prepare(self):
+        """Declare the command's input fields during getinfo.
+
+        Without required_fields Splunk ships every extracted field of each
+        event (full _raw, every input_messages{}.* expansion, all
+        FIELDALIAS/EVAL outputs) through the chunked protocol, and all of
+        it is decoded per chunk only to be ignored. A pipeline's gate_field
+        (and with time_budget its priority_fields) is added when the
+        pipeline stanza can be read here; only that stanza is read, not
+        [settings]. If it cannot be read or is invalid, stream() reads it
+        again and reports the error on every event.
+        """
+        fields = self._required_fields()
+        self._perf.set('pipeline', self.pipeline)
+        if self.checkpoint:
+            # One process sees every event and the final chunk, so the
+            # watermark is committed once, on the search head
+            fields.append('_indextime')
+            self.configuration.distributed = False
+        try:
+            with self._perf.stage('config_load'):
+                self._load_pipeline_stanza()
+        except Exception:
+            pass
+        else:
+            if self._gate is not None and self._gate['field'] not in fields:
+                fields.append(self._gate['field'])
+            if self.time_budget is not None:
+                fields.extend(f for f, _ in self._priority_fields if f not in fields)
+        self.configuration.required_fields = fields
 
     def _connect(self, app):
         """Connect to splunkd via the dispatch-provided management URI.
@@ -145,17 +378,13 @@ class GenAIScoreCommand(StreamingCommand):
         ``searchinfo.splunkd_uri`` (the same source splunklib's own
         ``SearchCommand.service`` property uses) guarantees we always talk to
         the splunkd that launched us, on whatever port it actually serves.
+
+        Both namespaces (this app and the ML Toolkit) share the pooled
+        keep-alive connections from :mod:`ta_gen_ai_cim_splunkd`.
         """
         searchinfo = self.metadata.searchinfo
-        uri = urlsplit(searchinfo.splunkd_uri, allow_fragments=False)
-        return client.connect(
-            scheme=uri.scheme,
-            host=uri.hostname,
-            port=uri.port,
-            token=searchinfo.session_key,
-            owner='nobody',
-            app=app,
-        )
+        return splunkd_connect(
+            searchinfo.session_key, searchinfo.splunkd_uri, app=app)
 
     def _get_service(self):
         if self._service is None:
@@ -170,40 +399,304 @@ class GenAIScoreCommand(StreamingCommand):
 
     def _load_pipeline_config(self):
         """Load pipeline and global settings from ta_gen_ai_cim_genai_scoring.conf."""
+        try:
+            self._load_pipeline_stanza()
+            self._load_settings()
+        except Exception as e:
+            self.logger.error("Failed to load pipeline config: {}".format(str(e)))
+            raise
+
+    def _read_stanza(self, name):
+        """Return the content of one ta_gen_ai_cim_genai_scoring.conf stanza,
+        or None if it does not exist."""
+        scoring_conf = self._get_service().confs['ta_gen_ai_cim_genai_scoring']
+        try:
+            return scoring_conf[name].content
+        except KeyError:
+            return None
+
+    def _load_pipeline_stanza(self):
+        """Read and validate this command's pipeline stanza.
+
+        Nothing is kept unless every key parses, so a stanza rejected in
+        prepare() is read and rejected again in stream().
+        """
         if self._pipeline_config is not None:
             return
 
+        content = self._read_stanza(self.pipeline)
+        if content is None:
+            raise ValueError("Pipeline stanza '{}' not found".format(self.pipeline))
+
+        pipeline_config = {
+            'enabled': content.get('enabled', '0'),
+            'name': content.get('pipeline_name', ''),
+            'prompt': content.get('prompt', ''),
+            'near_duplicate_reuse': self._is_truthy(content.get('near_duplicate_reuse', '0')),
+            'near_duplicate_threshold': content.get('near_duplicate_threshold'),
+        }
+        if not pipeline_config['name']:
+            raise ValueError("Pipeline '{}' has no name configured".format(self.pipeline))
+        if not pipeline_config['prompt']:
+            raise ValueError("Pipeline '{}' has no prompt configured".format(self.pipeline))
+
+        gate = self._parse_gate(content)
+        routing = self._parse_routing(content)
+        llm_overrides = self._parse_llm_overrides(content)
+        priority_fields = self._parse_priority_fields(content)
+
+        self._gate = gate
+        self._routing = routing
+        self._llm_overrides = llm_overrides
+        self._priority_fields = priority_fields
+        self._pipeline_config = pipeline_config
+
+    def _load_settings(self):
+        """Read the [settings] stanza (system prompt, logging, caching and
+        near-duplicate store). Only stream() needs it."""
+        if self._system_prompt is not None:
+            return
+
+        content = self._read_stanza('settings') or {}
+        if self._is_truthy(content.get('debug_logging', '0')):
+            debug_logger.setLevel(logging.DEBUG)
+            self._log_sampler = LogSampler(every=1)
+        self._structured_output = self._is_truthy(content.get('structured_output', '1'))
+        self._prompt_cache = self._is_truthy(content.get('prompt_cache', '1'))
+        self._prompt_cache_ttl = content.get('prompt_cache_ttl')
+        self._neardup_settings = {
+            'store': content.get('near_duplicate_store') or 'kvstore',
+            'max_entries': content.get('near_duplicate_max_entries'),
+        }
+        self._system_prompt = content.get('system_prompt', '')
+
+    def _parse_gate(self, content):
+        """Build the cheap-score gate policy from a pipeline stanza.
+
+        Returns None when gate_field is not set. Events whose gate_field is
+        below gate_threshold skip the LLM (except a gate_sample_rate
+        fraction kept for calibration) and receive the gate_defaults score.
+        """
+        field = (content.get('gate_field') or '').strip()
+        if not field:
+            return None
+
         try:
-            service = self._get_service()
-            scoring_conf = service.confs['ta_gen_ai_cim_genai_scoring']
+            threshold = float(content.get('gate_threshold') or 0.5)
+            sample_rate = float(content.get('gate_sample_rate') or 0.0)
+        except (TypeError, ValueError):
+            raise ValueError("Pipeline '{}' has an invalid gate_threshold or gate_sample_rate".format(
+                self.pipeline))
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("Pipeline '{}' gate_sample_rate must be between 0 and 1".format(
+                self.pipeline))
+
+        missing = (content.get('gate_missing') or 'score').strip().lower()
+        if missing not in ('score', 'skip'):
+            raise ValueError("Pipeline '{}' gate_missing must be 'score' or 'skip'".format(
+                self.pipeline))
+
+        defaults = {
+            'risk_score': 0.0,
+            'genai_detected': False,
+            'confidence': 'low',
+            'explanation': 'Not sent to the LLM: {} below cheap-score gate {}'.format(field, threshold),
+            'types': [],
+        }
+        overrides = content.get('gate_defaults')
+        if overrides:
+            overrides = self._ensure_dict(overrides)
+            if overrides is None:
+                raise ValueError("Pipeline '{}' gate_defaults must be a JSON object".format(
+                    self.pipeline))
+            defaults.update(overrides)
+        scoring = self._parse_llm_response(json.dumps(defaults))
+        if scoring is None:
+            raise ValueError("Pipeline '{}' gate_defaults is not a valid score".format(self.pipeline))
 
-            for stanza in scoring_conf:
-                if stanza.name == 'settings':
-                    self._system_prompt = stanza.content.get('system_prompt', '')
-                    if self._is_truthy(stanza.content.get('debug_logging', '0')):
-                        debug_logger.setLevel(logging.DEBUG)
-                elif stanza.name == self.pipeline:
-                    self._pipeline_config = {
-                        'enabled': stanza.content.get('enabled', '0'),
-                        'name': stanza.content.get('pipeline_name', ''),
-                        'prompt': stanza.content.get('prompt', '')
-                    }
+        return {
+            'field': field,
+            'threshold': threshold,
+            'sample_rate': sample_rate,
+            'missing': missing,
+            'defaults': scoring,
+        }
 
-            if self._pipeline_config is None:
-                raise ValueError("Pipeline stanza '{}' not found".format(self.pipeline))
+    def _parse_routing(self, content):
+        """Read the pipeline's connection list, hedging and circuit breaker settings.
 
-            if not self._pipeline_config.get('name'):
-                raise ValueError("Pipeline '{}' has no name configured".format(self.pipeline))
+        An empty ``connections`` list means the AI Toolkit default
+        connection. With two or more connections the list is the failover
+        order, and ``hedge`` sends a duplicate to the next connection when
+        the first has not answered within its recent p95 latency (or
+        ``hedge_delay`` seconds until that is known).
+        """
+        connections = []
+        for name in (content.get('connections') or '').split(','):
+            name = name.strip()
+            if name and name not in connections:
+                connections.append(name)
+        values = {}
+        for key, convert, default in (('max_concurrency', int, DEFAULT_MAX_CONCURRENCY),
+                                      ('hedge_delay', float, 5),
+                                      ('circuit_failures', int, 3),
+                                      ('circuit_cooldown', float, 60)):
+            try:
+                values[key] = convert(content.get(key) or default)
+            except (TypeError, ValueError):
+                raise ValueError("Pipeline '{}' has an invalid {}: '{}'".format(
+                    self.pipeline, key, content.get(key)))
+        max_concurrency = values['max_concurrency']
+        hedge_delay = values['hedge_delay']
+        circuit_failures = values['circuit_failures']
+        circuit_cooldown = values['circuit_cooldown']
+        if not 1 <= max_concurrency <= MAX_CONCURRENCY_LIMIT:
+            raise ValueError("Pipeline '{}' max_concurrency must be between 1 and {}".format(
+                self.pipeline, MAX_CONCURRENCY_LIMIT))
+        if not hedge_delay >= 0:
+            raise ValueError("Pipeline '{}' hedge_delay must be >= 0".format(self.pipeline))
+        if circuit_failures < 1:
+            raise ValueError("Pipeline '{}' circuit_failures must be >= 1".format(self.pipeline))
+        if not circuit_cooldown >= 0:
+            raise ValueError("Pipeline '{}' circuit_cooldown must be >= 0".format(self.pipeline))
+        return {
+            'connections': connections,
+            'max_concurrency': max_concurrency,
+            'hedge': self._is_truthy(content.get('hedge', '1')),
+            'hedge_delay': hedge_delay,
+            'circuit_failures': circuit_failures,
+            'circuit_cooldown': circuit_cooldown,
+        }
 
-            if not self._pipeline_config.get('prompt'):
-                raise ValueError("Pipeline '{}' has no prompt configured".format(self.pipeline))
+    def _parse_llm_overrides(self, content):
+        """Read the pipeline's model and request parameter overrides.
 
-            if self._system_prompt is None:
-                self._system_prompt = ''
+        Each key that is set (model, max_tokens, temperature, timeout)
+        replaces the AI Toolkit connection's value for this pipeline, on
+        every connection it scores with; the connections themselves are
+        unchanged for other pipelines.
+        """
+        overrides = {}
+        model = (content.get('model') or '').strip()
+        if model:
+            overrides['model'] = model
+        for key, convert in (('max_tokens', int), ('temperature', float), ('timeout', float)):
+            value = (content.get(key) or '').strip()
+            if value:
+                try:
+                    overrides[key] = convert(value)
+                except ValueError:
+                    raise ValueError("Pipeline '{}' has an invalid {}: '{}'".format(
+                        self.pipeline, key, value))
+        if overrides.get('max_tokens', 1) < 1:
+            raise ValueError("Pipeline '{}' max_tokens must be positive".format(self.pipeline))
+        if not overrides.get('timeout', 1) > 0:
+            raise ValueError("Pipeline '{}' timeout must be positive".format(self.pipeline))
+        if not 0.0 <= overrides.get('temperature', 0.0) <= 2.0:
+            raise ValueError("Pipeline '{}' temperature must be between 0 and 2".format(
+                self.pipeline))
+        return overrides
+
+    def _parse_priority_fields(self, content):
+        """Read the pipeline's priority_fields: comma-separated field names,
+        each optionally followed by :<weight> (default 1). Unset, the
+        default cheap signals are used."""
+        value = (content.get('priority_fields') or '').strip()
+        if not value:
+            return self._DEFAULT_PRIORITY_FIELDS
+        fields = []
+        for item in value.split(','):
+            item = item.strip()
+            if not item:
+                continue
+            field, _, weight = item.partition(':')
+            if not field.strip():
+                raise ValueError("Pipeline '{}' has a priority_fields entry without a field: {}".format(
+                    self.pipeline, item))
+            try:
+                fields.append((field.strip(), float(weight) if weight.strip() else 1.0))
+            except ValueError:
+                raise ValueError("Pipeline '{}' has an invalid priority_fields weight: {}".format(
+                    self.pipeline, item))
+        if not fields:
+            raise ValueError("Pipeline '{}' priority_fields lists no fields".format(self.pipeline))
+        return tuple(fields)
+
+    def _priority(self, record):
+        """Return the weighted sum of *record*'s priority fields. Numbers
+        are used as they are; true/false and critical/high/medium/low are
+        mapped to 1.0-0.0; anything else counts as 0."""
+        priority = 0.0
+        for field, weight in self._priority_fields:
+            value = self._resolve_scalar(record.get(field))
+            if value is None:
+                continue
+            try:
+                priority += weight * float(value)
+            except ValueError:
+                priority += weight * self._PRIORITY_WORDS.get(value.lower(), 0.0)
+        return priority
+
+    def _classify(self, records, checkpoint_run):
+        """Yield (record, event_id, duplicate, gate) for each record, where
+        duplicate is True when an earlier run handled the event and gate is
+        the cheap-score gate's (decision, score)."""
+        for record in records:
+            event_id = record.get('gen_ai.event.id', record.get('gen_ai_event_id', 'unknown'))
+            duplicate = checkpoint_run is not None and checkpoint_run.seen(
+                self._resolve_scalar(event_id))
+            gate = (None, None) if duplicate else self._apply_gate(record, event_id)
+            yield record, event_id, duplicate, gate
+
+    def _order_by_priority(self, classified):
+        """Return a chunk's classified records (see _classify) with those
+        that need no LLM call (duplicates, gate-skipped) first, then the
+        rest highest priority first, each carrying genai_scoring_priority.
+        Arrival order is kept among equals. The whole chunk is held."""
+        ready, ordered = [], []
+        for position, item in enumerate(classified):
+            record, _, duplicate, (gate_decision, _) = item
+            if duplicate or gate_decision == 'skipped':
+                ready.append(item)
+                continue
+            priority = self._priority(record)
+            record['genai_scoring_priority'] = str(round(priority, 4))
+            ordered.append((-priority, position, item))
+        ordered.sort(key=lambda entry: entry[:2])
+        return ready + [item for _, _, item in ordered]
 
-        except Exception as e:
-            self.logger.error("Failed to load pipeline config: {}".format(str(e)))
-            raise
+    @staticmethod
+    def _gate_sampled(event_id, rate):
+        """Pick gated-out events to score anyway; keyed on the event id so a
+        re-run samples the same events."""
+        if rate <= 0.0:
+            return False
+        if rate >= 1.0:
+            return True
+        key = GenAIScoreCommand._resolve_scalar(event_id)
+        if key is None or key == 'unknown':
+            return random.random() < rate
+        return zlib.crc32(key.encode('utf-8')) / 4294967296.0 < rate
+
+    def _apply_gate(self, record, event_id):
+        """Return (decision, gate score) for *record*: decision is 'passed',
+        'sampled' or 'skipped', or None when the pipeline has no gate."""
+        gate = self._gate
+        if gate is None:
+            return None, None
+        value = self._resolve_scalar(record.get(gate['field']))
+        try:
+            score = float(value) if value is not None else None
+        except ValueError:
+            score = None
+        if score is None:
+            if gate['missing'] == 'score':
+                return 'passed', None
+        elif score >= gate['threshold']:
+            return 'passed', score
+        if self._gate_sampled(event_id, gate['sample_rate']):
+            return 'sampled', score
+        return 'skipped', score
 
     def _decode_model_key(self, encoded_name):
         """Decode hex-encoded model key from KV store."""
@@ -287,6 +780,49 @@ class GenAIScoreCommand(StreamingCommand):
         self._llm_config = config
         return self._llm_config
 
+    def _get_llm_configs(self):
+        """Resolve the pipeline's LLM connections, in configured order.
+
+        Returns an ordered dict of connection name -> config. Pipelines
+        without a ``connections`` list get the single AI Toolkit default
+        connection. A named connection is looked up in the current AI
+        Toolkit schema by connection name, then in the legacy schema by
+        provider name. The pipeline's model, max_tokens, temperature and
+        timeout overrides are applied to each. Resolved once per command;
+        the AI Toolkit collections are read once however many connections
+        are listed.
+        """
+        if self._llm_configs is not None:
+            return self._llm_configs
+
+        names = (self._routing or {}).get('connections') or []
+        configs = {}
+        if not names:
+            config = self._get_llm_config()
+            configs[config.get('name') or config['provider']] = config
+        for name in names:
+            config = self._get_llm_config_aitk(name)
+            if config is None:
+                config = self._get_llm_config_legacy(name)
+            configs[name] = config
+        if self._llm_overrides:
+            configs = {name: dict(config, **self._llm_overrides) for name, config in configs.items()}
+            debug_logger.info(
+                "Pipeline LLM overrides: pipeline=%s overrides=%s connections=%s",
+                self.pipeline, json.dumps(self._llm_overrides, sort_keys=True), ','.join(configs))
+        self._llm_configs = configs
+        return self._llm_configs
+
+    def _get_router(self, configs):
+        if self._router is None:
+            from ta_gen_ai_cim_llm_routing import ConnectionRouter
+            routing = self._routing or {}
+            self._router = ConnectionRouter(
+                list(configs),
+                failure_threshold=routing.get('circuit_failures', 3),
+                cooldown=routing.get('circuit_cooldown', 60.0))
+        return self._router
+
     def _kv_query(self, collection_name, query=None):
         """Query a KV store collection, returning a list of records.
 
@@ -305,57 +841,72 @@ class GenAIScoreCommand(StreamingCommand):
                 "KV query on '%s' unavailable: %s", collection_name, str(e))
             return None
 
-    def _get_llm_config_aitk(self):
-        """Read the default LLM connection from the current AI Toolkit schema.
+    def _get_aitk_connections(self):
+        if self._aitk_connections is None:
+            self._aitk_connections = self._kv_query(AITK_LLM_CONNECTION_COLLECTION) or []
+        return self._aitk_connections
 
-        Returns the normalized config dict, or None if no connection is
+    def _get_llm_config_aitk(self, connection_name=None):
+        """Read an LLM connection from the current AI Toolkit schema.
+
+        Without *connection_name* the user's default connection is used.
+        Returns the normalized config dict, or None if the connection is not
         configured in the new collections (so the legacy path can run).
         """
-        connections = self._kv_query(AITK_LLM_CONNECTION_COLLECTION)
+        connections = self._get_aitk_connections()
         if not connections:
             return None
 
-        # Resolve the default connection name from the per-user mapping,
-        # then fall back to any mapping, then to a connection flagged
-        # default_users=['*'], then to the sole connection.
-        username = getattr(self.metadata.searchinfo, 'owner', None) or 'nobody'
-        mappings = self._kv_query(
-            AITK_DEFAULT_LLM_MAPPING_COLLECTION, {'user': username})
-        if not mappings:
-            mappings = self._kv_query(AITK_DEFAULT_LLM_MAPPING_COLLECTION)
-
-        default_name = None
-        for mapping in (mappings or []):
-            name = mapping.get('name')
-            if name and name != 'N/A':
-                default_name = name
-                break
-
         connection = None
-        if default_name:
+        if connection_name:
             for candidate in connections:
-                if candidate.get('name') == default_name:
+                if candidate.get('name') == connection_name:
                     connection = candidate
                     break
-        if connection is None:
-            for candidate in connections:
-                if candidate.get('default_users') == ['*']:
-                    connection = candidate
+            if connection is None:
+                return None
+        else:
+            # Resolve the default connection name from the per-user mapping,
+            # then fall back to any mapping, then to a connection flagged
+            # default_users=['*'], then to the sole connection.
+            username = getattr(self.metadata.searchinfo, 'owner', None) or 'nobody'
+            mappings = self._kv_query(
+                AITK_DEFAULT_LLM_MAPPING_COLLECTION, {'user': username})
+            if not mappings:
+                mappings = self._kv_query(AITK_DEFAULT_LLM_MAPPING_COLLECTION)
+
+            default_name = None
+            for mapping in (mappings or []):
+                name = mapping.get('name')
+                if name and name != 'N/A':
+                    default_name = name
                     break
-        if connection is None and len(connections) == 1:
-            connection = connections[0]
-        if connection is None:
-            return None
+
+            if default_name:
+                for candidate in connections:
+                    if candidate.get('name') == default_name:
+                        connection = candidate
+                        break
+            if connection is None:
+                for candidate in connections:
+                    if candidate.get('default_users') == ['*']:
+                        connection = candidate
+                        break
+            if connection is None and len(connections) == 1:
+                connection = connections[0]
+            if connection is None:
+                return None
 
         details = connection.get('connection_details') or {}
         params = connection.get('llm_params') or {}
 
         debug_logger.info(
-            "AITK default LLM: name=%s provider=%s model=%s endpoint=%s",
+            "AITK LLM connection: name=%s provider=%s model=%s endpoint=%s",
             connection.get('name'), connection.get('provider'),
             connection.get('model'), (details.get('endpoint') or '')[:60])
 
         return {
+            'name': connection.get('name', ''),
             'provider': connection.get('provider', ''),
             'model': connection.get('model', ''),
             'endpoint': details.get('endpoint', ''),
@@ -365,21 +916,23 @@ class GenAIScoreCommand(StreamingCommand):
             'timeout': float(details.get('request_timeout') or 120),
         }
 
-    def _get_llm_config_legacy(self):
+    def _get_llm_config_legacy(self, provider_name=None):
         """Read LLM configuration from the legacy AI Toolkit KV store.
 
         Finds the default provider and model, reads endpoint URL and model
-        settings.
+        settings. With *provider_name* only that provider is considered, and
+        its first model is used when none is marked default.
         """
-        service = self._get_mltk_service()
-
-        try:
-            kv = service.kvstore[KV_COLLECTION]
-            records = kv.data.query()
-        except Exception as e:
-            raise ValueError(
-                "Cannot read AI Toolkit config from KV store '{}': {}".format(
-                    KV_COLLECTION, str(e)))
+        if self._legacy_llm_records is None:
+            service = self._get_mltk_service()
+            try:
+                kv = service.kvstore[KV_COLLECTION]
+                self._legacy_llm_records = kv.data.query()
+            except Exception as e:
+                raise ValueError(
+                    "Cannot read AI Toolkit config from KV store '{}': {}".format(
+                        KV_COLLECTION, str(e)))
+        records = self._legacy_llm_records
 
         if not records:
             raise ValueError(
@@ -393,10 +946,13 @@ class GenAIScoreCommand(StreamingCommand):
             [k for k in config.keys()])
 
         skip_keys = {'_key', '_user', 'connection_type', 'metadata'}
+        wanted_provider = provider_name
 
         for provider_name, provider_raw in config.items():
             if provider_name in skip_keys:
                 continue
+            if wanted_provider and provider_name != wanted_provider:
+                continue
 
             provider_data = self._ensure_dict(provider_raw)
             if provider_data is None:
@@ -414,12 +970,15 @@ class GenAIScoreCommand(StreamingCommand):
                 "Provider '%s': %d model(s) found",
                 provider_name, len(models))
 
+            first_model = None
             for encoded_model, model_raw in models.items():
                 model_data = self._ensure_dict(model_raw)
                 if model_data is None:
                     continue
 
                 model_name = self._decode_model_key(encoded_model)
+                if first_model is None:
+                    first_model = (model_name, model_data)
 
                 default_val = self._get_field(model_data, 'set_as_default', False)
 
@@ -429,27 +988,15 @@ class GenAIScoreCommand(StreamingCommand):
                     default_val, type(default_val).__name__)
 
                 if self._is_truthy(default_val):
-                    endpoint = self._get_field(provider_data, 'endpoint', '')
-                    max_tokens_raw = self._get_field(model_data, 'max_tokens', 1000)
-                    temp_raw = self._get_field(model_data, 'response_variability', 0.1)
-                    timeout_raw = self._get_field(provider_data, 'request_timeout', 120)
-
-                    self._llm_config = {
-                        'provider': provider_name,
-                        'model': model_name,
-                        'endpoint': endpoint,
-                        'max_tokens': int(max_tokens_raw),
-                        'temperature': float(temp_raw),
-                        'timeout': float(timeout_raw),
-                        'provider_data': provider_data,
-                    }
+                    return self._legacy_config(provider_name, provider_data, model_name, model_data)
 
-                    debug_logger.info(
-                        "Default LLM found: provider=%s model=%s endpoint=%s",
-                        provider_name, model_name,
-                        endpoint[:60] if endpoint else 'none')
+            if wanted_provider and first_model is not None:
+                return self._legacy_config(provider_name, provider_data, *first_model)
 
-                    return self._llm_config
+        if wanted_provider:
+            raise ValueError(
+                "LLM connection '{}' not found in AI Toolkit Connection Management".format(
+                    wanted_provider))
 
         diag_parts = []
         diag_parts.append("records={}".format(
@@ -494,33 +1041,60 @@ class GenAIScoreCommand(StreamingCommand):
             "Please set a default model in AI Toolkit Connection Management.".format(
                 diag))
 
-    def _get_api_key(self, provider_name):
-        """Read the API key for the resolved LLM connection from storage passwords.
+    def _legacy_config(self, provider_name, provider_data, model_name, model_data):
+        """Normalize a legacy provider/model entry to the config dict."""
+        endpoint = self._get_field(provider_data, 'endpoint', '')
+        max_tokens_raw = self._get_field(model_data, 'max_tokens', 1000)
+        temp_raw = self._get_field(model_data, 'response_variability', 0.1)
+        timeout_raw = self._get_field(provider_data, 'request_timeout', 120)
+
+        debug_logger.info(
+            "Legacy LLM found: provider=%s model=%s endpoint=%s",
+            provider_name, model_name,
+            endpoint[:60] if endpoint else 'none')
+
+        return {
+            'name': provider_name,
+            'provider': provider_name,
+            'model': model_name,
+            'endpoint': endpoint,
+            'max_tokens': int(max_tokens_raw),
+            'temperature': float(temp_raw),
+            'timeout': float(timeout_raw),
+            'provider_data': provider_data,
+        }
+
+    def _get_api_key(self, provider_name, config=None):
+        """Read the API key for an LLM connection from storage passwords.
 
         Current AI Toolkit connections store the key under a per-connection
         ``secrets_id`` ("realm:name"); legacy connections store it under realm
         'mltk_llm_tokens' keyed by provider. Try the secrets_id first, then
-        fall back to the legacy provider lookup.
+        fall back to the legacy provider lookup. *config* defaults to the
+        default connection.
         """
-        if self._api_key is not None:
-            return self._api_key
+        if config is None:
+            config = self._llm_config or {}
+        secrets_id = config.get('secrets_id')
+        cache_key = (secrets_id, provider_name)
+        if cache_key in self._api_keys:
+            return self._api_keys[cache_key]
 
         service = self._get_mltk_service()
 
         # Candidate (realm, username) pairs in priority order.
         candidates = []
-        secrets_id = (self._llm_config or {}).get('secrets_id')
         if secrets_id and ':' in secrets_id:
             realm, name = secrets_id.split(':', 1)
             candidates.append((realm, name))
         candidates.append((SECRET_REALM, provider_name))
 
         try:
-            for sp in service.storage_passwords:
-                for realm, name in candidates:
-                    if sp.realm == realm and sp.username == name:
-                        self._api_key = sp.clear_password
-                        return self._api_key
+            for realm, name in candidates:
+                api_key = get_password(service, realm, name)
+                if api_key is not None:
+                    self._api_keys[cache_key] = api_key
+                    return api_key
         except Exception as e:
             debug_logger.error("Storage password lookup failed: %s", str(e))
             raise ValueError(
@@ -531,17 +1105,50 @@ class GenAIScoreCommand(StreamingCommand):
             "Please save the connection in AI Toolkit Connection Management.".format(
                 provider_name, secrets_id or 'n/a'))
 
-    def _send_llm_request(self, provider, model, endpoint, api_key, prompt,
-                          system_prompt="You are a helpful assistant",
-                          max_tokens=1000, temperature=0.1, timeout=120):
-        """Make a direct HTTP call to the LLM provider and return the text response."""
-        import urllib.request
-        import urllib.error
+    @staticmethod
+    def _gemini_schema(schema):
+        """Translate a JSON Schema to Gemini's responseSchema (OpenAPI subset)."""
+        out = {'type': schema['type'].upper()}
+        for key in ('description', 'enum', 'required'):
+            if key in schema:
+                out[key] = schema[key]
+        if 'items' in schema:
+            out['items'] = GenAIScoreCommand._gemini_schema(schema['items'])
+        if 'properties' in schema:
+            out['properties'] = {name: GenAIScoreCommand._gemini_schema(sub)
+                                 for name, sub in schema['properties'].items()}
+            out['propertyOrdering'] = list(schema['properties'])
+        return out
+
+    def _build_llm_request(self, provider, model, endpoint, api_key, prompt,
+                           system_prompt="You are a helpful assistant",
+                           max_tokens=1000, temperature=0.1, provider_data=None,
+                           structured=False, prompt_prefix=None, cached_content=None):
+        """Build the provider-specific HTTP request for one prompt.
+
+        With structured=True the request carries SCORE_SCHEMA as the
+        provider's native output constraint, where it has one (not Groq or
+        unknown OpenAI-compatible providers).
+
+        prompt_prefix is the start of *prompt* shared by every request of
+        the run. It is sent in a cacheable layout: Anthropic cache_control
+        breakpoints after the system prompt and after the prefix, an OpenAI
+        prompt_cache_key, or for Gemini the cachedContents resource
+        *cached_content* (see ta_gen_ai_cim_prompt_cache) in place of the
+        system prompt and prefix. OpenAI-compatible and Azure requests keep
+        the system prompt and prefix first, unchanged, which is what their
+        automatic prefix caching matches on.
+
+        Returns tuple: (url, headers, payload_bytes, ssl_context, provider_lower)
+        """
         import urllib.parse
 
         provider_upper = provider.strip().replace(' ', '')
         provider_lower = provider_upper.lower()
 
+        if prompt_prefix and not prompt.startswith(prompt_prefix):
+            prompt_prefix = None
+
         messages = [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": prompt}
@@ -564,14 +1171,27 @@ class GenAIScoreCommand(StreamingCommand):
                 "max_tokens": max_tokens,
                 "temperature": temperature,
             }
+            # Ollama's OpenAI-compatible endpoint passes the schema on as
+            # its native format option. Groq supports json_schema on some
+            # models only, so it is left unconstrained.
+            if structured and provider_lower in ('openai', 'ollama'):
+                body["response_format"] = {
+                    "type": "json_schema",
+                    "json_schema": {"name": "genai_score", "strict": True, "schema": SCORE_SCHEMA},
+                }
+            # Routes requests sharing the prefix to the same cache; only
+            # sent to api.openai.com, as compatible servers may reject it
+            if (prompt_prefix and provider_lower == 'openai'
+                    and urllib.parse.urlsplit(url).hostname == 'api.openai.com'):
+                body["prompt_cache_key"] = 'ta_gen_ai_cim-' + prefix_hash(
+                    model, system_prompt, prompt_prefix)
 
         elif provider_lower == 'azureopenai':
             url = (endpoint or '').rstrip('/')
             if not url.endswith('/chat/completions'):
                 url += '/chat/completions'
             azure_version = self._get_field(
-                self._llm_config.get('provider_data', {}),
-                'azure_openai_version', '2024-02-01')
+                provider_data or {}, 'azure_openai_version', '2024-02-01')
             url += '?api-version={}'.format(azure_version)
             headers['api-key'] = api_key
             body = {
@@ -579,6 +1199,14 @@ class GenAIScoreCommand(StreamingCommand):
                 "max_tokens": max_tokens,
                 "temperature": temperature,
             }
+            if structured and str(azure_version)[:10] >= AZURE_JSON_SCHEMA_VERSION:
+                body["response_format"] = {
+                    "type": "json_schema",
+                    "json_schema": {"name": "genai_score", "strict": True, "schema": SCORE_SCHEMA},
+                }
+            elif structured:
+                # Older GA api-versions only guarantee syntactically valid JSON
+                body["response_format"] = {"type": "json_object"}
 
         elif provider_lower == 'anthropic':
             url = (endpoint or 'https://api.anthropic.com').rstrip('/')
@@ -593,6 +1221,26 @@ class GenAIScoreCommand(StreamingCommand):
                 "system": system_prompt,
                 "temperature": temperature,
             }
+            if prompt_prefix:
+                # Tools, system and the prefix are cached up to each
+                # breakpoint; the system prompt alone is shared by every
+                # pipeline. Prefixes below the model's minimum (1024-4096
+                # tokens) are sent uncached without error.
+                ephemeral = {"type": "ephemeral"}
+                if system_prompt:
+                    body["system"] = [
+                        {"type": "text", "text": system_prompt, "cache_control": ephemeral}]
+                content = [{"type": "text", "text": prompt_prefix, "cache_control": ephemeral}]
+                if prompt[len(prompt_prefix):]:
+                    content.append({"type": "text", "text": prompt[len(prompt_prefix):]})
+                body["messages"] = [{"role": "user", "content": content}]
+            if structured:
+                body["tools"] = [{
+                    "name": SCORE_TOOL_NAME,
+                    "description": "Record the risk score for the event.",
+                    "input_schema": SCORE_SCHEMA,
+                }]
+                body["tool_choice"] = {"type": "tool", "name": SCORE_TOOL_NAME}
 
         elif provider_lower == 'gemini':
             base = (endpoint or '').rstrip('/')
@@ -612,6 +1260,15 @@ class GenAIScoreCommand(StreamingCommand):
                     "maxOutputTokens": max_tokens,
                 },
             }
+            if structured:
+                body["generationConfig"]["responseMimeType"] = "application/json"
+                body["generationConfig"]["responseSchema"] = self._gemini_schema(SCORE_SCHEMA)
+            if prompt_prefix and cached_content:
+                # The cached content holds the system instruction and prefix
+                del body["systemInstruction"]
+                body["cachedContent"] = cached_content
+                body["contents"] = [
+                    {"role": "user", "parts": [{"text": prompt[len(prompt_prefix):] or " "}]}]
 
         else:
             url = (endpoint or '').rstrip('/')
@@ -631,11 +1288,6 @@ class GenAIScoreCommand(StreamingCommand):
 
         payload = json.dumps(body).encode('utf-8')
 
-        req = urllib.request.Request(url, data=payload, method='POST')
-        for k, v in headers.items():
-            req.add_header(k, v)
-
-        ctx = ssl.create_default_context()
         # AppInspect / security note:
         # Default to full TLS verification for all providers. The ONLY
         # exception is local Ollama development (loopback hostnames), where
@@ -652,26 +1304,44 @@ class GenAIScoreCommand(StreamingCommand):
         except (ValueError, AttributeError):
             _host = ''
         _loopback_hosts = {'localhost', '127.0.0.1', '::1'}
-        if provider_lower == 'ollama' and _host in _loopback_hosts:
-            ctx.check_hostname = False
-            ctx.verify_mode = ssl.CERT_NONE
+        verify = not (provider_lower == 'ollama' and _host in _loopback_hosts)
+        ctx = self._get_ssl_context(verify)
 
         # Log only host+path, never the query string (defense in depth
         # against credentials or event data appearing in the URL).
         _log_parsed = urllib.parse.urlsplit(url)
-        debug_logger.info(
-            "LLM HTTP request: provider=%s model=%s url=%s%s body_len=%d",
-            provider, model, _log_parsed.netloc, _log_parsed.path, len(payload))
-
-        try:
-            resp = urllib.request.urlopen(req, context=ctx, timeout=int(timeout))
-            result = json.loads(resp.read().decode('utf-8'))
-        except urllib.error.HTTPError as e:
-            error_body = e.read().decode('utf-8', errors='replace')[:500]
-            raise ValueError("LLM API HTTP {}: {}".format(e.code, error_body))
+        if self._log_sampler.allow('llm_http_request'):
+            debug_logger.info(
+                "LLM HTTP request: provider=%s model=%s url=%s%s body_len=%d",
+                provider, model, _log_parsed.netloc, _log_parsed.path, len(payload))
+
+        return url, headers, payload, ctx, provider_lower
+
+    def _get_ssl_context(self, verify=True):
+        """Return the process's verifying (or, for loopback Ollama only,
+        non-verifying) SSL context. Loading the CA bundle takes tens of
+        milliseconds, so the two contexts are built once per process
+        rather than per request."""
+        import ssl
+
+        ctx = self._ssl_contexts.get(verify)
+        if ctx is None:
+            ctx = ssl.create_default_context()
+            if not verify:
+                ctx.check_hostname = False
+                ctx.verify_mode = ssl.CERT_NONE
+            self._ssl_contexts[verify] = ctx
+        return ctx
 
+    @staticmethod
+    def _parse_llm_result(provider_lower, result):
+        """Return the response text from a decoded provider response."""
         if provider_lower == 'anthropic':
             content = result.get('content', [])
+            for block in content:
+                # Structured output: the score is the forced tool call's input
+                if block.get('type') == 'tool_use' and isinstance(block.get('input'), dict):
+                    return json.dumps(block['input'])
             if content and content[0].get('text'):
                 return content[0]['text']
             raise ValueError("Empty response from Anthropic API")
@@ -687,56 +1357,427 @@ class GenAIScoreCommand(StreamingCommand):
         choices = result.get('choices', [])
         if choices and choices[0].get('message', {}).get('content'):
             return choices[0]['message']['content']
+        if choices and choices[0].get('message', {}).get('refusal'):
+            raise ValueError("LLM refused: {}".format(choices[0]['message']['refusal'][:200]))
 
         raise ValueError(
             "Empty LLM response: keys={}".format(list(result.keys())))
 
-    def _call_ai_toolkit(self, system_prompt, prompt_text, event_id):
-        """Call the default LLM configured in AI Toolkit Connection Management.
-
-        Returns tuple: (response_text, error_detail)
-        On success: (response_text, None)
-        On failure: (None, error_description)
+    @staticmethod
+    def _parse_llm_usage(provider_lower, result, response_headers):
+        """Return token usage, the answering model and the provider's request
+        id from a decoded provider response and its (lower-cased) headers.
+
+        Returns dict: input_tokens, cached_input_tokens, output_tokens (int
+        or None), model, request_id (str or None). input_tokens includes the
+        cached prompt tokens for every provider. Providers that omit a value
+        leave it None.
         """
+        if provider_lower == 'anthropic':
+            usage = result.get('usage') or {}
+            input_tokens = usage.get('input_tokens')
+            # Anthropic counts cache reads and writes apart from input_tokens
+            cached_tokens = usage.get('cache_read_input_tokens')
+            if input_tokens is not None:
+                input_tokens += ((cached_tokens or 0)
+                                 + (usage.get('cache_creation_input_tokens') or 0))
+            output_tokens = usage.get('output_tokens')
+            model = result.get('model')
+            request_id = response_headers.get('request-id') or result.get('id')
+        elif provider_lower == 'gemini':
+            usage = result.get('usageMetadata') or {}
+            input_tokens = usage.get('promptTokenCount')
+            cached_tokens = usage.get('cachedContentTokenCount')
+            output_tokens = usage.get('candidatesTokenCount')
+            # Thinking tokens are billed as output
+            if output_tokens is not None and usage.get('thoughtsTokenCount'):
+                output_tokens += usage['thoughtsTokenCount']
+            model = result.get('modelVersion')
+            request_id = result.get('responseId')
+        else:
+            usage = result.get('usage') or {}
+            input_tokens = usage.get('prompt_tokens')
+            cached_tokens = (usage.get('prompt_tokens_details') or {}).get('cached_tokens')
+            output_tokens = usage.get('completion_tokens')
+            model = result.get('model')
+            request_id = (response_headers.get('x-request-id')
+                          or response_headers.get('apim-request-id') or result.get('id'))
+
+        def _count(value):
+            try:
+                return int(value)
+            except (TypeError, ValueError):
+                return None
+
+        return {
+            'input_tokens': _count(input_tokens),
+            'cached_input_tokens': _count(cached_tokens),
+            'output_tokens': _count(output_tokens),
+            'model': str(model) if model else None,
+            'request_id': str(request_id) if request_id else None,
+        }
+
+    @staticmethod
+    def _urlopen_llm(url, headers, payload, ctx, timeout, attempt=None, method='POST'):
+        """Send a built request with urllib (blocking) and return the decoded
+        JSON response and its lower-cased headers. *attempt* is an optional
+        CancellableRequest."""
+        import urllib.request
+        import urllib.error
+
+        req = urllib.request.Request(url, data=payload, method=method)
+        for k, v in headers.items():
+            req.add_header(k, v)
+
         try:
-            config = self._get_llm_config()
+            if attempt is not None:
+                resp = attempt.open(req, context=ctx, timeout=int(timeout))
+            else:
+                resp = urllib.request.urlopen(req, context=ctx, timeout=int(timeout))
+            result = json.loads(resp.read().decode('utf-8'))
+            return result, {k.lower(): v for k, v in resp.headers.items()}
+        except urllib.error.HTTPError as e:
+            error_body = e.read().decode('utf-8', errors='replace')[:500]
+            raise ValueError("LLM API HTTP {}: {}".format(e.code, error_body))
 
-            provider = config['provider']
-            if provider.lower() == 'ollama':
-                api_key = 'ollama'
+    def _send_llm_request(self, provider, model, endpoint, api_key, prompt,
+                          system_prompt="You are a helpful assistant",
+                          max_tokens=1000, temperature=0.1, timeout=120,
+                          provider_data=None, structured=False, prompt_prefix=None,
+                          cached_content=None):
+        """Make a direct (blocking) HTTP call to the LLM provider and return the text response."""
+        url, headers, payload, ctx, provider_lower = self._build_llm_request(
+            provider, model, endpoint, api_key, prompt, system_prompt,
+            max_tokens, temperature, provider_data, structured, prompt_prefix, cached_content)
+        result, _ = self._urlopen_llm(url, headers, payload, ctx, timeout)
+        return self._parse_llm_result(provider_lower, result)
+
+    async def _send_llm_request_async(self, provider, model, endpoint, api_key, prompt,
+                                      system_prompt="You are a helpful assistant",
+                                      max_tokens=1000, temperature=0.1, timeout=120,
+                                      provider_data=None, structured=False, prompt_prefix=None,
+                                      cached_content=None):
+        """Non-blocking variant of _send_llm_request.
+
+        Returns tuple: (response_text, usage) where usage is the
+        _parse_llm_usage dict of the response.
+
+        Sends on the process's asyncio connection pool. Endpoints that must
+        go through an HTTP(S) proxy are sent with urllib on the loop's
+        executor instead, through a CancellableRequest so that cancelling
+        the awaiting task still aborts the request.
+        """
+        import asyncio
+        from ta_gen_ai_cim_async_http import uses_proxy
+
+        url, headers, payload, ctx, provider_lower = self._build_llm_request(
+            provider, model, endpoint, api_key, prompt, system_prompt,
+            max_tokens, temperature, provider_data, structured, prompt_prefix, cached_content)
+
+        if uses_proxy(url):
+            from ta_gen_ai_cim_llm_routing import CancellableRequest
+            attempt = CancellableRequest()
+            try:
+                result, response_headers = await asyncio.get_running_loop().run_in_executor(
+                    None, self._urlopen_llm, url, headers, payload, ctx, timeout, attempt)
+            except asyncio.CancelledError:
+                attempt.cancel()
+                raise
+            return (self._parse_llm_result(provider_lower, result),
+                    self._parse_llm_usage(provider_lower, result, response_headers))
+
+        try:
+            response = await self._http_pool.post(
+                url, headers, payload, ssl_context=ctx, timeout=timeout)
+        except asyncio.TimeoutError:
+            raise ValueError("LLM API request timed out after {}s".format(timeout))
+        if response.status >= 400:
+            error_body = response.body.decode('utf-8', errors='replace')[:500]
+            raise ValueError("LLM API HTTP {}: {}".format(response.status, error_body))
+        result = json.loads(response.body.decode('utf-8'))
+        return (self._parse_llm_result(provider_lower, result),
+                self._parse_llm_usage(provider_lower, result, response.headers))
+
+    def _connection_api_key(self, config):
+        provider = config['provider']
+        if provider.lower() == 'ollama':
+            return 'ollama'
+        return self._get_api_key(provider, config)
+
+    def _resolve_connections(self):
+        """Resolve the pipeline's connections and their API keys up front.
+
+        storage/passwords lookups are blocking splunkd calls, so they happen
+        here, once, before any request is scheduled on the event loop.
+        Returns an ordered dict of name -> (config, api_key, error); a
+        connection whose key cannot be read fails every attempt with *error*.
+        """
+        if self._connections is None:
+            connections = {}
+            for name, config in self._get_llm_configs().items():
+                try:
+                    connections[name] = (config, self._connection_api_key(config), None)
+                except Exception as e:
+                    detail = "LLM call failed: {}".format(str(e)[:500])
+                    debug_logger.error(detail)
+                    connections[name] = (config, None, detail)
+            self._connections = connections
+        return self._connections
+
+    def _prepare_prompt_cache(self, connections, prompt_prefix):
+        """Set the run's cacheable prompt prefix and, for Gemini connections,
+        look up, create or extend the cachedContents resource holding it.
+
+        Called once per chunk, before any request is scheduled; the Gemini
+        calls are blocking and are only made when a resource has to be
+        found, created or extended (see GeminiContextCache).
+        """
+        if not self._prompt_cache:
+            return
+        self._prompt_prefix = prompt_prefix
+        gemini = [(config, api_key) for config, api_key, error in connections.values()
+                  if error is None and config['provider'].strip().lower() == 'gemini']
+        if not gemini:
+            return
+        if self._gemini_cache is None:
+            def send(method, url, headers, body):
+                payload = json.dumps(body).encode('utf-8') if body is not None else None
+                return self._urlopen_llm(
+                    url, headers, payload, self._get_ssl_context(), 30, method=method)[0]
+            try:
+                ttl = int(self._prompt_cache_ttl or 600)
+            except (TypeError, ValueError):
+                ttl = 600
+            self._gemini_cache = GeminiContextCache(send, ttl=ttl)
+        for config, api_key in gemini:
+            name = self._gemini_cache.get(
+                config['endpoint'], config['model'], api_key, self._system_prompt, prompt_prefix)
+            if name:
+                self._cached_contents[(config['endpoint'], config['model'])] = name
             else:
-                api_key = self._get_api_key(provider)
+                self._cached_contents.pop((config['endpoint'], config['model']), None)
+        if self._gemini_cache.last_error:
+            self.logger.info("Gemini prompt cache not used: {}".format(self._gemini_cache.last_error))
+            self._gemini_cache.last_error = None
 
-            debug_logger.info(
-                "LLM call start: event_id=%s provider=%s model=%s prompt_len=%d",
-                event_id, provider, config['model'], len(prompt_text))
-
-            response = self._send_llm_request(
-                provider=provider,
-                model=config['model'],
-                endpoint=config['endpoint'],
-                api_key=api_key,
-                prompt=prompt_text,
-                system_prompt=system_prompt,
-                max_tokens=config.get('max_tokens', 1000),
-                temperature=config.get('temperature', 0.1),
-                timeout=config.get('timeout', 120),
-            )
+    async def _call_ai_toolkit(self, system_prompt, prompt_text, event_id, config, api_key):
+        """Call an LLM configured in AI Toolkit Connection Management.
 
-            debug_logger.info(
-                "LLM response OK: event_id=%s len=%d", event_id, len(response))
+        Returns tuple: (response_text, error_detail, usage)
+        On success: (response_text, None, usage)
+        On failure: (None, error_description, None)
+
+        usage is the response's _parse_llm_usage dict plus latency_ms (time
+        from sending the request to its decoded response, not counting the
+        wait for a concurrency slot), provider and request_model.
+        """
+        try:
+            provider = config['provider']
+
+            if self._log_sampler.allow('llm_call_start'):
+                debug_logger.info(
+                    "LLM call start: event_id=%s provider=%s model=%s prompt_len=%d",
+                    event_id, provider, config['model'], len(prompt_text))
+
+            connection_key = (provider, config['endpoint'], config['model'])
+            structured = self._structured_output and connection_key not in self._structured_unsupported
+            cached_content = self._cached_contents.get((config['endpoint'], config['model']))
+
+            def send(structured, cached_content):
+                return self._send_llm_request_async(
+                    provider=provider,
+                    model=config['model'],
+                    endpoint=config['endpoint'],
+                    api_key=api_key,
+                    prompt=prompt_text,
+                    system_prompt=system_prompt,
+                    max_tokens=config.get('max_tokens', 1000),
+                    temperature=config.get('temperature', 0.1),
+                    timeout=config.get('timeout', 120),
+                    provider_data=config.get('provider_data'),
+                    structured=structured,
+                    prompt_prefix=self._prompt_prefix,
+                    cached_content=cached_content,
+                )
+
+            async with self._semaphore:
+                start = time.time()
+                try:
+                    try:
+                        response, usage = await send(structured, cached_content)
+                    except ValueError as e:
+                        if cached_content and str(e).startswith(
+                                ('LLM API HTTP 400', 'LLM API HTTP 403', 'LLM API HTTP 404')):
+                            # Cached content expired or deleted: send the
+                            # full prompt, and stop using it
+                            self._cached_contents.pop((config['endpoint'], config['model']), None)
+                            self._gemini_cache.invalidate(cached_content)
+                            self.logger.warning(
+                                "Cached prompt prefix rejected by provider={} model={}; sending the full prompt: {}".format(
+                                    provider, config['model'], str(e)[:200]))
+                            cached_content = None
+                        elif structured and str(e).startswith('LLM API HTTP 400'):
+                            # Model or api-version without structured output
+                            # support: ask again without it, and stop asking
+                            self._structured_unsupported.add(connection_key)
+                            self.logger.warning(
+                                "Structured output rejected by provider={} model={}; sending without it: {}".format(
+                                    provider, config['model'], str(e)[:200]))
+                            structured = False
+                        else:
+                            raise
+                        start = time.time()
+                        response, usage = await send(structured, cached_content)
+                finally:
+                    elapsed = time.time() - start
+                    self._perf.add_time('http', elapsed)
+                usage['latency_ms'] = elapsed * 1000.0
+            usage['provider'] = provider
+            usage['request_model'] = config['model']
+            usage['structured'] = structured
+
+            if self._log_sampler.allow('llm_response'):
+                debug_logger.info(
+                    "LLM response OK: event_id=%s len=%d latency_ms=%.0f input_tokens=%s "
+                    "cached_input_tokens=%s output_tokens=%s model=%s request_id=%s",
+                    event_id, len(response), usage['latency_ms'], usage['input_tokens'],
+                    usage['cached_input_tokens'], usage['output_tokens'], usage['model'],
+                    usage['request_id'])
             debug_logger.debug(
                 "LLM response content: event_id=%s first300=%s",
                 event_id, response[:300])
 
-            return (response.strip(), None)
+            return (response.strip(), None, usage)
 
         except Exception as e:
             import traceback
             detail = "LLM call failed: {}".format(str(e)[:500])
             debug_logger.error(detail)
             debug_logger.error(traceback.format_exc())
-            return (None, detail)
+            return (None, detail, None)
+
+    async def _attempt(self, connections, name, system_prompt, prompt_text, event_id):
+        config, api_key, error = connections[name]
+        if error is not None:
+            return (None, error, None)
+        return await self._call_ai_toolkit(system_prompt, prompt_text, event_id, config, api_key)
+
+    async def _score_with_connections(self, connections, system_prompt, prompt_text, event_id):
+        """Score one event on the pipeline's LLM connections.
+
+        Connections are tried in the router's order (open circuits, and
+        half-open ones whose trial request is already in flight, are
+        skipped). A connection that errors or returns no valid score fails
+        over to the next one. With hedging on, the next connection also
+        receives a duplicate request when the current one is slower than its
+        hedge delay; the first valid score wins and the other request is
+        cancelled.
+
+        Returns tuple: (scoring, response_text, error_detail, connection_name,
+        usage), where usage describes the call that produced the response (see
+        _call_ai_toolkit) and is None if no response was received.
+        """
+        import asyncio
+        router = self._get_router(connections)
+        order = router.order()
+        if not order:
+            return None, None, "LLM call skipped: circuit open for connection(s) {}".format(
+                ', '.join(connections)), None, None
+
+        if len(order) > 1 and self._routing['hedge']:
+            return await self._score_hedged(
+                connections, router, order, system_prompt, prompt_text, event_id)
+
+        response, error, name, usage = None, None, None, None
+        attempts = 0
+        for candidate in order:
+            if not router.start(candidate):
+                continue
+            name = candidate
+            if attempts:
+                self._routing_stats['failovers'] += 1
+            attempts += 1
+            start = time.time()
+            try:
+                response, error, usage = await self._attempt(
+                    connections, name, system_prompt, prompt_text, event_id)
+            except asyncio.CancelledError:
+                router.record_cancelled(name, time.time() - start)
+                raise
+            scoring = self._parse_and_count(response, usage)
+            if scoring:
+                router.record_success(name, time.time() - start)
+                return scoring, response, None, name, usage
+            router.record_failure(name)
+        if not attempts:
+            return None, None, "LLM call skipped: circuit open for connection(s) {}".format(
+                ', '.join(connections)), None, None
+        return None, response, error, name, usage
+
+    async def _score_hedged(self, connections, router, order, system_prompt, prompt_text, event_id):
+        """Race the first connection against hedged or failover attempts on the others."""
+        import asyncio
+        queue = list(order)
+        pending = {}
+        last = (None, None, None, None)
+
+        def launch():
+            while queue:
+                name = queue.pop(0)
+                if not router.start(name):
+                    continue
+                task = asyncio.ensure_future(
+                    self._attempt(connections, name, system_prompt, prompt_text, event_id))
+                pending[task] = (name, time.time())
+                return name
+            return None
+
+        primary = launch()
+        if primary is None:
+            return None, None, "LLM call skipped: circuit open for connection(s) {}".format(
+                ', '.join(connections)), None, None
+        hedge_at = time.time() + router.hedge_delay(primary, self._routing['hedge_delay'])
+        hedged = False
+        try:
+            while pending:
+                timeout = max(0.0, hedge_at - time.time()) if queue and not hedged else None
+                done, _ = await asyncio.wait(
+                    list(pending), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedged = True
+                    secondary = launch()
+                    if secondary is None:
+                        continue
+                    self._routing_stats['hedged'] += 1
+                    debug_logger.info(
+                        "LLM hedge: event_id=%s primary=%s secondary=%s",
+                        event_id, primary, secondary)
+                    continue
+                for task in done:
+                    name, start = pending.pop(task)
+                    response, error, usage = task.result()
+                    scoring = self._parse_and_count(response, usage)
+                    if scoring:
+                        router.record_success(name, time.time() - start)
+                        if name != primary and any(n == primary for n, _ in pending.values()):
+                            self._routing_stats['hedge_wins'] += 1
+                        for other_task, (other_name, other_start) in pending.items():
+                            other_task.cancel()
+                            router.record_cancelled(other_name, time.time() - other_start)
+                            self._routing_stats['cancelled'] += 1
+                        pending.clear()
+                        return scoring, response, None, name, usage
+                    router.record_failure(name)
+                    last = (response, error, name, usage)
+                if not pending and queue and launch() is not None:
+                    self._routing_stats['failovers'] += 1
+            return None, last[0], last[1], last[2], last[3]
+        finally:
+            # Cancelled from outside (search finalized, time budget): stop
+            # every attempt
+            for task, (name, start) in pending.items():
+                task.cancel()
+                router.record_cancelled(name, time.time() - start)
 
     @staticmethod
     def _extract_json_object(text):
@@ -769,6 +1810,21 @@ class GenAIScoreCommand(StreamingCommand):
                     return text[start:i + 1]
         return None
 
+    def _parse_and_count(self, response, usage):
+        """Parse a reply with _parse_llm_response and count it, and any parse
+        failure, against its provider."""
+        with self._perf.stage('parse'):
+            scoring = self._parse_llm_response(response) if response else None
+        if response and usage is not None:
+            provider = str(usage.get('provider') or 'unknown').strip().replace(' ', '').lower()
+            stats = self._parse_stats.setdefault(
+                provider, {'replies': 0, 'parse_failures': 0, 'structured': 0})
+            stats['replies'] += 1
+            stats['structured'] += 1 if usage.get('structured') else 0
+            if not scoring:
+                stats['parse_failures'] += 1
+        return scoring
+
     def _parse_llm_response(self, response_text):
         """Parse the LLM JSON response into a scoring dict.
 
@@ -815,8 +1871,7 @@ class GenAIScoreCommand(StreamingCommand):
             self.logger.warning("LLM response parsed but is not a JSON object")
             return None
 
-        required_fields = ['risk_score', 'genai_detected', 'confidence', 'explanation', 'types']
-        for field in required_fields:
+        for field in SCORE_FIELDS:
             if field not in parsed:
                 self.logger.warning("Missing required field '{}' in LLM response".format(field))
                 return None
@@ -831,8 +1886,7 @@ class GenAIScoreCommand(StreamingCommand):
         genai_detected = str(parsed['genai_detected']).lower() in ('true', '1', 'yes')
 
         confidence = str(parsed['confidence']).lower().strip()
-        valid_confidence = ('very_high', 'high', 'medium', 'low', 'very_low')
-        if confidence not in valid_confidence:
+        if confidence not in CONFIDENCE_LEVELS:
             confidence = 'medium'
 
         explanation = str(parsed.get('explanation', ''))
@@ -859,6 +1913,9 @@ class GenAIScoreCommand(StreamingCommand):
         'output_messages',
         'gen_ai.output.messages_raw',
     )
+    # (sub-field, EVAL scalar) fallbacks for each side, see _resolve_messages
+    _INPUT_MSG_FALLBACK_FIELDS = ('input_messages{}.content', 'gen_ai.input.messages')
+    _OUTPUT_MSG_FALLBACK_FIELDS = ('output_messages{}.content', 'gen_ai.output.messages')
 
     @staticmethod
     def _resolve_messages(record, raw_fields, content_field, eval_field):
@@ -925,8 +1982,8 @@ class GenAIScoreCommand(StreamingCommand):
 
         return ""
 
-    def _build_event_json(self, record):
-        """Build a JSON payload with both the input and output messages.
+    def _build_event_payload(self, record):
+        """Build the dict of input and output messages sent to the LLM.
 
         Both sides are always included so the scoring pipeline's prompt can
         decide which to analyze (e.g. inspect the input for prompt injection,
@@ -934,14 +1991,102 @@ class GenAIScoreCommand(StreamingCommand):
         whichever shape Splunk delivered (see :meth:`_resolve_messages`).
         """
         input_messages = self._resolve_messages(
-            record, self._INPUT_MSG_FIELDS,
-            'input_messages{}.content', 'gen_ai.input.messages')
+            record, self._INPUT_MSG_FIELDS, *self._INPUT_MSG_FALLBACK_FIELDS)
         output_messages = self._resolve_messages(
-            record, self._OUTPUT_MSG_FIELDS,
-            'output_messages{}.content', 'gen_ai.output.messages')
-        return json.dumps(
-            {"input_messages": input_messages, "output_messages": output_messages},
-            indent=2, ensure_ascii=False)
+            record, self._OUTPUT_MSG_FIELDS, *self._OUTPUT_MSG_FALLBACK_FIELDS)
+        return {"input_messages": input_messages, "output_messages": output_messages}
+
+    def _build_event_json(self, record):
+        """Build the JSON event data appended to the scoring prompt."""
+        return json.dumps(self._build_event_payload(record), indent=2, ensure_ascii=False)
+
+    @staticmethod
+    def _payload_text(value):
+        """Join the string values of an event payload, without JSON keys or
+        punctuation, so near-duplicate shingles reflect message content only."""
+        if isinstance(value, dict):
+            return '\n'.join(GenAIScoreCommand._payload_text(v) for v in value.values())
+        if isinstance(value, list):
+            return '\n'.join(GenAIScoreCommand._payload_text(v) for v in value)
+        return '' if value is None else str(value)
+
+    def _open_neardup_index(self):
+        """Load the pipeline's near-duplicate index, or return (None, None)
+        when reuse is disabled or the store cannot be read."""
+        if not self._pipeline_config.get('near_duplicate_reuse'):
+            return None, None
+
+        from ta_gen_ai_cim_neardup import (
+            DEFAULT_MAX_ENTRIES, DEFAULT_THRESHOLD, FileIndexStore, KVStoreIndexStore,
+            NearDuplicateIndex, context_hash)
+
+        try:
+            threshold = float(self._pipeline_config.get('near_duplicate_threshold') or DEFAULT_THRESHOLD)
+            max_entries = int(self._neardup_settings.get('max_entries') or DEFAULT_MAX_ENTRIES)
+            index = NearDuplicateIndex(threshold=threshold, max_entries=max_entries)
+            # A pipeline model override is part of the context: scores from
+            # another model are not reused (unset keeps earlier indexes valid)
+            context = context_hash(
+                self._system_prompt, self._pipeline_config['name'], self._pipeline_config['prompt'],
+                *([self._llm_overrides['model']] if self._llm_overrides.get('model') else []))
+            if self._neardup_settings.get('store') == 'file':
+                store = FileIndexStore(self.pipeline, context)
+            else:
+                store = KVStoreIndexStore(self._get_service(), self.pipeline, context)
+            store.load(index)
+        except Exception as e:
+            self.logger.warning("Near-duplicate reuse disabled: {}".format(str(e)))
+            return None, None
+
+        debug_logger.info(
+            "Near-duplicate index loaded: pipeline=%s store=%s entries=%d threshold=%.2f",
+            self.pipeline, type(store).__name__, len(index), threshold)
+        return index, store
+
+    def _open_checkpoint(self):
+        """Load the pipeline's checkpoint for checkpoint=true, or return
+        None when it cannot be read or genaiwatermark recorded no window
+        for this run."""
+        from ta_gen_ai_cim_checkpoint import CheckpointRun, CheckpointStore
+
+        try:
+            store = CheckpointStore(self._get_service())
+            run = CheckpointRun(store.load(self.pipeline) or {})
+        except Exception as e:
+            self.logger.warning("Scoring checkpoint disabled: {}".format(str(e)))
+            return None
+        if not run.ready:
+            self.logger.warning(
+                "Scoring checkpoint disabled: no pending window for pipeline='{}' "
+                "(run | genaiwatermark pipeline={} in a subsearch first)".format(
+                    self.pipeline, self.pipeline))
+            return None
+        self._checkpoint_store = store
+        debug_logger.info(
+            "Scoring checkpoint loaded: pipeline=%s watermark=%s window=%s-%s",
+            self.pipeline, run.watermark, run.checkpoint.get('pending_earliest'), run.pending_latest)
+        return run
+
+    def _commit_checkpoint(self):
+        """Advance the pipeline's watermark past this run's window."""
+        run = self._checkpoint_run
+        document = run.commit()
+        try:
+            with self._perf.stage('kv'):
+                self._checkpoint_store.save(document)
+        except Exception as e:
+            self.logger.warning("Failed to commit scoring checkpoint: {}".format(str(e)))
+            return
+        stats = run.stats
+        handled = stats['done'] + stats['failed'] + stats['duplicates'] + stats['deferred']
+        self.logger.info(
+            "Scoring checkpoint committed: pipeline='{}' watermark={} scored={} failed={} "
+            "deferred={} duplicates={} held_seconds={}".format(
+                self.pipeline, document['watermark'], stats['done'], stats['failed'],
+                stats['deferred'], stats['duplicates'], stats['held']))
+        self.write_metric('checkpoint', (None, handled, handled, stats['duplicates']))
+        self._perf.incr('duplicates', stats['duplicates'])
+        self._perf.set('watermark_lag', int(time.time()) - document['watermark'])
 
     _CONTEXT_FIELDS = (
         'client.address',
@@ -955,6 +2100,23 @@ class GenAIScoreCommand(StreamingCommand):
         'trace_id',
     )
 
+    @classmethod
+    def _required_fields(cls):
+        """Return the only fields this command reads from an event.
+
+        Every pipeline sends the same event JSON (both message sides) to the
+        LLM and re-emits the same context fields in _raw, so the set does
+        not vary with the selected pipeline. ``host`` and ``source`` are kept
+        for the ``| collect`` that follows the command in the scheduled
+        pipeline searches.
+        """
+        fields = ['_time', 'host', 'source', 'gen_ai_event_id']
+        for group in (cls._INPUT_MSG_FIELDS, cls._INPUT_MSG_FALLBACK_FIELDS,
+                      cls._OUTPUT_MSG_FIELDS, cls._OUTPUT_MSG_FALLBACK_FIELDS,
+                      cls._CONTEXT_FIELDS):
+            fields.extend(f for f in group if f not in fields)
+        return fields
+
     @staticmethod
     def _resolve_scalar(val):
         """Extract the first meaningful scalar from a possibly multi-value field.
@@ -1022,16 +2184,205 @@ class GenAIScoreCommand(StreamingCommand):
 
         record['_raw'] = json.dumps(output, ensure_ascii=False)
 
+    @staticmethod
+    def _scoring_fields(pipeline_name, scoring):
+        """Map a parsed score to the gen_ai.<name>.* and status fields."""
+        prefix = 'gen_ai.{}'.format(pipeline_name)
+        return {
+            '{}.risk_score'.format(prefix): str(scoring['risk_score']),
+            '{}.genai_detected'.format(prefix): scoring['genai_detected'],
+            '{}.confidence'.format(prefix): scoring['confidence'],
+            '{}.explanation'.format(prefix): scoring['explanation'],
+            '{}.types'.format(prefix): scoring['types'] if scoring['types'] else [],
+            'genai_scoring_status': 'success',
+            'genai_scoring_pipeline': pipeline_name,
+            'genai_scoring_error': '',
+        }
+
+    @staticmethod
+    def _usage_fields(usage):
+        """Map an LLM call's usage (see _call_ai_toolkit) to the
+        genai_scoring_* cost and latency fields. Values the provider did not
+        report are emitted empty."""
+        provider_lower = usage['provider'].strip().replace(' ', '').lower()
+
+        def _value(val):
+            return '' if val is None else str(val)
+
+        return {
+            'genai_scoring_latency_ms': str(int(round(usage['latency_ms']))),
+            'genai_scoring_input_tokens': _value(usage['input_tokens']),
+            'genai_scoring_cached_input_tokens': _value(usage['cached_input_tokens']),
+            'genai_scoring_output_tokens': _value(usage['output_tokens']),
+            'genai_scoring_provider': SCORING_PROVIDER_NAMES.get(provider_lower, provider_lower),
+            'genai_scoring_model': usage['model'] or usage['request_model'],
+            'genai_scoring_request_model': usage['request_model'],
+            'genai_scoring_request_id': _value(usage['request_id']),
+        }
+
+    def _get_loop(self):
+        """Create the process's event loop, request semaphore and connection pool.
+
+        The loop only runs inside stream(), while the command waits for the
+        oldest in-flight event of a chunk, so the chunked protocol itself
+        stays synchronous.
+
+        asyncio (and with it ssl) is imported here rather than at module
+        level, so getinfo does not pay for it.
+        """
+        import asyncio
+        if self._loop is None:
+            from ta_gen_ai_cim_async_http import ConnectionPool
+            concurrency = self._routing['max_concurrency']
+            self._loop = asyncio.new_event_loop()
+            self._semaphore = asyncio.Semaphore(concurrency)
+            self._http_pool = ConnectionPool(max_idle_per_host=concurrency)
+            try:
+                self._previous_sigterm = signal.signal(signal.SIGTERM, self._on_sigterm)
+            except (ValueError, AttributeError):
+                # Not the main thread, or no SIGTERM on this platform
+                self._previous_sigterm = None
+        return self._loop
+
+    def _on_sigterm(self, signum, frame):
+        """splunkd terminates the command when the search is finalized or
+        cancelled. While requests are in flight, cancel them so the current
+        chunk completes with every event marked cancelled; otherwise exit
+        as before."""
+        loop = self._loop
+        if loop is not None and loop.is_running() and not self._cancelled:
+            self._cancelled = True
+            loop.call_soon_threadsafe(self._cancel_in_flight)
+            return
+        signal.signal(signum, self._previous_sigterm or signal.SIG_DFL)
+        os.kill(os.getpid(), signum)
+
+    def _cancel_in_flight(self):
+        import asyncio
+        for task in asyncio.all_tasks(self._loop):
+            task.cancel()
+
+    def _close_loop(self):
+        """Cancel anything still pending and release sockets and the loop."""
+        import asyncio
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        tasks = asyncio.all_tasks(loop)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        loop.run_until_complete(self._http_pool.close())
+        loop.run_until_complete(loop.shutdown_default_executor())
+        loop.close()
+
+    def _await_job(self, job):
+        """Wait for a job's LLM task and store its result on the job."""
+        import asyncio
+        task = job.pop('task')
+        if self._deadline is not None:
+            # A request still running when the time budget ends is cancelled
+            task = asyncio.wait_for(task, max(0.0, self._deadline - time.monotonic()))
+        try:
+            with self._perf.stage('llm_wait'):
+                job['scoring'], job['response'], job['error'], job['connection'], job['usage'] = \
+                    self._loop.run_until_complete(task)
+        except asyncio.TimeoutError:
+            job['deferred'] = True
+        except asyncio.CancelledError:
+            job['error'] = 'LLM call cancelled: search finalized'
+        job['scored'] = True
+
+    def _finish_job(self, job, pipeline_name, neardup_index):
+        """Map a job's outcome to output fields on its record. Returns True
+        when the event received a score."""
+        record = job['record']
+        event_id = job['event_id']
+        scoring = job['scoring']
+        reused = job['reused']
+        gate_decision, gate_score = job['gate']
+
+        if job['duplicate'] or job['deferred']:
+            record['genai_scoring_status'] = 'duplicate' if job['duplicate'] else 'deferred'
+            record['genai_scoring_pipeline'] = pipeline_name
+            record['genai_scoring_error'] = ''
+            if job['deferred']:
+                self._run_counts['deferred'] += 1
+                if self._checkpoint_run is not None:
+                    self._checkpoint_run.deferred(record.get('_indextime'))
+            return False
+
+        if job['scored'] and scoring and neardup_index is not None and event_id != 'unknown':
+            neardup_index.add(self._resolve_scalar(event_id), job['signature'], scoring)
+
+        scoring_fields = {}
+
+        if scoring:
+            scoring_fields = self._scoring_fields(pipeline_name, scoring)
+            if reused is not None:
+                scoring_fields['genai_scoring_reused_from'] = reused[0]['event_id']
+                scoring_fields['genai_scoring_similarity'] = str(round(reused[1], 4))
+        else:
+            scoring_fields['genai_scoring_status'] = 'error'
+            scoring_fields['genai_scoring_pipeline'] = pipeline_name
+            if job['error']:
+                scoring_fields['genai_scoring_error'] = job['error']
+            elif job['response']:
+                scoring_fields['genai_scoring_error'] = 'JSON parse failed; raw={}'.format(
+                    str(job['response'])[:200])
+            else:
+                scoring_fields['genai_scoring_error'] = 'LLM returned empty response'
+
+        if job['connection'] is not None and self._routing['connections']:
+            scoring_fields['genai_scoring_connection'] = job['connection']
+        usage = job['usage']
+        if usage is not None:
+            scoring_fields.update(self._usage_fields(usage))
+            self._usage_stats['calls'] += 1
+            self._usage_stats['input_tokens'] += usage['input_tokens'] or 0
+            self._usage_stats['cached_input_tokens'] += usage['cached_input_tokens'] or 0
+            self._usage_stats['output_tokens'] += usage['output_tokens'] or 0
+            self._usage_stats['latency_ms'] += usage['latency_ms']
+        if gate_decision is not None:
+            scoring_fields['genai_scoring_gate'] = gate_decision
+            scoring_fields['genai_scoring_gate_score'] = '' if gate_score is None else str(gate_score)
+        if 'genai_scoring_priority' in record:
+            scoring_fields['genai_scoring_priority'] = record['genai_scoring_priority']
+
+        record.update(scoring_fields)
+        self._build_output_raw(record, scoring_fields, pipeline_name)
+        if self._checkpoint_run is not None:
+            checkpoint_id = None if event_id == 'unknown' else self._resolve_scalar(event_id)
+            if scoring:
+                self._checkpoint_run.done(checkpoint_id, record.get('_indextime'))
+            else:
+                self._checkpoint_run.failed(checkpoint_id, record.get('_indextime'))
+        return bool(scoring)
+
     def stream(self, records):
-        """Process each record through the GenAI scoring pipeline."""
+        """Process each record through the GenAI scoring pipeline.
+
+        Events that need the LLM are scheduled as asyncio tasks (at most
+        max_concurrency requests in flight) and records are yielded in input
+        order; at most 2 x max_concurrency records of a chunk are held at a
+        time, so memory does not grow with chunk size. With time_budget the
+        whole chunk is read and ordered by priority before the first request
+        is sent, and records are yielded in that order.
+        """
+        import asyncio
         try:
-            self._load_pipeline_config()
+            with self._perf.stage('config_load'):
+                self._load_pipeline_config()
         except Exception as e:
             for record in records:
                 record['genai_scoring_status'] = 'error'
                 record['genai_scoring_error'] = 'Config load failed: {}'.format(str(e))
                 record['genai_scoring_pipeline'] = ''
+                self._perf.incr('events')
                 yield record
+            if getattr(self, '_finished', False):
+                self._perf.finish(status='error')
             return
 
         pipeline_name = self._pipeline_config['name']
@@ -1042,64 +2393,241 @@ class GenAIScoreCommand(StreamingCommand):
 
         event_count = 0
         success_count = 0
+        gate_counts = {'passed': 0, 'sampled': 0, 'skipped': 0}
+        with self._perf.stage('kv'):
+            if not self._neardup_opened:
+                self._neardup_opened = True
+                self._neardup_index, self._neardup_store = self._open_neardup_index()
+            if self.checkpoint and not self._checkpoint_opened:
+                self._checkpoint_opened = True
+                self._checkpoint_run = self._open_checkpoint()
+        neardup_index = self._neardup_index
+        checkpoint_run = self._checkpoint_run
+
+        connection_error = None
+        try:
+            with self._perf.stage('credential'):
+                connections = self._resolve_connections()
+        except Exception as e:
+            connections = None
+            connection_error = "LLM call failed: {}".format(str(e)[:500])
+            debug_logger.error(connection_error)
+
+        # Every request starts with the same system prompt and task text;
+        # sent unchanged and first, providers can cache them
+        task_prefix = "SCORING TASK: {}\n\nEVENT DATA:\n".format(pipeline_prompt)
+        if connections is not None:
+            with self._perf.stage('http'):
+                self._prepare_prompt_cache(connections, task_prefix)
+
+        classified = self._classify(records, checkpoint_run)
+        if self.time_budget is not None:
+            if self._deadline is None:
+                self._deadline = self._started + self.time_budget
+            classified = self._order_by_priority(classified)
+
+        loop = self._get_loop()
+        window = 2 * self._routing['max_concurrency']
+        pending = deque()
 
-        for record in records:
-            event_count += 1
-            event_id = record.get('gen_ai.event.id', record.get('gen_ai_event_id', 'unknown'))
-
-            event_json = self._build_event_json(record)
-
-            debug_logger.info(
-                "Event JSON built: event_id=%s len=%d", event_id, len(event_json))
-            debug_logger.debug(
-                "Event JSON content: event_id=%s first500=%s",
-                event_id, event_json[:500])
-
-            user_prompt = "SCORING TASK: {}\n\nEVENT DATA:\n{}".format(
-                pipeline_prompt,
-                event_json
-            )
-
-            llm_response, call_error = self._call_ai_toolkit(
-                self._system_prompt, user_prompt, event_id)
-
-            if llm_response:
-                scoring = self._parse_llm_response(llm_response)
-            else:
-                scoring = None
-
-            scoring_fields = {}
-
-            if scoring:
-                prefix = 'gen_ai.{}'.format(pipeline_name)
-                scoring_fields['{}.risk_score'.format(prefix)] = str(scoring['risk_score'])
-                scoring_fields['{}.genai_detected'.format(prefix)] = scoring['genai_detected']
-                scoring_fields['{}.confidence'.format(prefix)] = scoring['confidence']
-                scoring_fields['{}.explanation'.format(prefix)] = scoring['explanation']
-                scoring_fields['{}.types'.format(prefix)] = scoring['types'] if scoring['types'] else []
-                scoring_fields['genai_scoring_status'] = 'success'
-                scoring_fields['genai_scoring_pipeline'] = pipeline_name
-                scoring_fields['genai_scoring_error'] = ''
-                success_count += 1
-            else:
-                scoring_fields['genai_scoring_status'] = 'error'
-                scoring_fields['genai_scoring_pipeline'] = pipeline_name
-                if call_error:
-                    scoring_fields['genai_scoring_error'] = call_error
-                elif llm_response:
-                    scoring_fields['genai_scoring_error'] = 'JSON parse failed; raw={}'.format(
-                        str(llm_response)[:200])
+        try:
+            for record, event_id, duplicate, (gate_decision, gate_score) in classified:
+                event_count += 1
+                if gate_decision is not None:
+                    gate_counts[gate_decision] += 1
+
+                job = {'record': record, 'event_id': event_id, 'gate': (gate_decision, gate_score),
+                       'scoring': None, 'response': None, 'error': None, 'connection': None,
+                       'usage': None, 'reused': None, 'signature': None, 'scored': False,
+                       'duplicate': duplicate, 'deferred': False, 'task': None}
+
+                if duplicate:
+                    # Handled by an earlier run whose window overlapped this one
+                    pass
+                elif gate_decision == 'skipped':
+                    job['scoring'] = self._gate['defaults']
+                elif self._deadline is not None and time.monotonic() >= self._deadline:
+                    job['deferred'] = True
                 else:
-                    scoring_fields['genai_scoring_error'] = 'LLM returned empty response'
-
-            record.update(scoring_fields)
-            self._build_output_raw(record, scoring_fields, pipeline_name)
-
-            yield record
+                    event_payload = self._build_event_payload(record)
+                    event_json = json.dumps(event_payload, indent=2, ensure_ascii=False)
+
+                    if self._log_sampler.allow('event_json'):
+                        debug_logger.info(
+                            "Event JSON built: event_id=%s len=%d", event_id, len(event_json))
+                    debug_logger.debug(
+                        "Event JSON content: event_id=%s first500=%s",
+                        event_id, event_json[:500])
+
+                    user_prompt = task_prefix + event_json
+
+                    if neardup_index is not None:
+                        job['signature'] = neardup_index.signature(self._payload_text(event_payload))
+                        job['reused'] = neardup_index.query(job['signature'])
+
+                    if job['reused'] is not None:
+                        job['scoring'] = job['reused'][0]['scoring']
+                        if self._log_sampler.allow('near_duplicate_reuse'):
+                            debug_logger.info(
+                                "Near-duplicate reuse: event_id=%s reused_from=%s similarity=%.3f",
+                                event_id, job['reused'][0]['event_id'], job['reused'][1])
+                    elif connection_error is not None:
+                        job['error'] = connection_error
+                    elif self._cancelled:
+                        job['error'] = 'LLM call cancelled: search finalized'
+                    else:
+                        job['task'] = loop.create_task(self._score_with_connections(
+                            connections, self._system_prompt, user_prompt, event_id))
+
+                pending.append(job)
+
+                # Emit from the head while it is ready, or when the window is full
+                while pending and (len(pending) >= window or pending[0]['task'] is None):
+                    job = pending.popleft()
+                    if job['task'] is not None:
+                        self._await_job(job)
+                    with self._perf.stage('write'):
+                        success_count += self._finish_job(job, pipeline_name, neardup_index)
+                    yield job['record']
+
+            while pending:
+                job = pending.popleft()
+                if job['task'] is not None:
+                    self._await_job(job)
+                with self._perf.stage('write'):
+                    success_count += self._finish_job(job, pipeline_name, neardup_index)
+                yield job['record']
+        finally:
+            # The consumer stopped early or an error escaped: do not leave
+            # requests running for records that will never be emitted.
+            tasks = [job['task'] for job in pending if job.get('task') is not None]
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            if getattr(self, '_finished', False) or self._cancelled:
+                self._close_loop()
 
         self.logger.info("GenAI scoring complete: pipeline='{}' processed={} success={}".format(
             pipeline_name, event_count, success_count))
-
+        if self._cancelled:
+            self.logger.warning("GenAI scoring cancelled: in-flight LLM requests were aborted")
+
+        self._perf.incr('events', event_count)
+        self._perf.incr('scored', success_count)
+        self._run_counts['events'] += event_count
+        self._run_counts['scored'] += success_count
+        for decision, count in gate_counts.items():
+            self._gate_counts[decision] += count
+        self._perf.incr('gate_skipped', gate_counts['skipped'])
+        if getattr(self, '_finished', False) or self._cancelled:
+            if neardup_index is not None:
+                # The index is kept across chunks and saved once per run
+                try:
+                    with self._perf.stage('kv'):
+                        self._neardup_store.save(neardup_index)
+                except Exception as e:
+                    self.logger.warning("Failed to save near-duplicate index: {}".format(str(e)))
+                stats = neardup_index.stats
+                self.logger.info("Near-duplicate reuse: checked={} reused={} added={} index_size={}".format(
+                    stats['lookups'], stats['reused'], stats['added'], len(neardup_index)))
+                self.write_metric('near_duplicate', (
+                    stats['signature_ms'] / 1000.0, stats['lookups'], self._run_counts['events'],
+                    stats['reused']))
+                self._perf.incr('reused', stats['reused'])
+            # Usage, connection and routing stats cover the whole run; they
+            # are reported once here rather than per chunk
+            usage_stats = self._usage_stats
+            if self._gate is not None:
+                run_events = self._run_counts['events']
+                gated_out = self._gate_counts['skipped']
+                self.logger.info(
+                    "Cheap-score gate: field='{}' threshold={} passed={} sampled={} skipped={} gate_ratio={:.3f}".format(
+                        self._gate['field'], self._gate['threshold'], self._gate_counts['passed'],
+                        self._gate_counts['sampled'], gated_out,
+                        gated_out / float(run_events) if run_events else 0.0))
+                self.write_metric('cheap_gate', (
+                    None, run_events, run_events, run_events - gated_out))
+            credential_stats = get_lookup_stats()
+            debug_logger.info("Credential lookup stats: {}".format(json.dumps(credential_stats)))
+            if credential_stats['requests']:
+                self.write_metric('credential_lookup', (
+                    credential_stats['total_ms'] / 1000.0, credential_stats['requests'], None, None))
+            if usage_stats['calls']:
+                self.logger.info(
+                    "LLM usage: calls={} input_tokens={} cached_input_tokens={} output_tokens={} "
+                    "avg_latency_ms={:.0f}".format(
+                        usage_stats['calls'], usage_stats['input_tokens'],
+                        usage_stats['cached_input_tokens'], usage_stats['output_tokens'],
+                        usage_stats['latency_ms'] / usage_stats['calls']))
+                self.write_metric('llm_usage', (
+                    usage_stats['latency_ms'] / 1000.0, usage_stats['calls'],
+                    usage_stats['input_tokens'], usage_stats['output_tokens']))
+                self.write_metric('llm_prompt_cache', (
+                    None, usage_stats['calls'], usage_stats['input_tokens'],
+                    usage_stats['cached_input_tokens']))
+            if self._gemini_cache is not None:
+                debug_logger.info("Gemini prompt cache stats: {}".format(
+                    json.dumps(self._gemini_cache.stats, sort_keys=True)))
+            if self._http_pool is not None:
+                pool_stats = self._http_pool.stats
+                debug_logger.info("LLM connection pool stats: {}".format(json.dumps(pool_stats)))
+                self.write_metric('llm_connections', (
+                    None, pool_stats['requests'], pool_stats['connections_opened'],
+                    pool_stats['connections_reused']))
+            if self._parse_stats:
+                replies = sum(stats['replies'] for stats in self._parse_stats.values())
+                failures = sum(stats['parse_failures'] for stats in self._parse_stats.values())
+                self.logger.info("LLM replies: {}".format(json.dumps({
+                    provider: dict(stats, parse_failure_rate=round(
+                        stats['parse_failures'] / float(stats['replies']), 4))
+                    for provider, stats in self._parse_stats.items()}, sort_keys=True)))
+                self.write_metric('llm_parse', (None, replies, replies, replies - failures))
+            if self._router is not None and len(self._connections) > 1:
+                routing_stats = self._routing_stats
+                self.logger.info(
+                    "LLM routing: hedged={} hedge_wins={} failovers={} cancelled={} connections={}".format(
+                        routing_stats['hedged'], routing_stats['hedge_wins'], routing_stats['failovers'],
+                        routing_stats['cancelled'], json.dumps(self._router.snapshot(), sort_keys=True)))
+                self.write_metric('llm_hedge', (
+                    None, routing_stats['hedged'], None, routing_stats['hedge_wins']))
+            self._perf.incr('llm_calls', usage_stats['calls'])
+            self._perf.incr('input_tokens', usage_stats['input_tokens'])
+            self._perf.incr('cached_input_tokens', usage_stats['cached_input_tokens'])
+            self._perf.incr('output_tokens', usage_stats['output_tokens'])
+            self._perf.incr('parse_failures', sum(
+                stats['parse_failures'] for stats in self._parse_stats.values()))
+            if self.time_budget is not None:
+                deferred = self._run_counts['deferred']
+                self.logger.info(
+                    "Time budget: pipeline='{}' budget_s={} elapsed_s={:.1f} events={} deferred={}".format(
+                        self.pipeline, self.time_budget, time.monotonic() - self._started,
+                        self._run_counts['events'], deferred))
+                self.write_metric('time_budget', (
+                    time.monotonic() - self._started, self._run_counts['events'],
+                    self._run_counts['events'], self._run_counts['events'] - deferred))
+                self._perf.incr('deferred', deferred)
+            if checkpoint_run is not None:
+                if self._cancelled:
+                    self.logger.warning(
+                        "Scoring checkpoint not committed: search cancelled; the window is scored again")
+                else:
+                    self._commit_checkpoint()
+            self._perf.finish(status='cancelled' if self._cancelled else 'ok')
+            for provider, stats in sorted(self._parse_stats.items()):
+                debug_logger.info(
+                    "Parse stats: pipeline=%s provider=%s replies=%d structured=%d parse_failures=%d",
+                    self.pipeline, provider, stats['replies'], stats['structured'],
+                    stats['parse_failures'])
+            debug_logger.info(
+                "Run summary: pipeline=%s status=%s events=%d scored=%d deferred=%d llm_calls=%d "
+                "input_tokens=%d cached_input_tokens=%d output_tokens=%d per_event_log_lines=%s",
+                self.pipeline, 'cancelled' if self._cancelled else 'ok',
+                self._run_counts['events'], self._run_counts['scored'],
+                self._run_counts['deferred'], usage_stats['calls'],
+                usage_stats['input_tokens'], usage_stats['cached_input_tokens'],
+                usage_stats['output_tokens'],
+                json.dumps(self._log_sampler.summary(), sort_keys=True))
 
 if __name__ == '__main__':
     dispatch(GenAIScoreCommand, sys.argv, sys.stdin, sys.stdout, __name__)
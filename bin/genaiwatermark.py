@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+# encoding=utf-8
+"""
+genaiwatermark.py - Generating command for a scoring pipeline's _indextime window
+
+Reads the pipeline's checkpoint from the gen_ai_scoring_checkpoint KV Store
+collection, picks the window of _indextime its next run should score
+(ta_gen_ai_cim_checkpoint.plan_window), records it as pending and returns
+it as search terms. Used as a subsearch ahead of
+| genaiscore pipeline=<name> checkpoint=true, which commits the window when
+the run finishes.
+
+Usage:
+    index=gen_ai_log [| genaiwatermark pipeline=<name> | fields search] ...
+    index=gen_ai_log `genai_scoring_window(<name>)` ...
+
+Parameters:
+    pipeline       - Required. Pipeline stanza (pipeline_1 through pipeline_10)
+    lag            - Optional. Seconds an event must have been indexed before
+                     it is searched (default: 60)
+    overlap        - Optional. Seconds before the watermark searched again
+                     (default: 300)
+    catchup_window - Optional. Most seconds of _indextime scored per run
+                     (default: 900)
+    max_backlog    - Optional. Oldest _indextime, in seconds before now, a
+                     run reaches back to after downtime (default: 86400)
+    max_event_lag  - Optional. Most seconds an event's _time may precede its
+                     _indextime and still be found (default: 3600)
+    retry_window   - Optional. Seconds a failed event holds the watermark
+                     (default: 900)
+
+Output Fields:
+    search         - _index_earliest=... _index_latest=... earliest=... latest=now
+    pipeline, watermark, index_earliest, index_latest
+    backlog        - Seconds of indexed events not yet scored
+    skipped        - Seconds of backlog older than max_backlog given up on
+
+Copyright 2026 Splunk Inc.
+Licensed under Apache License 2.0
+"""
+
+import os
+import sys
+import time
+
+# Add Splunk SDK paths - use lib directory in this app
+app_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+lib_path = os.path.join(app_root, 'lib')
+if lib_path not in sys.path:
+    sys.path.insert(0, lib_path)
+
+bin_path = os.path.dirname(os.path.abspath(__file__))
+if bin_path not in sys.path:
+    sys.path.insert(0, bin_path)
+
+# Splunk SDK imports
+from splunklib.searchcommands import dispatch, GeneratingCommand, Configuration, Option, validators
+from ta_gen_ai_cim_splunkd import connect as splunkd_connect
+from ta_gen_ai_cim_checkpoint import (
+    CheckpointStore, pending_document, plan_window, window_search,
+    DEFAULT_LAG, DEFAULT_OVERLAP, DEFAULT_CATCHUP_WINDOW, DEFAULT_MAX_BACKLOG,
+    DEFAULT_MAX_EVENT_LAG, DEFAULT_RETRY_WINDOW)
+
+
+@Configuration()
+class GenAIWatermarkCommand(GeneratingCommand):
+    """
+    Generating command that returns a scoring pipeline's next _indextime window.
+
+    ##Syntax
+
+    | genaiwatermark pipeline=<pipeline_stanza> [lag=<sec>] [overlap=<sec>]
+
+    ##Description
+
+    Returns one row whose search field selects the events indexed since the
+    pipeline's last committed watermark, and records that window as
+    pending for genaiscore checkpoint=true.
+
+    ##Examples
+
+    Score what pipeline 1 has not scored yet:
+    index=gen_ai_log [| genaiwatermark pipeline=pipeline_1 | fields search]
+    | genaiscore pipeline=pipeline_1 checkpoint=true
+    """
+
+    pipeline = Option(
+        doc='''
+        **Syntax:** **pipeline=***<pipeline_stanza>*
+        **Description:** Pipeline stanza name from ta_gen_ai_cim_genai_scoring.conf (pipeline_1 through pipeline_10)''',
+        require=True
+    )
+
+    lag = Option(
+        doc='''
+        **Syntax:** **lag=***<seconds>*
+        **Description:** Seconds an event must have been indexed before it is searched (default: 60)''',
+        require=False,
+        default=DEFAULT_LAG,
+        validate=validators.Integer(0)
+    )
+
+    overlap = Option(
+        doc='''
+        **Syntax:** **overlap=***<seconds>*
+        **Description:** Seconds before the watermark searched again (default: 300)''',
+        require=False,
+        default=DEFAULT_OVERLAP,
+        validate=validators.Integer(0)
+    )
+
+    catchup_window = Option(
+        doc='''
+        **Syntax:** **catchup_window=***<seconds>*
+        **Description:** Most seconds of _indextime scored per run (default: 900)''',
+        require=False,
+        default=DEFAULT_CATCHUP_WINDOW,
+        validate=validators.Integer(1)
+    )
+
+    max_backlog = Option(
+        doc='''
+        **Syntax:** **max_backlog=***<seconds>*
+        **Description:** Oldest _indextime, in seconds before now, scored after downtime (default: 86400)''',
+        require=False,
+        default=DEFAULT_MAX_BACKLOG,
+        validate=validators.Integer(1)
+    )
+
+    max_event_lag = Option(
+        doc='''
+        **Syntax:** **max_event_lag=***<seconds>*
+        **Description:** Most seconds an event's _time may precede its _indextime (default: 3600)''',
+        require=False,
+        default=DEFAULT_MAX_EVENT_LAG,
+        validate=validators.Integer(0)
+    )
+
+    retry_window = Option(
+        doc='''
+        **Syntax:** **retry_window=***<seconds>*
+        **Description:** Seconds a failed event holds the watermark (default: 900)''',
+        require=False,
+        default=DEFAULT_RETRY_WINDOW,
+        validate=validators.Integer(0)
+    )
+
+    def generate(self):
+        searchinfo = self.metadata.searchinfo
+        store = CheckpointStore(splunkd_connect(searchinfo.session_key, searchinfo.splunkd_uri))
+        now = time.time()
+        checkpoint = store.load(self.pipeline)
+        window = plan_window(checkpoint, now, self.lag, self.overlap,
+                             self.catchup_window, self.max_backlog)
+        if window['skipped']:
+            self.logger.warning(
+                "Scoring backlog for pipeline='{}' exceeds max_backlog={}: {} seconds of "
+                "indexed events were not scored".format(
+                    self.pipeline, self.max_backlog, window['skipped']))
+        store.save(pending_document(checkpoint, self.pipeline, window,
+                                    self.overlap, self.retry_window, now))
+        yield {
+            'search': window_search(window, self.max_event_lag),
+            'pipeline': self.pipeline,
+            'watermark': (checkpoint or {}).get('watermark') or '',
+            'index_earliest': window['index_earliest'],
+            'index_latest': window['index_latest'],
+            'backlog': window['backlog'],
+            'skipped': window['skipped'],
+        }
+
+
+if __name__ == '__main__':
+    dispatch(GenAIWatermarkCommand, sys.argv, sys.stdin, sys.stdout, __name__)
@@ -45,9 +45,11 @@ from sync_snow_asset import (
     make_snow_request,
     determine_approval_status,
     derive_inventory_status,
+    log_run_summary,
+    log_sampler,
 )
-
-import splunklib.client as client
+from ta_gen_ai_cim_splunkd import connect as splunkd_connect
+import ta_gen_ai_cim_perf as perf
 
 
 logger = setup_logging('pull_snow_inventory')
@@ -95,16 +97,17 @@ def build_kv_index(session_key, collection_name, key_field):
     Returns {asset_name_lower: record_dict, ...}
     """
     try:
-        service = client.connect(token=session_key, owner='nobody', app='TA-gen_ai_cim')
-        collection = service.kvstore[collection_name]
-        records = collection.data.query()
-        index = {}
-        for rec in records:
-            name = rec.get(key_field, '').lower().strip()
-            if name:
-                index[name] = rec
-        logger.info("Loaded {} existing KV store records from {}".format(len(index), collection_name))
-        return index
+        with perf.stage('kv'):
+            service = splunkd_connect(session_key)
+            collection = service.kvstore[collection_name]
+            records = collection.data.query()
+            index = {}
+            for rec in records:
+                name = rec.get(key_field, '').lower().strip()
+                if name:
+                    index[name] = rec
+            logger.info("Loaded {} existing KV store records from {}".format(len(index), collection_name))
+            return index
     except Exception as e:
         logger.error("Failed to load KV store index ({}): {}".format(collection_name, str(e)))
         return {}
@@ -114,42 +117,43 @@ def upsert_kv_record(session_key, collection_name, key_field, asset_name,
                      sys_id, approval_status, username, existing_record=None):
     """Insert or update a single KV store record."""
     try:
-        service = client.connect(token=session_key, owner='nobody', app='TA-gen_ai_cim')
-        collection = service.kvstore[collection_name]
-        now_epoch = int(time.time())
-        inventory_status = derive_inventory_status('found', approval_status)
-
-        if existing_record:
-            existing_key = existing_record.get('_key')
-            old_approval = existing_record.get('approval_status', '')
-            old_sys_id = existing_record.get('service_now_sys_id', '')
-
-            if old_approval == approval_status and old_sys_id == sys_id and existing_record.get('sync_status') == 'found':
-                return 'unchanged'
-
-            update_data = dict(existing_record)
-            update_data.pop('_key', None)
-            update_data['service_now_sys_id'] = sys_id
-            update_data['sync_status'] = 'found'
-            update_data['approval_status'] = approval_status
-            update_data['inventory_status'] = inventory_status
-            update_data['updated_at'] = now_epoch
-            update_data['updated_by'] = username
-            collection.data.update(existing_key, json.dumps(update_data))
-            return 'updated'
-        else:
-            record = {
-                key_field: asset_name,
-                'service_now_sys_id': sys_id,
-                'sync_status': 'found',
-                'approval_status': approval_status,
-                'inventory_status': inventory_status,
-                'created_at': now_epoch,
-                'updated_at': now_epoch,
-                'created_by': username,
-            }
-            collection.data.insert(json.dumps(record))
-            return 'inserted'
+        with perf.stage('kv'):
+            service = splunkd_connect(session_key)
+            collection = service.kvstore[collection_name]
+            now_epoch = int(time.time())
+            inventory_status = derive_inventory_status('found', approval_status)
+
+            if existing_record:
+                existing_key = existing_record.get('_key')
+                old_approval = existing_record.get('approval_status', '')
+                old_sys_id = existing_record.get('service_now_sys_id', '')
+
+                if old_approval == approval_status and old_sys_id == sys_id and existing_record.get('sync_status') == 'found':
+                    return 'unchanged'
+
+                update_data = dict(existing_record)
+                update_data.pop('_key', None)
+                update_data['service_now_sys_id'] = sys_id
+                update_data['sync_status'] = 'found'
+                update_data['approval_status'] = approval_status
+                update_data['inventory_status'] = inventory_status
+                update_data['updated_at'] = now_epoch
+                update_data['updated_by'] = username
+                collection.data.update(existing_key, json.dumps(update_data))
+                return 'updated'
+            else:
+                record = {
+                    key_field: asset_name,
+                    'service_now_sys_id': sys_id,
+                    'sync_status': 'found',
+                    'approval_status': approval_status,
+                    'inventory_status': inventory_status,
+                    'created_at': now_epoch,
+                    'updated_at': now_epoch,
+                    'created_by': username,
+                }
+                collection.data.insert(json.dumps(record))
+                return 'inserted'
 
     except Exception as e:
         logger.error("KV store upsert failed ({}, {}): {}".format(
@@ -189,13 +193,16 @@ def pull_table_inventory(session_key, snow_config, table_name, match_field,
 
         counters[result] = counters.get(result, 0) + 1
 
-        if result == 'inserted':
+        if result == 'inserted' and log_sampler.allow('inventory_inserted'):
             logger.info("Inserted {} '{}' (sys_id={}, approval={})".format(
                 label, asset_name, sys_id, approval))
-        elif result == 'updated':
+        elif result == 'updated' and log_sampler.allow('inventory_updated'):
             logger.info("Updated {} '{}' (sys_id={}, approval={})".format(
                 label, asset_name, sys_id, approval))
 
+    perf.incr('fetched', len(snow_records))
+    for name in ('inserted', 'updated', 'unchanged', 'errors'):
+        perf.incr(name, counters.get(name, 0))
     logger.info("=== {} inventory pull complete: inserted={}, updated={}, unchanged={}, errors={} ===".format(
         label, counters['inserted'], counters['updated'], counters['unchanged'], counters['errors']))
     return counters
@@ -228,12 +235,14 @@ def main():
         logger.error("No session_key in payload")
         sys.exit(1)
 
-    snow_config = get_snow_config(session_key)
+    with perf.stage('config_load'):
+        snow_config = get_snow_config(session_key)
     if not snow_config.get('configured'):
         logger.error("ServiceNow not configured: {}".format(snow_config.get('error')))
         sys.exit(1)
 
-    discovery_config = get_asset_discovery_config(session_key)
+    with perf.stage('config_load'):
+        discovery_config = get_asset_discovery_config(session_key)
 
     total_errors = 0
 
@@ -287,4 +296,8 @@ def main():
 
 
 if __name__ == '__main__':
-    main()
+    with perf.run('pull_snow_inventory'):
+        try:
+            main()
+        finally:
+            log_run_summary(logger)
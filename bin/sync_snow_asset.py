@@ -41,31 +41,43 @@ from urllib.request import Request, urlopen
 from urllib.error import HTTPError, URLError
 from urllib.parse import urlencode, quote
 
-import splunklib.client as client
+bin_path = os.path.dirname(os.path.abspath(__file__))
+if bin_path not in sys.path:
+    sys.path.insert(0, bin_path)
+
+from ta_gen_ai_cim_splunkd import connect as splunkd_connect
+from ta_gen_ai_cim_credentials import find_passwords, get_lookup_stats, get_password
+import ta_gen_ai_cim_perf as perf
+from ta_gen_ai_cim_logging import LogSampler, setup_logger
 
 
 def setup_logging(log_name='sync_snow_asset'):
     """Setup logging for the alert action.
 
-    Uses a named logger with its own FileHandler so that importers
+    Uses a named logger with its own log file so that importers
     (e.g. pull_snow_inventory) can configure independent log files
-    without being silently overridden by basicConfig.
+    without being silently overridden by basicConfig. Records are written
+    by a background thread (ta_gen_ai_cim_logging.py), so ServiceNow and KV
+    Store loops do not wait on the file.
     """
-    import logging
-    _logger = logging.getLogger(log_name)
-    if not _logger.handlers:
-        _logger.setLevel(logging.INFO)
-        log_file = os.path.join(
-            os.environ.get('SPLUNK_HOME', '/opt/splunk'),
-            'var', 'log', 'splunk', '{}.log'.format(log_name))
-        handler = logging.FileHandler(log_file, mode='a')
-        handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
-        _logger.addHandler(handler)
-    return _logger
+    log_file = os.path.join(
+        os.environ.get('SPLUNK_HOME', '/opt/splunk'),
+        'var', 'log', 'splunk', '{}.log'.format(log_name))
+    return setup_logger(log_name, log_file)
+
+
+def log_run_summary(script_logger):
+    """Log how many per-record lines were seen and written, by kind."""
+    script_logger.info("Run summary: per_record_log_lines={}".format(
+        json.dumps(log_sampler.summary(), sort_keys=True)))
 
 
 logger = setup_logging('sync_snow_asset')
 
+# Per-record INFO lines (one per ServiceNow request, KV write or fetched
+# record) are sampled; log_run_summary() reports the totals.
+log_sampler = LogSampler()
+
 
 def get_snow_config(session_key, service=None):
     """Retrieve ServiceNow configuration from account configuration.
@@ -81,11 +93,7 @@ def get_snow_config(session_key, service=None):
     """
     try:
         if service is None:
-            service = client.connect(
-                token=session_key,
-                owner='nobody',
-                app='TA-gen_ai_cim'
-            )
+            service = splunkd_connect(session_key)
 
         # Get account configuration from ta_gen_ai_cim_account.conf
         account_conf = None
@@ -121,30 +129,36 @@ def get_snow_config(session_key, service=None):
         # Extract instance from URL
         instance = url.replace('https://', '').replace('http://', '').replace('.service-now.com', '').strip('/')
         
-        # Get passwords from storage/passwords
-        password = None
-        client_secret = None
+        # Get passwords from storage/passwords. The account handler and the
+        # Configuration page store them as <realm>:password: and
+        # <realm>:client_secret:, so fetch those entities directly instead
+        # of listing every credential on the search head.
         realm = 'ta_gen_ai_cim_account__' + account_name
         
         logger.info("Looking for passwords with realm: {}".format(realm))
         
-        storage_passwords = service.storage_passwords
-        for credential in storage_passwords:
-            cred_realm = credential.content.get('realm', '')
-            if cred_realm == realm:
-                cred_name = credential.content.get('username', '') or ''
-                if ':' in credential.name:
-                    parts = credential.name.split(':')
-                    if len(parts) > 1:
-                        cred_name = parts[1]
-                clear_password = credential.content.get('clear_password', '')
-                logger.info("Found credential: name={}, realm={}".format(cred_name, cred_realm))
-                if cred_name == 'password' or 'password' in credential.name:
-                    password = clear_password
-                    logger.info("Found password credential")
-                elif cred_name == 'client_secret' or 'client_secret' in credential.name:
-                    client_secret = clear_password
-                    logger.info("Found client_secret credential")
+        with perf.stage('credential'):
+            password = get_password(service, realm, 'password')
+            client_secret = None
+            if auth_type in ['oauth_auth_code', 'oauth_client_creds']:
+                client_secret = get_password(service, realm, 'client_secret')
+        
+            if password is None and client_secret is None:
+                # Credentials saved under other names: list only this realm
+                for cred_entity, content in find_passwords(service, realm).items():
+                    cred_name = content.get('username', '') or ''
+                    clear_password = content.get('clear_password', '')
+                    logger.info("Found credential: name={}, realm={}".format(cred_name, realm))
+                    if cred_name == 'password' or 'password' in cred_entity:
+                        password = clear_password
+                    elif cred_name == 'client_secret' or 'client_secret' in cred_entity:
+                        client_secret = clear_password
+        
+        if password is not None:
+            logger.info("Found password credential")
+        if client_secret is not None:
+            logger.info("Found client_secret credential")
+        logger.info("Credential lookup stats: {}".format(json.dumps(get_lookup_stats())))
         
         if not password and auth_type == 'basic':
             logger.warning("No password found for account {}".format(account_name))
@@ -215,11 +229,7 @@ def get_asset_discovery_config(session_key):
         'ai_model_approved_values': 'approved',
     }
     try:
-        service = client.connect(
-            token=session_key,
-            owner='nobody',
-            app='TA-gen_ai_cim'
-        )
+        service = splunkd_connect(session_key)
         accounts = service.confs['ta_gen_ai_cim_account']
         if 'asset_discovery' in accounts:
             content = accounts['asset_discovery'].content
@@ -320,9 +330,10 @@ def get_oauth_token(config):
     req = Request(token_url, data=body, headers=headers)
 
     try:
-        ssl_context = ssl.create_default_context()
-        response = urlopen(req, context=ssl_context, timeout=30)
-        response_data = response.read().decode('utf-8')
+        with perf.stage('http'):
+            ssl_context = ssl.create_default_context()
+            response = urlopen(req, context=ssl_context, timeout=30)
+            response_data = response.read().decode('utf-8')
 
         token_response = json.loads(response_data)
         access_token = token_response.get('access_token')
@@ -352,10 +363,11 @@ def make_snow_request(method, url, data=None, config=None):
     base_url = 'https://{}.service-now.com'.format(config['instance'])
     full_url = base_url + url
     
-    # Debug: Log the request details
-    logger.info("ServiceNow API Request - Method: {}, URL: {}".format(method, full_url))
-    logger.info("ServiceNow API Request - Username: {}".format(config.get('username', 'NOT SET')))
-    
+    auth_type = config.get('auth_type', 'basic')
+    if log_sampler.allow('snow_request'):
+        logger.info("ServiceNow API Request - Method: {}, URL: {}, Auth Type: {}".format(
+            method, full_url, auth_type))
+
     # Prepare request headers
     headers = {
         'Content-Type': 'application/json',
@@ -363,9 +375,6 @@ def make_snow_request(method, url, data=None, config=None):
     }
     
     # Set authentication based on auth type
-    auth_type = config.get('auth_type', 'basic')
-    logger.info("ServiceNow API Request - Auth Type: {}".format(auth_type))
-    
     if auth_type == 'oauth':
         # OAuth 2.0 Bearer token
         access_token = get_oauth_token(config)
@@ -375,7 +384,6 @@ def make_snow_request(method, url, data=None, config=None):
         auth_string = '{}:{}'.format(config['username'], config['password'])
         auth_bytes = base64.b64encode(auth_string.encode('utf-8')).decode('utf-8')
         headers['Authorization'] = 'Basic {}'.format(auth_bytes)
-        logger.info("ServiceNow API Request - Auth header set (Basic auth)")
 
     # Prepare data
     body = None
@@ -387,10 +395,12 @@ def make_snow_request(method, url, data=None, config=None):
 
     # Make request with SSL context
     try:
-        ssl_context = ssl.create_default_context()
-        response = urlopen(req, context=ssl_context, timeout=30)
-        response_data = response.read().decode('utf-8')
-        return json.loads(response_data)
+        with perf.stage('http'):
+            ssl_context = ssl.create_default_context()
+            response = urlopen(req, context=ssl_context, timeout=30)
+            response_data = response.read().decode('utf-8')
+        with perf.stage('parse'):
+            return json.loads(response_data)
     except HTTPError as e:
         error_body = e.read().decode('utf-8')
         raise Exception('ServiceNow API error {}: {}'.format(e.code, error_body))
@@ -409,19 +419,16 @@ def get_kv_store_record(session_key, asset_name, collection_name='gen_ai_app_ass
         key_field: field name used as the unique key
     """
     try:
-        service = client.connect(
-            token=session_key,
-            owner='nobody',
-            app='TA-gen_ai_cim'
-        )
-        collection = service.kvstore[collection_name]
-
-        query = json.dumps({key_field: asset_name})
-        results = collection.data.query(query=query)
-
-        if results and len(results) > 0:
-            return results[0]
-        return None
+        with perf.stage('kv'):
+            service = splunkd_connect(session_key)
+            collection = service.kvstore[collection_name]
+
+            query = json.dumps({key_field: asset_name})
+            results = collection.data.query(query=query)
+
+            if results and len(results) > 0:
+                return results[0]
+            return None
 
     except Exception as e:
         logger.error("KV Store lookup failed ({}): {}".format(collection_name, str(e)))
@@ -434,30 +441,28 @@ def save_kv_store_record(session_key, asset_name, sys_id, sync_status, username,
                          key_field='gen_ai_app_name'):
     """Save mapping to KV Store."""
     try:
-        service = client.connect(
-            token=session_key,
-            owner='nobody',
-            app='TA-gen_ai_cim'
-        )
-        collection = service.kvstore[collection_name]
-
-        now_epoch = int(time.time())
-        inventory_status = derive_inventory_status(sync_status, approval_status)
-        record = {
-            key_field: asset_name,
-            'service_now_sys_id': sys_id,
-            'sync_status': sync_status,
-            'approval_status': approval_status,
-            'inventory_status': inventory_status,
-            'created_at': now_epoch,
-            'updated_at': now_epoch,
-            'created_by': username
-        }
+        with perf.stage('kv'):
+            service = splunkd_connect(session_key)
+            collection = service.kvstore[collection_name]
+
+            now_epoch = int(time.time())
+            inventory_status = derive_inventory_status(sync_status, approval_status)
+            record = {
+                key_field: asset_name,
+                'service_now_sys_id': sys_id,
+                'sync_status': sync_status,
+                'approval_status': approval_status,
+                'inventory_status': inventory_status,
+                'created_at': now_epoch,
+                'updated_at': now_epoch,
+                'created_by': username
+            }
 
-        collection.data.insert(json.dumps(record))
-        logger.info("Saved KV Store record ({}): {}={}, sys_id={}, status={}, approval={}, inventory={}".format(
-            collection_name, key_field, asset_name, sys_id, sync_status, approval_status, inventory_status))
-        return True
+            collection.data.insert(json.dumps(record))
+            if log_sampler.allow('kv_save'):
+                logger.info("Saved KV Store record ({}): {}={}, sys_id={}, status={}, approval={}, inventory={}".format(
+                    collection_name, key_field, asset_name, sys_id, sync_status, approval_status, inventory_status))
+            return True
 
     except Exception as e:
         logger.error("KV Store save failed ({}): {}".format(collection_name, str(e)))
@@ -477,37 +482,35 @@ def update_kv_store_record(session_key, key, sys_id, sync_status, username,
     original creation metadata and the asset key field are never lost.
     """
     try:
-        service = client.connect(
-            token=session_key,
-            owner='nobody',
-            app='TA-gen_ai_cim'
-        )
-        collection = service.kvstore[collection_name]
-
-        now_epoch = int(time.time())
-
-        if existing_record:
-            update_data = dict(existing_record)
-            update_data.pop('_key', None)
-        else:
-            update_data = {}
-
-        update_data['service_now_sys_id'] = sys_id
-        update_data['sync_status'] = sync_status
-        update_data['updated_at'] = now_epoch
-        update_data['updated_by'] = username
-        if approval_status is not None:
-            update_data['approval_status'] = approval_status
-        if key_field and asset_name is not None:
-            update_data[key_field] = asset_name
+        with perf.stage('kv'):
+            service = splunkd_connect(session_key)
+            collection = service.kvstore[collection_name]
 
-        final_approval = approval_status if approval_status is not None else update_data.get('approval_status', 'unknown')
-        update_data['inventory_status'] = derive_inventory_status(sync_status, final_approval)
+            now_epoch = int(time.time())
 
-        collection.data.update(key, json.dumps(update_data))
-        logger.info("Updated KV Store record ({}): _key={}, sys_id={}, status={}, approval={}, inventory={}".format(
-            collection_name, key, sys_id, sync_status, approval_status, update_data['inventory_status']))
-        return True
+            if existing_record:
+                update_data = dict(existing_record)
+                update_data.pop('_key', None)
+            else:
+                update_data = {}
+
+            update_data['service_now_sys_id'] = sys_id
+            update_data['sync_status'] = sync_status
+            update_data['updated_at'] = now_epoch
+            update_data['updated_by'] = username
+            if approval_status is not None:
+                update_data['approval_status'] = approval_status
+            if key_field and asset_name is not None:
+                update_data[key_field] = asset_name
+
+            final_approval = approval_status if approval_status is not None else update_data.get('approval_status', 'unknown')
+            update_data['inventory_status'] = derive_inventory_status(sync_status, final_approval)
+
+            collection.data.update(key, json.dumps(update_data))
+            if log_sampler.allow('kv_update'):
+                logger.info("Updated KV Store record ({}): _key={}, sys_id={}, status={}, approval={}, inventory={}".format(
+                    collection_name, key, sys_id, sync_status, approval_status, update_data['inventory_status']))
+            return True
 
     except Exception as e:
         logger.error("KV Store update failed ({}): {}".format(collection_name, str(e)))
@@ -818,13 +821,15 @@ def main():
         sys.exit(1)
     
     # Get ServiceNow configuration
-    snow_config = get_snow_config(session_key)
+    with perf.stage('config_load'):
+        snow_config = get_snow_config(session_key)
     if not snow_config.get('configured'):
         logger.error("ServiceNow not configured: {}".format(snow_config.get('error')))
         sys.exit(1)
 
     # Load asset discovery configuration
-    discovery_config = get_asset_discovery_config(session_key)
+    with perf.stage('config_load'):
+        discovery_config = get_asset_discovery_config(session_key)
 
     # Process results from the search
     results_file = payload.get('results_file')
@@ -912,6 +917,9 @@ def main():
     
     logger.info("Sync complete: processed={}, success={}, errors={}".format(
         processed_count, success_count, error_count))
+    perf.incr('processed', processed_count)
+    perf.incr('success', success_count)
+    perf.incr('errors', error_count)
     
     # Exit with appropriate code
     if error_count > 0 and success_count == 0:
@@ -920,4 +928,8 @@ def main():
 
 
 if __name__ == '__main__':
-    main()
+    with perf.run('sync_snow_asset'):
+        try:
+            main()
+        finally:
+            log_run_summary(logger)
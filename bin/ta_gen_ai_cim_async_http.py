@@ -0,0 +1,243 @@
+#!/usr/bin/env python
+# encoding=utf-8
+"""
+ta_gen_ai_cim_async_http.py - Non-blocking HTTP/1.1 client for genaiscore
+
+genaiscore keeps hundreds of LLM requests in flight from one process. A
+thread per request costs a stack and a blocked OS thread each; this module
+sends requests on asyncio streams instead, so in-flight requests cost a
+socket and a coroutine.
+
+Only what the LLM providers need is implemented: POST with a JSON body,
+Content-Length or chunked responses, keep-alive connections pooled per
+(scheme, host, port), and a total timeout per request. Cancelling the
+awaiting task closes its connection, so a cancelled request stops at once.
+TLS uses the caller's ssl.SSLContext.
+
+Requests that must go through an HTTP(S) proxy (https_proxy / http_proxy
+environment, honoring no_proxy) are not handled here; uses_proxy() tells the
+caller to send those with urllib instead.
+
+Usage:
+    from ta_gen_ai_cim_async_http import ConnectionPool
+    pool = ConnectionPool(max_idle_per_host=16)
+    response = await pool.post(url, headers, body, ssl_context=ctx, timeout=120)
+    response.status, response.headers['content-type'], response.body
+    await pool.close()
+
+Copyright 2026 Splunk Inc.
+Licensed under Apache License 2.0
+"""
+
+import asyncio
+import functools
+import urllib.parse
+import urllib.request
+from collections import deque
+
+MAX_HEADER_BYTES = 64 * 1024
+DEFAULT_MAX_IDLE_PER_HOST = 16
+
+
+class HTTPResponse(object):
+    """Status, lower-cased headers and the complete body of a response."""
+
+    def __init__(self, status, reason, headers, body):
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+
+
+def uses_proxy(url):
+    """Return True when urllib would send *url* through a proxy."""
+    parts = urllib.parse.urlsplit(url)
+    return _uses_proxy(parts.scheme, parts.hostname or '')
+
+
+@functools.lru_cache(maxsize=64)
+def _uses_proxy(scheme, host):
+    # getproxies() scans the whole environment; the answer is fixed for the
+    # life of the process, so it is computed once per origin.
+    if scheme not in urllib.request.getproxies():
+        return False
+    return not urllib.request.proxy_bypass(host)
+
+
+class _NotAnswered(Exception):
+    """A request failed before any byte of its response arrived."""
+
+    def __init__(self, error):
+        Exception.__init__(self, str(error))
+        self.error = error
+
+
+class _Connection(object):
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    def close(self):
+        self.writer.close()
+
+    async def wait_closed(self):
+        """Close the connection and wait for the transport to finish."""
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except (ConnectionError, OSError):
+            pass
+
+
+class ConnectionPool(object):
+    """Keep-alive connections per origin, shared by all requests on one loop."""
+
+    def __init__(self, max_idle_per_host=DEFAULT_MAX_IDLE_PER_HOST):
+        self.max_idle_per_host = max_idle_per_host
+        self._idle = {}
+        self.stats = {'requests': 0, 'connections_opened': 0, 'connections_reused': 0}
+
+    @staticmethod
+    def _origin(parts):
+        if parts.scheme not in ('http', 'https'):
+            raise ValueError("Unsupported URL scheme '{}'".format(parts.scheme))
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        return parts.scheme, parts.hostname, port
+
+    async def _acquire(self, origin, ssl_context, reuse=True):
+        """Return (connection, reused)."""
+        idle = self._idle.get(origin)
+        while reuse and idle:
+            connection = idle.pop()
+            if not connection.reader.at_eof() and not connection.writer.is_closing():
+                self.stats['connections_reused'] += 1
+                return connection, True
+            connection.close()
+        scheme, host, port = origin
+        reader, writer = await asyncio.open_connection(
+            host, port, ssl=(ssl_context or True) if scheme == 'https' else None,
+            server_hostname=host if scheme == 'https' else None,
+            limit=MAX_HEADER_BYTES)
+        self.stats['connections_opened'] += 1
+        return _Connection(reader, writer), False
+
+    def _release(self, origin, connection):
+        idle = self._idle.setdefault(origin, deque())
+        if len(idle) >= self.max_idle_per_host:
+            connection.close()
+        else:
+            idle.append(connection)
+
+    async def post(self, url, headers, body, ssl_context=None, timeout=120):
+        """POST *body* (bytes) to *url* and return an HTTPResponse."""
+        return await asyncio.wait_for(
+            self._post(url, headers, body, ssl_context), timeout=timeout)
+
+    async def _post(self, url, headers, body, ssl_context):
+        parts = urllib.parse.urlsplit(url)
+        origin = self._origin(parts)
+        target = parts.path or '/'
+        if parts.query:
+            target += '?' + parts.query
+        host = parts.hostname if ':' not in parts.hostname else '[{}]'.format(parts.hostname)
+        if parts.port:
+            host += ':{}'.format(parts.port)
+
+        lines = ['POST {} HTTP/1.1'.format(target), 'Host: {}'.format(host),
+                 'Content-Length: {}'.format(len(body)), 'Connection: keep-alive',
+                 'Accept-Encoding: identity']
+        for name, value in headers.items():
+            lines.append('{}: {}'.format(name, value))
+        request = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body
+
+        self.stats['requests'] += 1
+        connection, reused = await self._acquire(origin, ssl_context)
+        try:
+            return await self._exchange(origin, connection, request)
+        except _NotAnswered as e:
+            if not reused:
+                raise e.error from None
+        # The server closed an idle keep-alive connection before sending any
+        # of a response; retry once on a new one. A response cut off after
+        # its first byte is not retried: the provider has seen the prompt.
+        connection, _ = await self._acquire(origin, ssl_context, reuse=False)
+        try:
+            return await self._exchange(origin, connection, request)
+        except _NotAnswered as e:
+            raise e.error from None
+
+    async def _exchange(self, origin, connection, request):
+        """Send *request* on *connection* and return its response.
+
+        Raises _NotAnswered when the connection failed before the first
+        byte of the status line arrived.
+        """
+        try:
+            try:
+                connection.writer.write(request)
+                await connection.writer.drain()
+                first = await connection.reader.readexactly(1)
+            except (asyncio.IncompleteReadError, ConnectionError) as e:
+                raise _NotAnswered(e)
+            response, reusable = await self._read_response(connection.reader, first)
+        except asyncio.CancelledError:
+            # A cancelled request never returns its connection to the pool:
+            # the peer may still be sending the old response.
+            connection.close()
+            raise
+        except BaseException:
+            await connection.wait_closed()
+            raise
+        if reusable:
+            self._release(origin, connection)
+        else:
+            await connection.wait_closed()
+        return response
+
+    async def _read_response(self, reader, first=b''):
+        # Interim 1xx responses (100 Continue, 103 Early Hints) carry no body
+        # and are followed by the final response.
+        while True:
+            head = first + await reader.readuntil(b'\r\n\r\n')
+            first = b''
+            status_line, _, header_block = head.decode('latin-1').partition('\r\n')
+            version, _, rest = status_line.partition(' ')
+            code, _, reason = rest.partition(' ')
+            if not 100 <= int(code) < 200:
+                break
+        headers = {}
+        for line in header_block.split('\r\n'):
+            if ':' in line:
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip()
+
+        keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+        if int(code) in (204, 304):
+            body = b''
+        elif headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size_line = await reader.readuntil(b'\r\n')
+                size = int(size_line.split(b';', 1)[0].strip(), 16)
+                if size == 0:
+                    # Skip trailers up to the blank line
+                    while (await reader.readuntil(b'\r\n')) != b'\r\n':
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            body = b''.join(chunks)
+        elif 'content-length' in headers:
+            body = await reader.readexactly(int(headers['content-length']))
+        else:
+            body = await reader.read()
+            keep_alive = False
+        return HTTPResponse(int(code), reason, headers, body), keep_alive
+
+    async def close(self):
+        """Close every idle connection."""
+        for idle in self._idle.values():
+            while idle:
+                await idle.pop().wait_closed()
+        self._idle.clear()
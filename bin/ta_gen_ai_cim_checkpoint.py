@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+# encoding=utf-8
+"""
+ta_gen_ai_cim_checkpoint.py - _indextime watermarks for the scoring pipeline searches
+
+A scoring search that selects events by event time (earliest=-1m@m) never
+sees an event indexed after its minute has been searched, and two runs
+whose minutes overlap score the same event twice. This module keeps one
+checkpoint per pipeline in the gen_ai_scoring_checkpoint KV Store
+collection instead:
+
+    watermark         _indextime up to which events have been handled
+    pending_earliest  _indextime window handed to the current run by
+    pending_latest    genaiwatermark
+    recent_ids        JSON {gen_ai.event.id: _indextime} of events handled
+                      within overlap seconds of the watermark
+
+plan_window() picks the next window: from overlap seconds before the
+watermark (events indexed just before it may not have been searchable
+yet) to lag seconds before now, at most catchup_window seconds past the
+watermark per run and never reaching back more than max_backlog seconds.
+genaiscore skips events listed in recent_ids and, when the run finishes,
+commits the new watermark with CheckpointRun.commit(). Events that failed
+hold the watermark at their _indextime for up to retry_window seconds, so
+an LLM outage delays scoring rather than dropping events. Events deferred
+by genaiscore's time_budget hold it until they are scored.
+
+Usage:
+    from ta_gen_ai_cim_checkpoint import CheckpointStore, CheckpointRun, plan_window
+    store = CheckpointStore(service)
+    checkpoint = store.load('pipeline_1')                        # or None
+    window = plan_window(checkpoint, time.time())               # genaiwatermark
+    run = CheckpointRun(checkpoint)                              # genaiscore
+    if not run.seen(event_id): ...; run.done(event_id, indextime)
+    store.save(run.commit(time.time()))
+
+Copyright 2026 Splunk Inc.
+Licensed under Apache License 2.0
+"""
+
+import json
+import time
+
+KV_COLLECTION = 'gen_ai_scoring_checkpoint'
+DEFAULT_LAG = 60
+DEFAULT_OVERLAP = 300
+DEFAULT_CATCHUP_WINDOW = 900
+DEFAULT_MAX_BACKLOG = 86400
+DEFAULT_MAX_EVENT_LAG = 3600
+DEFAULT_RETRY_WINDOW = 900
+# First run of a pipeline: the minute before lag, as the event-time search did
+INITIAL_WINDOW = 60
+MAX_RECENT_IDS = 50000
+
+
+def _int(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _fields(document):
+    """Return a KV Store document without its read-only _user field."""
+    return dict((k, v) for k, v in (document or {}).items() if k == '_key' or not k.startswith('_'))
+
+
+def plan_window(checkpoint, now, lag=DEFAULT_LAG, overlap=DEFAULT_OVERLAP,
+                catchup_window=DEFAULT_CATCHUP_WINDOW, max_backlog=DEFAULT_MAX_BACKLOG):
+    """Return the _indextime window the next run of a pipeline should score.
+
+    The result has index_earliest and index_latest (epoch seconds),
+    backlog (seconds of indexed data not yet handled, including this
+    window) and skipped (seconds older than max_backlog given up on).
+    """
+    ready = int(now) - lag
+    watermark = _int((checkpoint or {}).get('watermark'))
+    floor = ready - max_backlog
+    if watermark is None:
+        start = earliest = ready - INITIAL_WINDOW
+        skipped = 0
+    else:
+        start = max(watermark, floor)
+        earliest = max(watermark - overlap, floor)
+        skipped = max(0, floor - watermark)
+    latest = max(earliest, min(ready, start + catchup_window))
+    return {
+        'index_earliest': earliest,
+        'index_latest': latest,
+        'backlog': max(0, ready - start),
+        'skipped': skipped,
+    }
+
+
+def window_search(window, max_event_lag=DEFAULT_MAX_EVENT_LAG):
+    """Return the search terms selecting *window*'s events.
+
+    earliest= bounds the buckets scanned: events whose _time is more than
+    max_event_lag seconds older than their window are not found.
+    """
+    return '_index_earliest={} _index_latest={} earliest={} latest=now'.format(
+        window['index_earliest'], window['index_latest'],
+        window['index_earliest'] - max_event_lag)
+
+
+class CheckpointStore(object):
+    """Checkpoints in the gen_ai_scoring_checkpoint KV Store collection,
+    one document per pipeline keyed by the pipeline stanza name."""
+
+    def __init__(self, service):
+        self._data = service.kvstore[KV_COLLECTION].data
+
+    def load(self, pipeline):
+        documents = self._data.query(query=json.dumps({'_key': pipeline}), limit=1)
+        return documents[0] if documents else None
+
+    def save(self, document):
+        self._data.batch_save(document)
+
+
+def pending_document(checkpoint, pipeline, window, overlap=DEFAULT_OVERLAP,
+                     retry_window=DEFAULT_RETRY_WINDOW, now=None):
+    """Return *checkpoint* (or a new one) with *window* recorded as pending."""
+    document = dict(_fields(checkpoint), _key=pipeline, pipeline=pipeline)
+    document.update({
+        'pending_earliest': window['index_earliest'],
+        'pending_latest': window['index_latest'],
+        'overlap': overlap,
+        'retry_window': retry_window,
+        'updated_at': int(now if now is not None else time.time()),
+    })
+    document.setdefault('watermark', None)
+    document.setdefault('recent_ids', '{}')
+    return document
+
+
+class CheckpointRun(object):
+    """Events handled by one genaiscore run against its pending window."""
+
+    def __init__(self, checkpoint):
+        self.checkpoint = checkpoint
+        self.watermark = _int(checkpoint.get('watermark'))
+        self.pending_latest = _int(checkpoint.get('pending_latest'))
+        self.overlap = _int(checkpoint.get('overlap'))
+        if self.overlap is None:
+            self.overlap = DEFAULT_OVERLAP
+        self.retry_window = _int(checkpoint.get('retry_window'))
+        if self.retry_window is None:
+            self.retry_window = DEFAULT_RETRY_WINDOW
+        try:
+            recent = json.loads(checkpoint.get('recent_ids') or '{}')
+        except (TypeError, ValueError):
+            recent = {}
+        if not isinstance(recent, dict):
+            recent = {}
+        self._recent = dict((i, _int(t)) for i, t in recent.items() if _int(t) is not None)
+        self._done = {}
+        self._failed = []
+        self._deferred = []
+        self.stats = {'duplicates': 0, 'done': 0, 'failed': 0, 'deferred': 0, 'held': 0}
+
+    @property
+    def ready(self):
+        """True when genaiwatermark recorded a window for this run."""
+        return self.pending_latest is not None
+
+    def seen(self, event_id):
+        """True if *event_id* was handled by an earlier run."""
+        if event_id in self._recent:
+            self.stats['duplicates'] += 1
+            return True
+        return False
+
+    def done(self, event_id, indextime):
+        self.stats['done'] += 1
+        indextime = _int(indextime)
+        if event_id and indextime is not None:
+            self._done[event_id] = indextime
+
+    def failed(self, event_id, indextime):
+        self.stats['failed'] += 1
+        indextime = _int(indextime)
+        if indextime is not None:
+            self._failed.append(indextime)
+
+    def deferred(self, indextime):
+        """Record an event left unscored for the next run."""
+        self.stats['deferred'] += 1
+        indextime = _int(indextime)
+        if indextime is not None:
+            self._deferred.append(indextime)
+
+    def commit(self, now=None):
+        """Return the checkpoint document recording this run's outcome and
+        clearing its pending window."""
+        now = int(now if now is not None else time.time())
+        held = [t for t in self._failed if t >= now - self.retry_window] + self._deferred
+        watermark = min([self.pending_latest] + held)
+        if self.watermark is not None:
+            watermark = max(watermark, self.watermark)
+        self.stats['held'] = max(0, self.pending_latest - watermark)
+
+        recent = dict(self._recent)
+        recent.update(self._done)
+        cutoff = watermark - self.overlap
+        kept = sorted(((t, i) for i, t in recent.items() if t >= cutoff), reverse=True)
+
+        document = _fields(self.checkpoint)
+        document.update({
+            'watermark': watermark,
+            'pending_earliest': None,
+            'pending_latest': None,
+            'recent_ids': json.dumps(dict((i, t) for t, i in kept[:MAX_RECENT_IDS]),
+                                     separators=(',', ':')),
+            'updated_at': now,
+        })
+        return document
@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+# encoding=utf-8
+"""
+ta_gen_ai_cim_credentials.py - Shared storage/passwords resolver
+
+Iterating service.storage_passwords downloads and Atom/XML-parses every
+credential visible in the namespace. On search heads where other apps store
+thousands of credentials, that is paid on every ServiceNow config read and
+every genaiscore run just to find one or two secrets.
+
+get_password() fetches a single credential by its exact entity path
+(storage/passwords/<realm>:<name>:) with output_mode=json.
+find_passwords() lists one realm with a search= filter, paging through the
+results, for callers that do not know the credential names. Resolved
+passwords are cached per process for CACHE_TTL seconds, and every lookup is
+timed; get_lookup_stats() returns the counters for logging or the search
+inspector.
+
+Usage:
+    from ta_gen_ai_cim_credentials import get_password, find_passwords
+    api_key = get_password(service, 'mltk_llm_tokens', 'OpenAI')
+    secrets = find_passwords(service, 'ta_gen_ai_cim_account__prod')
+
+Copyright 2026 Splunk Inc.
+Licensed under Apache License 2.0
+"""
+
+import json
+import os
+import sys
+import time
+from urllib.parse import quote
+
+app_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+lib_path = os.path.join(app_root, 'lib')
+if lib_path not in sys.path:
+    sys.path.insert(0, lib_path)
+
+
+CACHE_TTL = 300
+PAGE_SIZE = 100
+
+# (app, owner, realm, name) -> (expires_at, clear_password)
+_cache = {}
+
+_stats = {
+    'lookups': 0,
+    'cache_hits': 0,
+    'requests': 0,
+    'not_found': 0,
+    'total_ms': 0.0,
+    'max_ms': 0.0,
+}
+
+
+def _escape(part):
+    """Escape a realm or user name the way splunkd builds entity names."""
+    return part.replace('\\', '\\\\').replace(':', '\\:')
+
+
+def entity_name(realm, name):
+    """Return the storage/passwords entity name for (realm, name)."""
+    return '{}:{}:'.format(_escape(realm or ''), _escape(name))
+
+
+def _cache_key(service, realm, name):
+    namespace = getattr(service, 'namespace', None) or {}
+    return (namespace.get('app'), namespace.get('owner'), realm, name)
+
+
+def _get_json(service, path_segment, **query):
+    """GET a splunkd endpoint with output_mode=json and return the decoded body."""
+    from splunklib.binding import UrlEncoded
+
+    start = time.time()
+    try:
+        response = service.get(UrlEncoded(path_segment, skip_encode=True),
+                               output_mode='json', **query)
+        return json.loads(response.body.read())
+    finally:
+        elapsed_ms = (time.time() - start) * 1000.0
+        _stats['requests'] += 1
+        _stats['total_ms'] += elapsed_ms
+        _stats['max_ms'] = max(_stats['max_ms'], elapsed_ms)
+
+
+def get_password(service, realm, name, ttl=CACHE_TTL):
+    """Return the clear password stored as realm:name:, or None if it does not exist.
+
+    Args:
+        service: splunklib Service; its app/owner namespace is used for the lookup
+        realm: credential realm
+        name: credential user name
+        ttl: seconds a resolved password is reused within this process
+
+    Raises splunklib.binding.HTTPError for errors other than 404.
+    """
+    from splunklib.binding import HTTPError
+
+    _stats['lookups'] += 1
+    key = _cache_key(service, realm, name)
+    cached = _cache.get(key)
+    if cached is not None and cached[0] > time.time():
+        _stats['cache_hits'] += 1
+        return cached[1]
+
+    path = 'storage/passwords/' + quote(entity_name(realm, name), safe='')
+    try:
+        body = _get_json(service, path)
+    except HTTPError as e:
+        if e.status == 404:
+            _stats['not_found'] += 1
+            return None
+        raise
+
+    entries = body.get('entry') or []
+    if not entries:
+        _stats['not_found'] += 1
+        return None
+
+    password = entries[0].get('content', {}).get('clear_password')
+    _cache[key] = (time.time() + ttl, password)
+    return password
+
+
+def find_passwords(service, realm, page_size=PAGE_SIZE):
+    """Return {entity name: content} for every credential in *realm*.
+
+    Filters server-side with search=realm=<realm> and pages with
+    count/offset, so only the matching credentials are transferred. The
+    realm is re-checked on each entry because search= is a substring match.
+    """
+    _stats['lookups'] += 1
+    credentials = {}
+    offset = 0
+    while True:
+        body = _get_json(service, 'storage/passwords',
+                         search='realm={}'.format(realm),
+                         count=page_size, offset=offset)
+        entries = body.get('entry') or []
+        for entry in entries:
+            content = entry.get('content', {})
+            if content.get('realm') == realm:
+                credentials[entry.get('name', '')] = content
+                _cache[_cache_key(service, realm, content.get('username', ''))] = (
+                    time.time() + CACHE_TTL, content.get('clear_password'))
+        offset += len(entries)
+        total = (body.get('paging') or {}).get('total', 0)
+        if not entries or offset >= total:
+            break
+    return credentials
+
+
+def get_lookup_stats():
+    """Return a copy of this process's lookup counters and latency (milliseconds)."""
+    stats = dict(_stats)
+    stats['avg_ms'] = round(stats['total_ms'] / stats['requests'], 2) if stats['requests'] else 0.0
+    stats['total_ms'] = round(stats['total_ms'], 2)
+    stats['max_ms'] = round(stats['max_ms'], 2)
+    return stats
+
+
+def clear_cache():
+    """Drop every cached password (e.g. after credentials are rotated)."""
+    _cache.clear()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+# encoding=utf-8
+"""
+ta_gen_ai_cim_llm_routing.py - Connection health and routing for genaiscore
+
+Tracks every AI Toolkit connection a scoring pipeline may use and decides
+which one to call first, when to send a hedged duplicate to a second
+connection, and which connections to stop calling for a while.
+
+- Latency: an exponentially weighted moving average (EWMA) per connection
+  orders healthy connections (fastest first); connections without samples
+  keep their configured order ahead of measured ones so each gets tried.
+- Hedging: hedge_delay() returns the connection's recent latency percentile
+  (p95 by default), so a duplicate is only sent when the primary is slower
+  than it usually is.
+- Circuit breaker: after failure_threshold consecutive failures a connection
+  is skipped for cooldown seconds, then allowed one trial request
+  (half-open); success closes the circuit, failure re-opens it. start()
+  claims the trial, and the connection stays out of order() until the
+  trial's result is recorded.
+- Cancellation: CancellableRequest opens a urllib request whose socket can
+  be shut down from another thread. genaiscore sends proxied requests with
+  urllib on an executor thread; cancelling the awaiting task (a lost hedge,
+  a finalized search) shuts the socket down instead of leaving the thread
+  blocked until its timeout.
+
+Router state is per process (one search run).
+
+Usage:
+    from ta_gen_ai_cim_llm_routing import ConnectionRouter
+    router = ConnectionRouter(['primary', 'secondary'])
+    for name in router.order():
+        if router.start(name): ...
+    router.record_success('primary', 1.8)
+    router.record_failure('secondary')
+
+    attempt = CancellableRequest()
+    response = attempt.open(request, context=ssl_context, timeout=120)
+    attempt.cancel()                      # from another thread
+
+Copyright 2026 Splunk Inc.
+Licensed under Apache License 2.0
+"""
+
+import http.client
+import socket
+import threading
+import time
+import urllib.request
+from collections import deque
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class ConnectionHealth(object):
+    """Latency and failure state of one connection."""
+
+    def __init__(self, name, position, window):
+        self.name = name
+        self.position = position
+        self.ewma = None
+        self.latencies = deque(maxlen=window)
+        self.consecutive_failures = 0
+        self.state = CLOSED
+        self.open_until = 0.0
+        self.trial_in_flight = False
+        self.requests = 0
+        self.failures = 0
+        self.circuit_opens = 0
+
+
+class ConnectionRouter(object):
+    """Orders connections by health and latency for one scoring run."""
+
+    def __init__(self, names, failure_threshold=3, cooldown=60.0, alpha=0.3, window=50,
+                 clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.alpha = alpha
+        self._clock = clock
+        self._health = {}
+        for position, name in enumerate(names):
+            self._health[name] = ConnectionHealth(name, position, window)
+
+    def _available(self, health):
+        if health.state == OPEN and self._clock() >= health.open_until:
+            health.state = HALF_OPEN
+        if health.state == HALF_OPEN:
+            return not health.trial_in_flight
+        return health.state != OPEN
+
+    def order(self):
+        """Return the names of connections that may be called now, best first."""
+        available = [h for h in self._health.values() if self._available(h)]
+        available.sort(key=lambda h: (h.ewma is not None, h.ewma or 0.0, h.position))
+        return [h.name for h in available]
+
+    def start(self, name):
+        """Claim *name* for one request. Returns False when its circuit has
+        opened, or its half-open trial was taken, since order() listed it."""
+        health = self._health[name]
+        if not self._available(health):
+            return False
+        if health.state == HALF_OPEN:
+            health.trial_in_flight = True
+        return True
+
+    def _observe(self, health, latency):
+        health.latencies.append(latency)
+        if health.ewma is None:
+            health.ewma = latency
+        else:
+            health.ewma = self.alpha * latency + (1.0 - self.alpha) * health.ewma
+
+    def record_success(self, name, latency):
+        health = self._health[name]
+        health.requests += 1
+        health.consecutive_failures = 0
+        health.state = CLOSED
+        health.trial_in_flight = False
+        self._observe(health, latency)
+
+    def record_cancelled(self, name, elapsed):
+        """Record an attempt cancelled before it finished (a hedge that lost
+        the race, or a request past the time budget): its latency is at
+        least *elapsed*, which keeps a slow primary from staying first. A
+        cancelled half-open trial frees the trial for another request."""
+        health = self._health[name]
+        health.requests += 1
+        health.trial_in_flight = False
+        self._observe(health, elapsed)
+
+    def record_failure(self, name):
+        health = self._health[name]
+        health.requests += 1
+        health.failures += 1
+        health.consecutive_failures += 1
+        health.trial_in_flight = False
+        if health.state == HALF_OPEN or health.consecutive_failures >= self.failure_threshold:
+            if health.state != OPEN:
+                health.circuit_opens += 1
+            health.state = OPEN
+            health.open_until = self._clock() + self.cooldown
+
+    def hedge_delay(self, name, default, percentile=95, min_samples=5, floor=0.25):
+        """Seconds to wait on *name* before hedging: its recent latency
+        percentile once min_samples are known, else *default*."""
+        latencies = sorted(self._health[name].latencies)
+        if len(latencies) < min_samples:
+            return default
+        rank = min(len(latencies) - 1, int(round(percentile / 100.0 * (len(latencies) - 1))))
+        return max(floor, latencies[rank])
+
+    def snapshot(self):
+        """Return per-connection stats (milliseconds) for logging."""
+        snapshot = {}
+        for name, health in self._health.items():
+            snapshot[name] = {
+                'state': health.state,
+                'requests': health.requests,
+                'failures': health.failures,
+                'circuit_opens': health.circuit_opens,
+                'ewma_ms': round(health.ewma * 1000.0, 1) if health.ewma is not None else None,
+                'p95_ms': round(self.hedge_delay(name, 0.0, min_samples=1, floor=0.0) * 1000.0, 1),
+            }
+        return snapshot
+
+
+class CancellableRequest(object):
+    """One HTTP attempt that another thread can abort with cancel()."""
+
+    def __init__(self):
+        self.cancelled = False
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def _track(self, connection_class):
+        def factory(host, **kwargs):
+            connection = connection_class(host, **kwargs)
+            with self._lock:
+                if self.cancelled:
+                    raise ConnectionAbortedError('LLM request cancelled')
+                self._connections.append(connection)
+            return connection
+        return factory
+
+    def open(self, request, context=None, timeout=None):
+        """Open *request* like urllib.request.urlopen(context=...)."""
+        attempt = self
+
+        class _HTTPHandler(urllib.request.HTTPHandler):
+            def http_open(self, req):
+                return self.do_open(attempt._track(http.client.HTTPConnection), req)
+
+        class _HTTPSHandler(urllib.request.HTTPSHandler):
+            def https_open(self, req):
+                return self.do_open(attempt._track(http.client.HTTPSConnection), req,
+                                    context=self._context)
+
+        opener = urllib.request.build_opener(_HTTPHandler(), _HTTPSHandler(context=context))
+        return opener.open(request, timeout=timeout)
+
+    def cancel(self):
+        """Shut down the attempt's sockets; its reader fails immediately."""
+        with self._lock:
+            self.cancelled = True
+            connections = list(self._connections)
+        for connection in connections:
+            sock = connection.sock
+            if sock is None:
+                continue
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
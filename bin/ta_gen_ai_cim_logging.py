@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+# encoding=utf-8
+"""
+ta_gen_ai_cim_logging.py - Queued file logging and per-event log sampling
+
+genaiscore and the ServiceNow scripts log from their hot loops. A plain
+FileHandler formats and writes each record while holding the handler lock,
+so concurrent callers serialize on it and every line adds disk I/O to the
+loop. Loggers set up here put records on an in-memory queue
+(logging.handlers.QueueHandler); one background QueueListener thread per
+log file formats them and writes the file. The listener thread starts with
+the first record and the file is opened then (no thread or disk access at
+import); pending records are flushed at interpreter exit (atexit) or by
+stop_logging().
+
+LogSampler keeps per-event INFO lines (one per event or per HTTP call)
+to a bounded volume: the first N lines of each kind are logged, then one
+in every M. Its summary() gives the seen/logged counts per kind for an
+end-of-run line. Errors and warnings are never sampled.
+
+Usage:
+    from ta_gen_ai_cim_logging import setup_logger, LogSampler
+    logger = setup_logger('sync_snow_asset')      # .../var/log/splunk/sync_snow_asset.log
+    sampler = LogSampler(first=20, every=100)
+    if sampler.allow('snow_request'):
+        logger.info("ServiceNow API Request - Method: %s, URL: %s", method, url)
+    logger.info("Per-event log lines: %s", json.dumps(sampler.summary()))
+
+Copyright 2026 Splunk Inc.
+Licensed under Apache License 2.0
+"""
+
+import atexit
+import logging
+import os
+import queue
+import tempfile
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_FORMAT = '%(asctime)s %(levelname)s %(message)s'
+
+# Per-event INFO lines: the first SAMPLE_FIRST of each kind, then one in SAMPLE_EVERY
+SAMPLE_FIRST = 20
+SAMPLE_EVERY = 100
+
+_traceback_formatter = logging.Formatter()
+_listeners = []
+_listeners_lock = threading.Lock()
+
+
+def log_dir():
+    """Return $SPLUNK_HOME/var/log/splunk, or the temp directory outside Splunk."""
+    splunk_home = os.environ.get('SPLUNK_HOME')
+    if splunk_home:
+        return os.path.join(splunk_home, 'var', 'log', 'splunk')
+    return tempfile.gettempdir()
+
+
+class _QueueHandler(QueueHandler):
+    """QueueHandler that starts its listener with the first record."""
+
+    def __init__(self, log_queue, listener):
+        super(_QueueHandler, self).__init__(log_queue)
+        self._listener = listener
+        self._started = False
+
+    def prepare(self, record):
+        # Merge the arguments into the message here (they may change after
+        # the call returns) and render any traceback; unlike the stock
+        # prepare(), the record is not copied or formatted twice. The
+        # listener adds the timestamp and level when it writes the line.
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _traceback_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def emit(self, record):
+        if not self._started:
+            with _listeners_lock:
+                if not self._started:
+                    self._listener.start()
+                    _listeners.append(self._listener)
+                    self._started = True
+        super(_QueueHandler, self).emit(record)
+
+
+def setup_logger(name, log_file=None, level=logging.INFO):
+    """Return logger *name* writing to *log_file* through a background thread.
+
+    log_file defaults to <log_dir()>/<name>.log. A logger that already has
+    handlers is returned unchanged, so importers can set up their own log
+    name before importing a module that sets up its default one.
+    """
+    logger = logging.getLogger(name)
+    if logger.handlers:
+        return logger
+    logger.setLevel(level)
+    if log_file is None:
+        log_file = os.path.join(log_dir(), '{}.log'.format(name))
+    file_handler = logging.FileHandler(log_file, mode='a', delay=True)
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+    logger.addHandler(_QueueHandler(log_queue, listener))
+    return logger
+
+
+def stop_logging():
+    """Flush queued records and stop every listener thread (also run at exit)."""
+    with _listeners_lock:
+        listeners = list(_listeners)
+        del _listeners[:]
+    for listener in listeners:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+atexit.register(stop_logging)
+
+
+class LogSampler(object):
+    """Decides which per-event log lines to write, and counts them by kind.
+
+    allow(kind) is True for the first *first* calls per kind, then for one
+    call in every *every*; every=1 logs everything (debug logging).
+    """
+
+    def __init__(self, first=SAMPLE_FIRST, every=SAMPLE_EVERY):
+        self.first = first
+        self.every = max(1, int(every))
+        self._seen = {}
+        self._logged = {}
+        self._lock = threading.Lock()
+
+    def allow(self, kind):
+        with self._lock:
+            seen = self._seen.get(kind, 0) + 1
+            self._seen[kind] = seen
+            if seen <= self.first or seen % self.every == 0:
+                self._logged[kind] = self._logged.get(kind, 0) + 1
+                return True
+            return False
+
+    def summary(self):
+        """Return {kind: {'seen': n, 'logged': n}}."""
+        with self._lock:
+            return {kind: {'seen': seen, 'logged': self._logged.get(kind, 0)}
+                    for kind, seen in sorted(self._seen.items())}
@@ -0,0 +1,267 @@
+#!/usr/bin/env python
+# encoding=utf-8
+"""
+ta_gen_ai_cim_neardup.py - MinHash/LSH near-duplicate index for genaiscore
+
+Chatbot traffic repeats itself: templated questions, retries that differ only
+in a timestamp or name, the same boilerplate instructions. Scoring each copy
+costs a full LLM call. This module lets genaiscore reuse the score of an
+already-scored event whose text is sufficiently similar.
+
+Text is reduced to a set of word 3-shingles, hashed with crc32 and summarized
+by a NUM_PERM-value MinHash signature (estimates Jaccard similarity). The
+signature is split into BANDS bands of ROWS values for locality-sensitive
+hashing, so a lookup only compares against events sharing at least one band.
+Candidates are accepted when their estimated similarity reaches the
+threshold.
+
+The index is bounded (max_entries, newest kept) and persisted between runs
+either in the gen_ai_scoring_neardup KV Store collection or in a JSON file
+under $SPLUNK_HOME/var/lib/splunk/ta_gen_ai_cim/. Entries are scoped to a
+context hash of the pipeline's prompts, so editing a prompt stops old scores
+from being reused.
+
+Usage:
+    from ta_gen_ai_cim_neardup import NearDuplicateIndex
+    index = NearDuplicateIndex(threshold=0.9)
+    signature = index.signature(text)
+    match = index.query(signature)        # (entry, similarity) or None
+    index.add(event_id, signature, scoring)
+
+Copyright 2026 Splunk Inc.
+Licensed under Apache License 2.0
+"""
+
+import base64
+import hashlib
+import json
+import os
+import random
+import re
+import tempfile
+import time
+import zlib
+from array import array
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+DEFAULT_THRESHOLD = 0.9
+DEFAULT_MAX_ENTRIES = 5000
+KV_COLLECTION = 'gen_ai_scoring_neardup'
+
+# Universal hashing (a * h + b) mod a Mersenne prime; seeded so signatures
+# are comparable across processes and runs.
+_PRIME = (1 << 61) - 1
+_MASK = 0xffffffff
+_rng = random.Random(20261019)
+_PERMUTATIONS = tuple((_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM))
+
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def context_hash(*parts):
+    """Return a short hash identifying the prompts a score was produced with."""
+    return hashlib.sha1('\x1f'.join(p or '' for p in parts).encode('utf-8')).hexdigest()[:16]
+
+
+def shingles(text):
+    """Return the set of crc32-hashed word shingles of *text*."""
+    tokens = _TOKEN_RE.findall(text.lower())
+    if not tokens:
+        return set()
+    if len(tokens) <= SHINGLE_SIZE:
+        return {zlib.crc32(' '.join(tokens).encode('utf-8'))}
+    return {zlib.crc32(' '.join(tokens[i:i + SHINGLE_SIZE]).encode('utf-8'))
+            for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+
+
+def signature(text):
+    """Return the MinHash signature of *text* (tuple of NUM_PERM ints), or None if it has no words."""
+    hashes = shingles(text)
+    if not hashes:
+        return None
+    hashes = list(hashes)
+    return tuple(min([(a * h + b) % _PRIME for h in hashes]) & _MASK for a, b in _PERMUTATIONS)
+
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / float(NUM_PERM)
+
+
+def encode_signature(sig):
+    return base64.b64encode(array('I', sig).tobytes()).decode('ascii')
+
+
+def decode_signature(text):
+    values = array('I')
+    values.frombytes(base64.b64decode(text))
+    return tuple(values)
+
+
+class NearDuplicateIndex(object):
+    """In-memory LSH index of scored events, loaded from and saved to a store."""
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, max_entries=DEFAULT_MAX_ENTRIES):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._entries = []
+        self._buckets = {}
+        self._new_entries = []
+        self.stats = {'lookups': 0, 'reused': 0, 'added': 0, 'signature_ms': 0.0}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def signature(self, text):
+        start = time.time()
+        try:
+            return signature(text)
+        finally:
+            self.stats['signature_ms'] += (time.time() - start) * 1000.0
+
+    def _index(self, entry):
+        position = len(self._entries)
+        self._entries.append(entry)
+        sig = entry['signature']
+        for band in range(BANDS):
+            key = (band,) + sig[band * ROWS:(band + 1) * ROWS]
+            self._buckets.setdefault(key, []).append(position)
+
+    def query(self, sig):
+        """Return (entry, similarity) for the most similar indexed event at or
+        above the threshold, or None."""
+        if sig is None:
+            return None
+        self.stats['lookups'] += 1
+        seen = set()
+        best = None
+        for band in range(BANDS):
+            for position in self._buckets.get((band,) + sig[band * ROWS:(band + 1) * ROWS], ()):
+                if position in seen:
+                    continue
+                seen.add(position)
+                entry = self._entries[position]
+                score = similarity(sig, entry['signature'])
+                if score >= self.threshold and (best is None or score > best[1]):
+                    best = (entry, score)
+        if best is not None:
+            self.stats['reused'] += 1
+        return best
+
+    def add(self, event_id, sig, scoring, scored_at=None):
+        """Index a freshly scored event; it is persisted by the next save."""
+        if sig is None or not event_id:
+            return
+        entry = {'event_id': event_id, 'signature': sig, 'scoring': scoring,
+                 'scored_at': scored_at if scored_at is not None else time.time()}
+        self._index(entry)
+        self._new_entries.append(entry)
+        self.stats['added'] += 1
+
+    def load(self, entries):
+        """Index stored entries (dicts with event_id, signature, scoring, scored_at)."""
+        entries = sorted(entries, key=lambda e: e.get('scored_at') or 0, reverse=True)
+        for entry in entries[:self.max_entries]:
+            self._index(entry)
+
+    def new_entries(self):
+        return list(self._new_entries)
+
+    def newest(self):
+        """Return up to max_entries entries, newest first."""
+        entries = sorted(self._entries, key=lambda e: e['scored_at'], reverse=True)
+        return entries[:self.max_entries]
+
+
+def _to_document(entry, pipeline, context):
+    return {
+        'pipeline': pipeline,
+        'context': context,
+        'event_id': entry['event_id'],
+        'signature': encode_signature(entry['signature']),
+        'scoring': json.dumps(entry['scoring'], ensure_ascii=False),
+        'scored_at': entry['scored_at'],
+    }
+
+
+def _from_document(document):
+    try:
+        return {
+            'event_id': document['event_id'],
+            'signature': decode_signature(document['signature']),
+            'scoring': json.loads(document['scoring']),
+            'scored_at': float(document.get('scored_at') or 0),
+        }
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class KVStoreIndexStore(object):
+    """Persists the index in the gen_ai_scoring_neardup KV Store collection."""
+
+    BATCH_SIZE = 500
+
+    def __init__(self, service, pipeline, context):
+        self._data = service.kvstore[KV_COLLECTION].data
+        self.pipeline = pipeline
+        self.context = context
+
+    def load(self, index):
+        documents = self._data.query(
+            query=json.dumps({'pipeline': self.pipeline, 'context': self.context}),
+            sort='scored_at:-1', limit=index.max_entries)
+        index.load(e for e in (_from_document(d) for d in documents) if e is not None)
+
+    def save(self, index):
+        documents = [_to_document(e, self.pipeline, self.context) for e in index.new_entries()]
+        for start in range(0, len(documents), self.BATCH_SIZE):
+            self._data.batch_save(*documents[start:start + self.BATCH_SIZE])
+        newest = index.newest()
+        if len(newest) >= index.max_entries:
+            # Trim everything older than the oldest entry still kept, plus
+            # entries written under a previous prompt context
+            cutoff = newest[-1]['scored_at']
+            self._data.delete(query=json.dumps({'pipeline': self.pipeline, '$or': [
+                {'scored_at': {'$lt': cutoff}}, {'context': {'$ne': self.context}}]}))
+
+
+class FileIndexStore(object):
+    """Persists the index as JSON under $SPLUNK_HOME/var/lib/splunk/ta_gen_ai_cim/."""
+
+    def __init__(self, pipeline, context, directory=None):
+        if directory is None:
+            splunk_home = os.environ.get('SPLUNK_HOME')
+            base = os.path.join(splunk_home, 'var', 'lib', 'splunk') if splunk_home else tempfile.gettempdir()
+            directory = os.path.join(base, 'ta_gen_ai_cim')
+        self.path = os.path.join(directory, 'neardup_{}.json'.format(re.sub(r'[^\w.-]', '_', pipeline)))
+        self.pipeline = pipeline
+        self.context = context
+
+    def load(self, index):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return
+        if stored.get('context') != self.context:
+            return
+        index.load(e for e in (_from_document(d) for d in stored.get('entries', [])) if e is not None)
+
+    def save(self, index):
+        if not index.new_entries():
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        stored = {'pipeline': self.pipeline, 'context': self.context,
+                  'entries': [_to_document(e, self.pipeline, self.context) for e in index.newest()]}
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), prefix='.neardup_')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(stored, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
@@ -0,0 +1,276 @@
+#!/usr/bin/env python
+# encoding=utf-8
+"""
+ta_gen_ai_cim_perf.py - Per-run performance metrics for commands and alert actions
+
+genaiscore, aicase and the ServiceNow alert actions record how long each
+stage of a run takes (config load, credential resolution, KV Store I/O,
+HTTP, parsing, writing results) and a few counters, and write one JSON
+metrics event per run to $SPLUNK_HOME/var/log/splunk/ta_gen_ai_cim_perf.log.
+Splunk indexes that directory into _internal; the Performance dashboard
+reads it from there.
+
+Collection is off by default and enabled with enabled = true in the
+[settings] stanza of ta_gen_ai_cim_perf.conf. The conf is read from the
+app's default/ and local/ directories on disk (no splunkd call). When
+disabled, start_run() returns a shared no-op run, so instrumented code
+pays one attribute lookup and call per timed block.
+
+Stages are timed independently and may nest (a ServiceNow script's
+config_load includes its credential lookups); each stage reports total
+milliseconds, the number of timed blocks and the slowest block.
+
+Usage:
+    import ta_gen_ai_cim_perf as perf
+    run = perf.start_run('sync_snow_asset')
+    with run.stage('config_load'):
+        ...
+    run.incr('assets')
+    run.finish(status='ok')
+
+    with perf.stage('http'):            # times against the current run
+        ...
+
+    with perf.run('create_snow_case'):  # finishes on return or sys.exit()
+        main()
+
+Copyright 2026 Splunk Inc.
+Licensed under Apache License 2.0
+"""
+
+import configparser
+import json
+import os
+import socket
+import time
+from datetime import datetime, timezone
+
+app_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CONF_NAME = 'ta_gen_ai_cim_perf.conf'
+LOG_NAME = 'ta_gen_ai_cim_perf.log'
+SCHEMA_VERSION = 1
+
+_settings = None
+_current = None
+
+
+def _read_settings():
+    """Return the merged [settings] stanza of default/ and local/ conf."""
+    parser = configparser.ConfigParser(interpolation=None, strict=False)
+    for layer in ('default', 'local'):
+        try:
+            parser.read(os.path.join(app_root, layer, CONF_NAME), encoding='utf-8')
+        except (configparser.Error, OSError, UnicodeDecodeError):
+            pass
+    return dict(parser['settings']) if parser.has_section('settings') else {}
+
+
+def _is_enabled():
+    global _settings
+    if _settings is None:
+        _settings = _read_settings()
+    return str(_settings.get('enabled', '')).strip().lower() in ('1', 'true', 'yes', 't', 'y')
+
+
+def configure(enabled=None, log_path=None):
+    """Override the conf file for this process (tools and benchmarks).
+
+    log_path defaults to $SPLUNK_HOME/var/log/splunk/ta_gen_ai_cim_perf.log.
+    """
+    global _settings
+    if _settings is None:
+        _settings = _read_settings()
+    if enabled is not None:
+        _settings['enabled'] = 'true' if enabled else 'false'
+    if log_path is not None:
+        _settings['log_path'] = log_path
+
+
+def _log_path():
+    if _settings and _settings.get('log_path'):
+        return _settings['log_path']
+    splunk_home = os.environ.get('SPLUNK_HOME')
+    if splunk_home:
+        log_dir = os.path.join(splunk_home, 'var', 'log', 'splunk')
+    else:
+        import tempfile
+        log_dir = tempfile.gettempdir()
+    return os.path.join(log_dir, LOG_NAME)
+
+
+class _Timer(object):
+    """Context manager adding one timed block to a stage."""
+
+    __slots__ = ('_run', '_name', '_start')
+
+    def __init__(self, run, name):
+        self._run = run
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._run.add_time(self._name, time.perf_counter() - self._start)
+        return False
+
+
+class RunMetrics(object):
+    """Stage timers, counters and dimensions of one command or alert action run."""
+
+    enabled = True
+
+    def __init__(self, command, **dimensions):
+        self.command = command
+        self.dimensions = dict(dimensions)
+        self.stages = {}
+        self.counters = {}
+        self._started = time.time()
+        self._start = time.perf_counter()
+        self._finished = False
+
+    def stage(self, name):
+        """Return a context manager timing one block of stage *name*."""
+        return _Timer(self, name)
+
+    def add_time(self, name, seconds, count=1):
+        """Add *seconds* (spread over *count* blocks) to stage *name*."""
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = self.stages[name] = [0.0, 0, 0.0]
+        stage[0] += seconds
+        stage[1] += count
+        if count and seconds / count > stage[2]:
+            stage[2] = seconds / count
+
+    def incr(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def set(self, name, value):
+        """Set a dimension (pipeline, mode, ...) reported with the run."""
+        self.dimensions[name] = value
+
+    def to_event(self, status):
+        duration = time.perf_counter() - self._start
+        stages = {}
+        for name, (seconds, count, slowest) in self.stages.items():
+            stages[name] = {'ms': round(seconds * 1000.0, 3), 'count': count,
+                            'max_ms': round(slowest * 1000.0, 3)}
+        return {
+            'timestamp': datetime.fromtimestamp(self._started, tz=timezone.utc).strftime(
+                '%Y-%m-%dT%H:%M:%S.%fZ'),
+            'schema': SCHEMA_VERSION,
+            'command': self.command,
+            'status': status,
+            'host': socket.gethostname(),
+            'pid': os.getpid(),
+            'duration_ms': round(duration * 1000.0, 3),
+            'dimensions': self.dimensions,
+            'stages': stages,
+            'counters': self.counters,
+        }
+
+    def finish(self, status='ok'):
+        """Write the run's metrics event (once) and return it."""
+        global _current
+        if self._finished:
+            return None
+        self._finished = True
+        if _current is self:
+            _current = None
+        event = self.to_event(status)
+        try:
+            path = _log_path()
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(event, sort_keys=True, default=str) + '\n')
+        except OSError:
+            pass
+        return event
+
+
+class _NullTimer(object):
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class _NullRun(object):
+    """Stand-in used while collection is disabled; every method is a no-op."""
+
+    enabled = False
+    _timer = _NullTimer()
+
+    def stage(self, name):
+        return self._timer
+
+    def add_time(self, name, seconds, count=1):
+        pass
+
+    def incr(self, name, value=1):
+        pass
+
+    def set(self, name, value):
+        pass
+
+    def finish(self, status='ok'):
+        return None
+
+
+NULL_RUN = _NullRun()
+
+
+def start_run(command, **dimensions):
+    """Start the process's current run, or return NULL_RUN when disabled."""
+    global _current
+    if not _is_enabled():
+        return NULL_RUN
+    _current = RunMetrics(command, **dimensions)
+    return _current
+
+
+def current_run():
+    """Return the run started by start_run(), or NULL_RUN."""
+    return _current if _current is not None else NULL_RUN
+
+
+def stage(name):
+    """Time a block against the current run (shared helpers use this)."""
+    return current_run().stage(name)
+
+
+def incr(name, value=1):
+    current_run().incr(name, value)
+
+
+class run(object):
+    """Context manager for script entry points: starts a run and finishes it
+    when the body returns or raises, including sys.exit(). The status is
+    "ok" for a clean return or exit code 0, else "error"."""
+
+    def __init__(self, command, **dimensions):
+        self._command = command
+        self._dimensions = dimensions
+        self.metrics = NULL_RUN
+
+    def __enter__(self):
+        self.metrics = start_run(self._command, **self._dimensions)
+        return self.metrics
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            status = 'ok'
+        elif issubclass(exc_type, SystemExit):
+            status = 'ok' if exc.code in (None, 0) else 'error'
+            self.metrics.set('exit_code', exc.code if exc.code is not None else 0)
+        else:
+            status = 'error'
+        self.metrics.finish(status=status)
+        return False
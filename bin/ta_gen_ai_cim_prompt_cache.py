@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+# encoding=utf-8
+"""
+ta_gen_ai_cim_prompt_cache.py - Gemini cached content for genaiscore's prompt prefix
+
+Every request a scoring pipeline sends starts with the same text: the
+[settings] system_prompt and the pipeline's SCORING TASK. Anthropic (at
+cache_control breakpoints) and OpenAI / Azure OpenAI (automatically, from
+1024 tokens) cache such a prefix on their side when it is sent unchanged.
+Gemini needs an explicit cachedContents resource holding the prefix, named
+in each generateContent request instead of resending it.
+
+GeminiContextCache keeps one cachedContents resource per API, model and
+prefix. Its displayName carries a hash of the prefix, so the next
+scheduled run of the search lists and reuses it rather than creating
+another. The TTL is extended when less than half of it remains; once
+scoring stops, the resource expires on its own. A prefix the API will not
+cache (fewer tokens than the model's minimum, a model without caching) is
+not tried again by the process.
+
+Usage:
+    from ta_gen_ai_cim_prompt_cache import GeminiContextCache
+    cache = GeminiContextCache(send, ttl=600)   # send(method, url, headers, body) -> dict
+    name = cache.get(endpoint, model, api_key, system_prompt, prefix)   # or None
+    body['cachedContent'] = name
+
+Copyright 2026 Splunk Inc.
+Licensed under Apache License 2.0
+"""
+
+import calendar
+import hashlib
+import re
+import threading
+import time
+
+DEFAULT_TTL = 600
+MIN_TTL = 60
+DISPLAY_NAME_PREFIX = 'ta_gen_ai_cim_'
+
+_EXPIRE_RE = re.compile(r'^(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d)(\.\d+)?Z$')
+
+
+def prefix_hash(*parts):
+    """Return a short hash identifying a prompt prefix."""
+    return hashlib.sha256('\x1f'.join(p or '' for p in parts).encode('utf-8')).hexdigest()[:16]
+
+
+def cache_collection_url(endpoint):
+    """Return the cachedContents URL for a Gemini models endpoint
+    (https://.../v1beta/models), or None for any other endpoint."""
+    base = (endpoint or '').rstrip('/')
+    if not base.endswith('/models'):
+        return None
+    return base[:-len('/models')] + '/cachedContents'
+
+
+def parse_expire_time(value):
+    """Return the epoch seconds of an RFC 3339 UTC expireTime, or None."""
+    match = _EXPIRE_RE.match(value or '')
+    if not match:
+        return None
+    return calendar.timegm(time.strptime(match.group(1), '%Y-%m-%dT%H:%M:%S'))
+
+
+class GeminiContextCache(object):
+    """cachedContents resources holding genaiscore's prompt prefix.
+
+    *send(method, url, headers, body)* makes one HTTP call to the Gemini API
+    (body is a dict or None) and returns the decoded JSON response, raising
+    ValueError on an HTTP error.
+    """
+
+    def __init__(self, send, ttl=DEFAULT_TTL, clock=time.time):
+        self._send = send
+        self.ttl = max(MIN_TTL, int(ttl))
+        self._clock = clock
+        # (collection URL, model, prefix hash) -> {'name', 'expires'}, or
+        # None when the API would not cache the prefix
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.stats = {'created': 0, 'found': 0, 'extended': 0, 'failed': 0}
+        self.last_error = None
+
+    def get(self, endpoint, model, api_key, system_prompt, prefix):
+        """Return the cachedContents name holding *system_prompt* and
+        *prefix* for *model*, creating or extending it as needed, or None
+        when the prefix is not cached."""
+        collection = cache_collection_url(endpoint)
+        if collection is None or not prefix:
+            return None
+        key = (collection, model, prefix_hash(model, system_prompt, prefix))
+        with self._lock:
+            if key in self._entries and self._entries[key] is None:
+                return None
+            entry = self._entries.get(key)
+            if entry is not None and entry['expires'] - self._clock() > self.ttl / 2.0:
+                return entry['name']
+
+            headers = {'Content-Type': 'application/json', 'x-goog-api-key': api_key}
+            display_name = DISPLAY_NAME_PREFIX + key[2]
+            try:
+                if entry is None:
+                    entry = self._find(collection, headers, model, display_name)
+                if entry is not None and entry['expires'] - self._clock() <= self.ttl / 2.0:
+                    entry = self._extend(collection, headers, entry)
+                if entry is None:
+                    entry = self._create(collection, headers, model, display_name,
+                                         system_prompt, prefix)
+            except Exception as e:
+                self.stats['failed'] += 1
+                self.last_error = str(e)[:300]
+                self._entries[key] = None
+                return None
+            self._entries[key] = entry
+            return entry['name']
+
+    def invalidate(self, name):
+        """Stop using cachedContents *name* (the API no longer accepts it)."""
+        with self._lock:
+            for key, entry in self._entries.items():
+                if entry is not None and entry['name'] == name:
+                    self._entries[key] = None
+
+    def _entry(self, resource):
+        expires = parse_expire_time(resource.get('expireTime'))
+        return {'name': resource['name'],
+                'expires': expires if expires is not None else self._clock()}
+
+    def _find(self, collection, headers, model, display_name):
+        """Return an unexpired resource named *display_name*, or None."""
+        model_name = 'models/' + model
+        page_token = None
+        while True:
+            url = collection + '?pageSize=100'
+            if page_token:
+                url += '&pageToken=' + page_token
+            result = self._send('GET', url, headers, None)
+            for resource in result.get('cachedContents') or []:
+                if (resource.get('displayName') == display_name
+                        and resource.get('model') == model_name and resource.get('name')):
+                    entry = self._entry(resource)
+                    if entry['expires'] > self._clock():
+                        self.stats['found'] += 1
+                        return entry
+            page_token = result.get('nextPageToken')
+            if not page_token:
+                return None
+
+    def _extend(self, collection, headers, entry):
+        """Reset the TTL of *entry*; return None if it no longer exists."""
+        url = '{}/{}?updateMask=ttl'.format(
+            collection, entry['name'].rsplit('/', 1)[-1])
+        try:
+            resource = self._send('PATCH', url, headers, {'ttl': '{}s'.format(self.ttl)})
+        except ValueError:
+            return None
+        self.stats['extended'] += 1
+        return self._entry(dict(resource, name=resource.get('name') or entry['name']))
+
+    def _create(self, collection, headers, model, display_name, system_prompt, prefix):
+        body = {
+            'model': 'models/' + model,
+            'displayName': display_name,
+            'contents': [{'role': 'user', 'parts': [{'text': prefix}]}],
+            'ttl': '{}s'.format(self.ttl),
+        }
+        if system_prompt:
+            body['systemInstruction'] = {'parts': [{'text': system_prompt}]}
+        resource = self._send('POST', collection, headers, body)
+        if not resource.get('name'):
+            raise ValueError('cachedContents response has no name')
+        self.stats['created'] += 1
+        return self._entry(resource)
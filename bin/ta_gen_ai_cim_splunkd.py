@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# encoding=utf-8
+"""
+ta_gen_ai_cim_splunkd.py - Shared splunkd connection helper
+
+Every bin/ script talks to splunkd through splunklib for KV Store queries,
+conf reads and storage-password lookups. splunklib's default HTTP handler
+sends "Connection: Close" and opens a fresh TCP+TLS connection per request,
+so a single scoring run or asset sync pays dozens of handshakes against the
+local splunkd.
+
+connect() builds a splunklib Service on top of one process-wide
+splunklib.binding.pooled_handler(), so every Service created by this process
+(one per app namespace, or one per helper call in the ServiceNow scripts)
+reuses the same keep-alive connections.
+
+splunklib.binding and splunklib.client are imported on first use: search
+commands import this module at startup, and loading splunklib's HTTP stack
+(http.client, ssl, xml) before the first chunk is wasted on runs that never
+reach splunkd.
+
+Usage:
+    from ta_gen_ai_cim_splunkd import connect
+    service = connect(session_key)                                 # alert actions
+    service = connect(searchinfo.session_key, searchinfo.splunkd_uri)  # search commands
+
+Copyright 2026 Splunk Inc.
+Licensed under Apache License 2.0
+"""
+
+import os
+import sys
+from urllib.parse import urlsplit
+
+app_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+lib_path = os.path.join(app_root, 'lib')
+if lib_path not in sys.path:
+    sys.path.insert(0, lib_path)
+
+
+APP_NAME = 'TA-gen_ai_cim'
+
+_handler = None
+
+
+def get_handler():
+    """Return the process-wide pooled splunkd HTTP handler."""
+    global _handler
+    if _handler is None:
+        import splunklib.binding as binding
+        _handler = binding.pooled_handler()
+    return _handler
+
+
+def connect(session_key, splunkd_uri=None, app=APP_NAME, owner='nobody'):
+    """Connect to splunkd with a session key over pooled keep-alive connections.
+
+    Args:
+        session_key: Splunk session key (searchinfo.session_key for search
+            commands, payload['session_key'] for alert actions)
+        splunkd_uri: optional management URI (searchinfo.splunkd_uri). When
+            omitted, splunklib's defaults (https://localhost:8089) apply.
+        app: app namespace for the Service
+        owner: owner namespace for the Service
+    """
+    import splunklib.client as client
+
+    kwargs = {
+        'token': session_key,
+        'owner': owner,
+        'app': app,
+        'handler': get_handler(),
+    }
+    if splunkd_uri:
+        uri = urlsplit(splunkd_uri, allow_fragments=False)
+        kwargs['scheme'] = uri.scheme
+        kwargs['host'] = uri.hostname
+        if uri.port is not None:
+            kwargs['port'] = uri.port
+    return client.connect(**kwargs)
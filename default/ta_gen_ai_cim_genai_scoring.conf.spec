@@ -7,9 +7,56 @@
 debug_logging = <bool>
 * When true, the genaiscore command logs prompt/response/event content
   (truncated) to $SPLUNK_HOME/var/log/splunk/genaiscore.log at DEBUG level
+* When true, every per-event INFO line is also written; otherwise only the
+  first 20 of each kind and then one in 100 (see the run summary line)
 * Leave false in production: scored events may contain PII/PHI
 * Default: false
 
+near_duplicate_store = kvstore|file
+* Where pipelines with near_duplicate_reuse enabled persist their index of
+  already-scored events between runs
+* kvstore: the gen_ai_scoring_neardup KV Store collection (search head)
+* file: $SPLUNK_HOME/var/lib/splunk/ta_gen_ai_cim/neardup_<stanza>.json
+* Default: kvstore
+
+near_duplicate_max_entries = <integer>
+* Maximum number of scored events kept in each pipeline's index; the oldest
+  entries are dropped first
+* Default: 5000
+
+structured_output = <bool>
+* When true, genaiscore sends the scoring JSON schema in the provider's
+  native structured-output form: json_schema response_format for OpenAI and
+  Ollama, json_schema (api-version 2024-08-01 or later) or json_object for
+  Azure OpenAI, a forced record_score tool call for Anthropic and
+  responseSchema for Gemini. Groq requests are not constrained.
+* A connection that rejects the request with HTTP 400 is sent the event
+  again without it, and is not asked again for the rest of the search
+* Default: true
+
+prompt_cache = <bool>
+* When true, genaiscore sends the system_prompt and the pipeline prompt
+  (the SCORING TASK text every request starts with) so the provider can
+  cache them and bill and process only the event data on later requests:
+  cache_control breakpoints after the system prompt and the pipeline prompt
+  (Anthropic), a prompt_cache_key (OpenAI at api.openai.com) or a
+  cachedContents resource named in each request (Gemini)
+* OpenAI, Azure OpenAI and Groq also cache the unchanged prefix
+  automatically, with or without this setting
+* Providers only cache prefixes of at least about 1024 tokens (more for
+  some models); shorter prefixes are sent uncached
+* Tokens read from the cache are reported per event in
+  genai_scoring_cached_input_tokens and per run
+* Default: true
+
+prompt_cache_ttl = <integer>
+* Gemini only: lifetime in seconds of the cachedContents resource holding
+  the prefix. It is extended when less than half remains while the
+  pipeline runs, reused by the next run, and expires once scoring stops.
+  Gemini bills cached-content storage per token and hour.
+* Minimum: 60
+* Default: 600
+
 system_prompt = <string>
 * Global system prompt prepended to every pipeline-specific prompt
 * Establishes the LLM's role and enforces the JSON output schema
@@ -38,47 +85,344 @@ prompt = <string>
 * Example: "Analyze this GenAI event for personally identifiable information (PII)."
 * Default: empty
 
+near_duplicate_reuse = <bool>
+* When true, genaiscore computes a MinHash signature of each event's message
+  text and, if an already-scored event is at least near_duplicate_threshold
+  similar, reuses its score instead of calling the LLM
+* Reused events carry genai_scoring_reused_from=<gen_ai.event.id> and
+  genai_scoring_similarity=<0.0-1.0>
+* Scores are only reused while system_prompt, pipeline_name and prompt are
+  unchanged
+* Default: 0 (disabled)
+
+near_duplicate_threshold = <float>
+* Minimum estimated Jaccard similarity (word 3-shingles, 0.0-1.0) for reuse
+* Lower values save more LLM calls but reuse scores of less similar events
+* Default: 0.9
+
+gate_field = <string>
+* Cheap-first cascade: name of a score field computed earlier in the
+  pipeline's search (e.g. gen_ai.pii.risk_score from `genai_pii_apply_model`,
+  gen_ai.prompt_injection.risk_score from `genai_prompt_injection_score`, or
+  prompt_pattern_score from `genai_tfidf_preprocess_prompt`)
+* Events with gate_field >= gate_threshold are sent to the LLM; the rest are
+  emitted with the gate_defaults score and no LLM call
+* Every gated event carries genai_scoring_gate=passed|sampled|skipped and
+  genai_scoring_gate_score
+* Leave empty to send every event to the LLM
+* Default: empty (no gate)
+
+gate_threshold = <float>
+* Minimum gate_field value for an event to be sent to the LLM
+* Default: 0.5
+
+gate_sample_rate = <float>
+* Fraction (0.0-1.0) of below-threshold events sent to the LLM anyway, for
+  calibrating the gate against LLM scores (genai_scoring_gate=sampled)
+* Sampling is keyed on gen_ai.event.id, so re-runs sample the same events
+* Default: 0.0
+
+gate_missing = score|skip
+* What to do with events that have no numeric gate_field value
+* score: send them to the LLM (fail open)
+* skip: treat them as below the threshold
+* Default: score
+
+gate_defaults = <JSON object>
+* Score emitted for skipped events; any of risk_score, genai_detected,
+  confidence, explanation and types may be given
+* Example: {"risk_score": 0.05, "confidence": "medium"}
+* Default: {"risk_score": 0.0, "genai_detected": false, "confidence": "low",
+  "explanation": "Not sent to the LLM: <gate_field> below cheap-score gate <gate_threshold>",
+  "types": []}
+
+priority_fields = <comma-separated list>
+* Fields the events of a run are ordered by when genaiscore runs with
+  time_budget (as the GenAI Scoring - Pipeline N searches do): each is
+  <field> or <field>:<weight>, and an event's priority is the weighted sum
+  of their values. Higher priority events are scored first; those left
+  when the budget runs out are emitted with genai_scoring_status=deferred
+* Numbers are used as they are; true/false map to 1/0 and
+  critical/high/medium/low to 1.0/0.75/0.5/0.25; missing or other values
+  count as 0
+* Fields must be computed in the pipeline's search before genaiscore, e.g.
+  `genai_prompt_injection_score`, or an app criticality from a lookup
+* An entry without a field name or with a non-numeric weight fails the
+  pipeline's events with a configuration error
+* Default: gen_ai.prompt_injection.risk_score, gen_ai.pii.risk_score,
+  gen_ai.guardrail.triggered, gen_ai.safety.violated (weight 1 each)
+
+max_concurrency = <integer>
+* Maximum LLM requests in flight at once for this pipeline's search
+  (hedged duplicates included). Requests are sent asynchronously from one
+  process, so high values do not add threads; keep it within the
+  provider's rate limits
+* Range: 1-1024
+* Default: 8
+
+connections = <comma-separated list>
+* AI Toolkit Connection Management connections to score with, in failover
+  order. Names are AI Toolkit connection names (legacy AI Toolkit: provider
+  names, using the provider's default or first model)
+* A connection that errors or returns an invalid score fails over to the next
+* Each scored event carries genai_scoring_connection (the connection whose
+  score was used) when this is set
+* Leave empty to use the AI Toolkit default connection only
+* Default: empty
+
+hedge = <bool>
+* With two or more connections, send a duplicate request to the next
+  connection when the current one has not answered within its recent p95
+  latency. The first valid score wins and the other request is cancelled
+* Connections are ordered by their latency moving average (EWMA), so the
+  fastest healthy connection is tried first
+* Default: 1
+
+hedge_delay = <float>
+* Seconds to wait before hedging until a connection has 5 latency samples
+  (after that its p95 latency is used)
+* Default: 5
+
+circuit_failures = <integer>
+* Consecutive failures after which a connection is skipped (circuit open)
+* Default: 3
+
+circuit_cooldown = <float>
+* Seconds an open circuit skips its connection before one trial request is
+  allowed. If every connection's circuit is open, events fail with
+  "circuit open" instead of waiting on request timeouts
+* Default: 60
+
+model = <string>
+* Model to request instead of the connection's model, for this pipeline only
+  (e.g. a small, fast model for a binary prompt-injection check and the
+  connection's larger model for a PHI review)
+* Applies to every connection the pipeline scores with (the AI Toolkit
+  default connection, or each one in connections), so with several
+  connections name a model each of them serves
+* Azure OpenAI: the deployment in the connection's endpoint selects the
+  model; this value is only recorded in genai_scoring_request_model
+* Scores from another model are not reused by near_duplicate_reuse
+* Default: empty (the connection's model)
+
+max_tokens = <integer>
+* Maximum completion tokens per scoring request, instead of the
+  connection's max_tokens
+* Default: empty (the connection's value)
+
+temperature = <float>
+* Sampling temperature (0.0-2.0), instead of the connection's response
+  variability
+* Default: empty (the connection's value)
+
+timeout = <float>
+* Seconds to wait for each scoring request, instead of the connection's
+  request timeout
+* Default: empty (the connection's value)
+
 [pipeline_2]
 enabled = <bool>
 pipeline_name = <string>
 prompt = <string>
+near_duplicate_reuse = <bool>
+near_duplicate_threshold = <float>
+gate_field = <string>
+gate_threshold = <float>
+gate_sample_rate = <float>
+gate_missing = score|skip
+gate_defaults = <JSON object>
+priority_fields = <comma-separated list>
+max_concurrency = <integer>
+connections = <comma-separated list>
+hedge = <bool>
+hedge_delay = <float>
+circuit_failures = <integer>
+circuit_cooldown = <float>
+model = <string>
+max_tokens = <integer>
+temperature = <float>
+timeout = <float>
 
 [pipeline_3]
 enabled = <bool>
 pipeline_name = <string>
 prompt = <string>
+near_duplicate_reuse = <bool>
+near_duplicate_threshold = <float>
+gate_field = <string>
+gate_threshold = <float>
+gate_sample_rate = <float>
+gate_missing = score|skip
+gate_defaults = <JSON object>
+priority_fields = <comma-separated list>
+max_concurrency = <integer>
+connections = <comma-separated list>
+hedge = <bool>
+hedge_delay = <float>
+circuit_failures = <integer>
+circuit_cooldown = <float>
+model = <string>
+max_tokens = <integer>
+temperature = <float>
+timeout = <float>
 
 [pipeline_4]
 enabled = <bool>
 pipeline_name = <string>
 prompt = <string>
+near_duplicate_reuse = <bool>
+near_duplicate_threshold = <float>
+gate_field = <string>
+gate_threshold = <float>
+gate_sample_rate = <float>
+gate_missing = score|skip
+gate_defaults = <JSON object>
+priority_fields = <comma-separated list>
+max_concurrency = <integer>
+connections = <comma-separated list>
+hedge = <bool>
+hedge_delay = <float>
+circuit_failures = <integer>
+circuit_cooldown = <float>
+model = <string>
+max_tokens = <integer>
+temperature = <float>
+timeout = <float>
 
 [pipeline_5]
 enabled = <bool>
 pipeline_name = <string>
 prompt = <string>
+near_duplicate_reuse = <bool>
+near_duplicate_threshold = <float>
+gate_field = <string>
+gate_threshold = <float>
+gate_sample_rate = <float>
+gate_missing = score|skip
+gate_defaults = <JSON object>
+priority_fields = <comma-separated list>
+max_concurrency = <integer>
+connections = <comma-separated list>
+hedge = <bool>
+hedge_delay = <float>
+circuit_failures = <integer>
+circuit_cooldown = <float>
+model = <string>
+max_tokens = <integer>
+temperature = <float>
+timeout = <float>
 
 [pipeline_6]
 enabled = <bool>
 pipeline_name = <string>
 prompt = <string>
+near_duplicate_reuse = <bool>
+near_duplicate_threshold = <float>
+gate_field = <string>
+gate_threshold = <float>
+gate_sample_rate = <float>
+gate_missing = score|skip
+gate_defaults = <JSON object>
+priority_fields = <comma-separated list>
+max_concurrency = <integer>
+connections = <comma-separated list>
+hedge = <bool>
+hedge_delay = <float>
+circuit_failures = <integer>
+circuit_cooldown = <float>
+model = <string>
+max_tokens = <integer>
+temperature = <float>
+timeout = <float>
 
 [pipeline_7]
 enabled = <bool>
 pipeline_name = <string>
 prompt = <string>
+near_duplicate_reuse = <bool>
+near_duplicate_threshold = <float>
+gate_field = <string>
+gate_threshold = <float>
+gate_sample_rate = <float>
+gate_missing = score|skip
+gate_defaults = <JSON object>
+priority_fields = <comma-separated list>
+max_concurrency = <integer>
+connections = <comma-separated list>
+hedge = <bool>
+hedge_delay = <float>
+circuit_failures = <integer>
+circuit_cooldown = <float>
+model = <string>
+max_tokens = <integer>
+temperature = <float>
+timeout = <float>
 
 [pipeline_8]
 enabled = <bool>
 pipeline_name = <string>
 prompt = <string>
+near_duplicate_reuse = <bool>
+near_duplicate_threshold = <float>
+gate_field = <string>
+gate_threshold = <float>
+gate_sample_rate = <float>
+gate_missing = score|skip
+gate_defaults = <JSON object>
+priority_fields = <comma-separated list>
+max_concurrency = <integer>
+connections = <comma-separated list>
+hedge = <bool>
+hedge_delay = <float>
+circuit_failures = <integer>
+circuit_cooldown = <float>
+model = <string>
+max_tokens = <integer>
+temperature = <float>
+timeout = <float>
 
 [pipeline_9]
 enabled = <bool>
 pipeline_name = <string>
 prompt = <string>
+near_duplicate_reuse = <bool>
+near_duplicate_threshold = <float>
+gate_field = <string>
+gate_threshold = <float>
+gate_sample_rate = <float>
+gate_missing = score|skip
+gate_defaults = <JSON object>
+priority_fields = <comma-separated list>
+max_concurrency = <integer>
+connections = <comma-separated list>
+hedge = <bool>
+hedge_delay = <float>
+circuit_failures = <integer>
+circuit_cooldown = <float>
+model = <string>
+max_tokens = <integer>
+temperature = <float>
+timeout = <float>
 
 [pipeline_10]
 enabled = <bool>
 pipeline_name = <string>
 prompt = <string>
+near_duplicate_reuse = <bool>
+near_duplicate_threshold = <float>
+gate_field = <string>
+gate_threshold = <float>
+gate_sample_rate = <float>
+gate_missing = score|skip
+gate_defaults = <JSON object>
+priority_fields = <comma-separated list>
+max_concurrency = <integer>
+connections = <comma-separated list>
+hedge = <bool>
+hedge_delay = <float>
+circuit_failures = <integer>
+circuit_cooldown = <float>
+model = <string>
+max_tokens = <integer>
+temperature = <float>
+timeout = <float>
@@ -0,0 +1,15 @@
+#
+# ta_gen_ai_cim_perf.conf.spec - Run Performance Metrics Specification
+# TA-gen_ai_cim
+#
+
+[settings]
+enabled = <bool>
+* Write one JSON metrics event per run of genaiscore, aicase,
+  sync_snow_asset, pull_snow_inventory and create_snow_case to
+  $SPLUNK_HOME/var/log/splunk/ta_gen_ai_cim_perf.log
+* Each event carries per-stage timings (config_load, credential, kv, http,
+  search, parse, write, ...) and run counters
+* The scripts read this file from the app's default/ and local/ directories
+  on disk, so a change applies to the next run without a reload
+* Default: 0 (disabled)
@@ -29,6 +29,7 @@ import json
 import logging
 import socket
 import ssl
+import threading
 import time
 from base64 import b64encode
 from contextlib import contextmanager
@@ -56,6 +57,7 @@ __all__ = [
     "_make_cookie_header",
     "_NoAuthenticationToken",
     "namespace",
+    "pooled_handler",
 ]
 
 SENSITIVE_KEYS = [
@@ -1575,3 +1577,215 @@ def handler(key_file=None, cert_file=None, timeout=None, verify=False, context=N
         }
 
     return request
+
+
+class _PooledResponseReader(ResponseReader):
+    """A :class:`ResponseReader` that hands its keep-alive connection back to
+    the pool once the response body has been fully consumed, instead of
+    closing it.
+    """
+
+    def __init__(self, response, connection, release):
+        super().__init__(response, connection)
+        self._release = release
+        if response.length == 0 or response.status in _EMPTY_BODY_STATUSES:
+            # Nothing to read (204, 304, HEAD or Content-Length: 0), but
+            # HTTPResponse only marks itself closed after a read() call.
+            response.close()
+        if response.isclosed():
+            self._give_back()
+
+    def _give_back(self):
+        if self._connection is not None:
+            connection, self._connection = self._connection, None
+            self._release(connection)
+
+    def close(self):
+        """Closes this response. The connection is only reused if the body
+        was read to the end; otherwise its state is unknown and it is closed."""
+        if self._connection is not None and not self._response.isclosed():
+            self._connection.close()
+            self._connection = None
+        self._give_back()
+        self._response.close()
+
+    def read(self, size=None):
+        r = super().read(size)
+        if self._response.isclosed():
+            self._give_back()
+        return r
+
+
+# Responses that never carry a body.
+_EMPTY_BODY_STATUSES = (client.NO_CONTENT, client.NOT_MODIFIED)
+
+# Methods that may be sent again when a reused socket fails before a
+# response arrives; the server may have processed the first attempt.
+_IDEMPOTENT_METHODS = ("GET", "HEAD", "DELETE")
+
+# Errors raised when a pooled socket was closed by the server while idle.
+_STALE_CONNECTION_ERRORS = (
+    client.RemoteDisconnected,
+    client.BadStatusLine,
+    client.CannotSendRequest,
+    client.ResponseNotReady,
+    BrokenPipeError,
+    ConnectionResetError,
+    ConnectionAbortedError,
+)
+
+
+def pooled_handler(
+    key_file=None,
+    cert_file=None,
+    timeout=None,
+    verify=False,
+    context=None,
+    max_idle_per_host=4,
+    idle_timeout=10,
+):
+    """Returns an HTTP request handler that keeps persistent (keep-alive)
+    connections per ``(scheme, host, port)`` and reuses them across requests.
+
+    The returned handler is a drop-in replacement for :func:`handler` and can
+    be passed to :class:`Context` or :func:`splunklib.client.connect` via the
+    ``handler`` argument. A single handler may be shared by several
+    ``Context``/``Service`` objects (for example one per app namespace) talking
+    to the same splunkd, and is safe to use from multiple threads.
+
+    A connection is returned to the pool only after its response body has been
+    read to the end, or at once if it has no body. Idle connections older
+    than ``idle_timeout`` seconds are discarded rather than reused. A request
+    that fails on a reused socket because the server closed it while idle is
+    retried once on a fresh connection if it could not be sent, or if its
+    method is GET, HEAD or DELETE; other methods raise, since the server may
+    already have processed them.
+
+    :param `key_file`: A path to a PEM (Privacy Enhanced Mail) formatted file containing your private key (optional).
+    :type key_file: ``string``
+    :param `cert_file`: A path to a PEM (Privacy Enhanced Mail) formatted file containing a certificate chain file (optional).
+    :type cert_file: ``string``
+    :param `timeout`: The request time-out period, in seconds (optional).
+    :type timeout: ``integer`` or "None"
+    :param `verify`: Set to False to disable SSL verification on https connections.
+    :type verify: ``Boolean``
+    :param `context`: The SSLContext that can is used with the HTTPSConnection when verify=True is enabled and context is specified
+    :type context: ``SSLContext`
+    :param `max_idle_per_host`: The maximum number of idle connections kept per host.
+    :type max_idle_per_host: ``integer``
+    :param `idle_timeout`: Seconds an idle connection may be kept before it is discarded.
+        Keep this below the server's keep-alive idle timeout.
+    :type idle_timeout: ``integer``
+    """
+    lock = threading.Lock()
+    # (scheme, host, port) -> list of (connection, released_at)
+    idle = {}
+    ssl_context = [None]
+
+    def connect(scheme, host, port):
+        kwargs = {}
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        if scheme == "http":
+            return client.HTTPConnection(host, port, **kwargs)
+        if scheme == "https":
+            if key_file is not None:
+                kwargs["key_file"] = key_file
+            if cert_file is not None:
+                kwargs["cert_file"] = cert_file
+
+            if not verify:
+                # Build the unverified context once; it is immutable after
+                # creation and creating one per connection is not free.
+                if ssl_context[0] is None:
+                    ssl_context[0] = ssl._create_unverified_context()  # nosemgrep
+                kwargs["context"] = ssl_context[0]
+            elif context:
+                kwargs["context"] = context
+
+            return client.HTTPSConnection(host, port, **kwargs)
+        raise ValueError(f"unsupported scheme: {scheme}")
+
+    def acquire(key):
+        now = time.monotonic()
+        with lock:
+            pool = idle.get(key)
+            while pool:
+                connection, released_at = pool.pop()
+                if now - released_at <= idle_timeout and connection.sock is not None:
+                    return connection
+                connection.close()
+        return None
+
+    def release(key, connection):
+        if connection.sock is None:
+            return
+        with lock:
+            pool = idle.setdefault(key, [])
+            if len(pool) < max_idle_per_host:
+                pool.append((connection, time.monotonic()))
+                return
+        connection.close()
+
+    def receive(connection):
+        if timeout is not None:
+            connection.sock.settimeout(timeout)
+        return connection.getresponse()
+
+    def request(url, message, **kwargs):
+        scheme, host, port, path = _spliturl(url)
+        key = (scheme, host, port)
+        body = message.get("body", "")
+        head = {
+            "Content-Length": str(len(body)),
+            "Host": host,
+            "User-Agent": "splunk-sdk-python/%s" % __version__,
+            "Accept": "*/*",
+            "Connection": "Keep-Alive",
+        }  # defaults
+        for key_, value in message["headers"]:
+            head[key_] = value
+        method = message.get("method", "GET")
+
+        connection = acquire(key)
+        response = None
+        if connection is not None:
+            sent = False
+            try:
+                connection.request(method, path, body, head)
+                sent = True
+                response = receive(connection)
+            except _STALE_CONNECTION_ERRORS:
+                # The server closed the idle socket. Unless the request could
+                # not be sent, it may have been processed before the close.
+                connection.close()
+                if sent and method not in _IDEMPOTENT_METHODS:
+                    raise
+                connection = None
+            except Exception:
+                connection.close()
+                raise
+        if connection is None:
+            connection = connect(scheme, host, port)
+            try:
+                connection.request(method, path, body, head)
+                response = receive(connection)
+            except Exception:
+                connection.close()
+                raise
+
+        if response.will_close:
+            reader = ResponseReader(response, connection)
+        else:
+            reader = _PooledResponseReader(
+                response, connection, lambda c: release(key, c)
+            )
+
+        return {
+            "status": response.status,
+            "reason": response.reason,
+            "headers": response.getheaders(),
+            "body": reader,
+        }
+
+    return request
@@ -232,6 +232,65 @@ def _load_atom_entries(response):
     return entries if isinstance(entries, list) else [entries]
 
 
+# True if the response body is JSON (the request used output_mode=json)
+def _is_json(response):
+    for name, value in response.headers:
+        if name.lower() == "content-type":
+            return "json" in value
+    return False
+
+
+# Load the entries of an output_mode=json response
+def _load_json_entries(response):
+    return json.loads(response.body.read()).get("entry") or []
+
+
+# Convert a JSON value to what data.load returns for the same Atom
+# element: text (booleans as "1"/"0", blank strings as None), lists, and
+# Records for dicts.
+def _json_value(value):
+    if isinstance(value, str):
+        return value if value.strip() else None
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, dict):
+        return record((k, _json_value(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return [_json_value(v) for v in value]
+    if value is None:
+        return None
+    return str(value)
+
+
+# Parse the given output_mode=json entry into the same entity state record
+# _parse_atom_entry builds, without going through an XML tree
+def _parse_json_entry(entry):
+    content = entry.get("content") or {}
+    content = record(
+        (k, v if type(v) is str and v.strip() else _json_value(v))
+        for k, v in content.items()
+        if k not in ("eai:acl", "eai:attributes")
+    )
+    acl = entry.get("acl")
+    fields = entry.get("fields") or {}
+    return record(
+        {
+            "title": entry.get("name"),
+            "links": record(entry.get("links") or {}),
+            "access": None if acl is None else _json_value(acl),
+            "fields": record(
+                {
+                    "required": fields.get("required", []),
+                    "optional": fields.get("optional", []),
+                    "wildcard": fields.get("wildcard", []),
+                }
+            ),
+            "content": content,
+            "updated": entry.get("updated"),
+        }
+    )
+
+
 # Load the sid from the body of the given response
 def _load_sid(response, output_mode):
     if output_mode == "json":
@@ -788,10 +847,20 @@ class Endpoint:
     :class:`Entity` (essentially HTTP GET and POST methods).
     """
 
+    # When set (e.g. "json"), entity and collection reads request this
+    # output_mode. JSON responses are parsed by _parse_json_entry instead of
+    # building an ElementTree from the Atom feed.
+    _read_output_mode = None
+
     def __init__(self, service, path):
         self.service = service
         self.path = path
 
+    def _read_query(self, query):
+        if self._read_output_mode is not None:
+            query.setdefault("output_mode", self._read_output_mode)
+        return query
+
     def get_api_version(self, path):
         """Return the API version of the service used in the provided path.
 
@@ -1103,6 +1172,15 @@ class Entity(Endpoint):
 
     # Load the entity state record from the given response
     def _load_state(self, response):
+        if _is_json(response):
+            entries = _load_json_entries(response)
+            if len(entries) > 1:
+                apps = [ele.get("content", {}).get("eai:appName") for ele in entries]
+
+                raise AmbiguousReferenceException(
+                    f"Fetch from server returned multiple entries for name '{entries[0].get('name')}' in apps {apps}."
+                )
+            return _parse_json_entry(entries[0])
         entry = self._load_atom_entry(response)
         return _parse_atom_entry(entry)
 
@@ -1184,7 +1262,7 @@ class Entity(Endpoint):
         if state is not None:
             self._state = state
         else:
-            self._state = self.read(self.get())
+            self._state = self.read(self.get(**self._read_query({})))
         return self
 
     @property
@@ -1415,10 +1493,12 @@ class ReadOnlyCollection(Endpoint):
                 # have to extract values out.
                 key, ns = key
                 key = UrlEncoded(key, encode_slash=True)
-                response = self.get(key, owner=ns.owner, app=ns.app)
+                response = self.get(
+                    key, owner=ns.owner, app=ns.app, **self._read_query({})
+                )
             else:
                 key = UrlEncoded(key, encode_slash=True)
-                response = self.get(key)
+                response = self.get(key, **self._read_query({}))
             entries = self._load_list(response)
             if len(entries) > 1:
                 raise AmbiguousReferenceException(
@@ -1523,12 +1603,15 @@ class ReadOnlyCollection(Endpoint):
         # Some subclasses of Collection have to override this because
         # splunkd returns something that doesn't match
         # <feed><entry></entry><feed>.
-        entries = _load_atom_entries(response)
-        if entries is None:
-            return []
+        if _is_json(response):
+            states = [_parse_json_entry(entry) for entry in _load_json_entries(response)]
+        else:
+            entries = _load_atom_entries(response)
+            if entries is None:
+                return []
+            states = [_parse_atom_entry(entry) for entry in entries]
         entities = []
-        for entry in entries:
-            state = _parse_atom_entry(entry)
+        for state in states:
             entity = self.item(self.service, self._entity_path(state), state=state)
             entities.append(entity)
 
@@ -1569,7 +1652,10 @@ class ReadOnlyCollection(Endpoint):
                                         'visible'],
                                         'required': ['name'], 'wildcard': []}}
         """
-        response = self.get("_new")
+        response = self.get("_new", **self._read_query({}))
+        if _is_json(response):
+            state = _parse_json_entry(_load_json_entries(response)[0])
+            return record({"access": state.access, "fields": state.fields})
         content = _load_atom(response, MATCH_ENTRY_CONTENT)
         return _parse_atom_metadata(content)
 
@@ -1614,7 +1700,9 @@ class ReadOnlyCollection(Endpoint):
             count = self.null_count
         fetched = 0
         while count == self.null_count or fetched < count:
-            response = self.get(count=pagesize or count, offset=offset, **kwargs)
+            response = self.get(
+                count=pagesize or count, offset=offset, **self._read_query(dict(kwargs))
+            )
             items = self._load_list(response)
             N = len(items)
             fetched += N
@@ -1854,6 +1942,8 @@ class ConfigurationFile(Collection):
     # __init__'s arguments must match those of an Entity, not a
     # Collection, since it is being created as the elements of a
     # Configurations, which is a Collection subclass.
+    _read_output_mode = "json"
+
     def __init__(self, service, path, **kwargs):
         Collection.__init__(self, service, path, item=Stanza)
         self.name = kwargs["state"]["title"]
@@ -1882,7 +1972,7 @@ class Configurations(Collection):
         # This screws up the default implementation of __getitem__ from Collection, which thinks
         # that multiple entities means a name collision, so we have to override it here.
         try:
-            self.get(key)
+            self.get(key, output_mode="json")
             return ConfigurationFile(
                 self.service, PATH_CONF % key, state={"title": key}
             )
@@ -1896,7 +1986,7 @@ class Configurations(Collection):
         # configs/conf-{name} never returns a 404. We have to post to properties/{name}
         # in order to find out if a configuration exists.
         try:
-            self.get(key)
+            self.get(key, output_mode="json")
             return True
         except HTTPError as he:
             if he.status == 404:  # No entity matching key
@@ -1946,6 +2036,8 @@ class Configurations(Collection):
 class Stanza(Entity):
     """This class contains a single configuration stanza."""
 
+    _read_output_mode = "json"
+
     def submit(self, stanza):
         """Adds keys to the current configuration stanza as a
         dictionary of key-value pairs.
@@ -1974,6 +2066,8 @@ class Stanza(Entity):
 class StoragePassword(Entity):
     """This class contains a storage password."""
 
+    _read_output_mode = "json"
+
     def __init__(self, service, path, **kwargs):
         state = kwargs.get("state", None)
         kwargs["skip_refresh"] = kwargs.get("skip_refresh", state is not None)
@@ -2002,6 +2096,8 @@ class StoragePasswords(Collection):
     instance. Retrieve this collection using :meth:`Service.storage_passwords`.
     """
 
+    _read_output_mode = "json"
+
     def __init__(self, service):
         if service.namespace.owner == "-" or service.namespace.app == "-":
             raise ValueError("StoragePasswords cannot have wildcards in namespace.")
@@ -3892,6 +3988,8 @@ class Application(Entity):
 
 
 class KVStoreCollections(Collection):
+    _read_output_mode = "json"
+
     def __init__(self, service):
         Collection.__init__(
             self, service, "storage/collections/config", item=KVStoreCollection
@@ -3928,6 +4026,8 @@ class KVStoreCollections(Collection):
 
 
 class KVStoreCollection(Entity):
+    _read_output_mode = "json"
+
     @property
     def data(self):
         """Returns data object for this Collection.
@@ -30,19 +30,32 @@ as follows:::
     for item in reader:
         print(item)
     print(f"Results are a preview: {reader.is_preview}")
+
+:class:`StreamingJSONResultsReader` accepts the same JSON streams as
+:class:`JSONResultsReader` but decodes them incrementally, so memory stays
+bounded by the largest single result rather than by the whole response.
 """
 
+import codecs
+import re
+
 from io import BufferedReader, BytesIO
 
 
 import xml.etree.ElementTree as et
 
 from collections import OrderedDict
-from json import loads as json_loads
+from json import JSONDecoder, JSONDecodeError, loads as json_loads
 
-__all__ = ["ResultsReader", "Message", "JSONResultsReader"]
+__all__ = ["ResultsReader", "Message", "JSONResultsReader", "StreamingJSONResultsReader"]
 
-import deprecation
+try:
+    import deprecation
+except ImportError:
+    # deprecation is only used to decorate the XML ResultsReader. Splunk's
+    # bundled Python does not ship it, so its absence must not make the JSON
+    # readers unimportable.
+    deprecation = None
 
 
 class Message:
@@ -147,7 +160,13 @@ class _XMLDTDFilter:
         return response
 
 
-@deprecation.deprecated(
+def _deprecated(details):
+    if deprecation is None:
+        return lambda cls: cls
+    return deprecation.deprecated(details=details)
+
+
+@_deprecated(
     details="Use the JSONResultsReader function instead in conjuction with the 'output_mode' query param set to 'json'"
 )
 class ResultsReader:
@@ -339,3 +358,173 @@ class JSONResultsReader:
             if "results" in parsed_line:
                 for result in parsed_line["results"]:
                     yield result
+
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_VALUE_DELIMITERS = ",]} \t\r\n"
+
+
+class StreamingJSONResultsReader:
+    """This class returns dictionaries and Splunk messages from a JSON results
+    stream, decoding the stream incrementally.
+
+    ``StreamingJSONResultsReader`` is a drop-in replacement for
+    :class:`JSONResultsReader`. It accepts both shapes Splunk produces with
+    ``output_mode=json``:
+
+    * the line-delimited sequence of documents streamed by
+      ``search/jobs/export`` (one ``result`` per document), and
+    * a single document whose ``results`` array holds every row (
+      ``search/jobs/<sid>/results``, ``oneshot``).
+
+    :class:`JSONResultsReader` calls ``readlines()`` and then ``json.loads`` on
+    each line, so a single-document response is held in memory three times
+    over (raw lines, decoded text and parsed rows) before the first row is
+    returned. This reader pulls ``chunk_size`` bytes at a time, decodes them
+    with an incremental UTF-8 decoder and yields each element of ``results``
+    as soon as it is complete. Memory is bounded by the largest single row
+    plus one chunk.
+
+    Unlike :class:`JSONResultsReader`, every entry of a ``messages`` array is
+    returned as its own :class:`Message`.
+
+    :param `stream`: The stream to read from (any object that supports ``.read(n)``).
+    :param `chunk_size`: Number of bytes requested from *stream* per read.
+
+    **Example**::
+
+        import results
+        response = ... # the body of an HTTP response
+        reader = results.StreamingJSONResultsReader(response)
+        for result in reader:
+            if isinstance(result, dict):
+                print(f"Result: {result}")
+            elif isinstance(result, results.Message):
+                print(f"Message: {result}")
+        print(f"is_preview = {reader.is_preview}")
+    """
+
+    def __init__(self, stream, chunk_size=65536):
+        self.is_preview = None
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._scan = JSONDecoder().raw_decode
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self._gen = self._parse_results()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._gen)
+
+    def _fill(self, size):
+        """Append at least one more chunk of decoded text to the buffer.
+
+        Text that has already been consumed is dropped, so the buffer only
+        ever holds the value being decoded plus the unread tail.
+        """
+        data = self._stream.read(size)
+        if not data:
+            self._eof = True
+            text = self._decoder.decode(b"", final=True)
+        elif isinstance(data, str):
+            text = data
+        else:
+            text = self._decoder.decode(data)
+        self._buffer = self._buffer[self._pos:] + text
+        self._pos = 0
+
+    def _peek(self):
+        """Skip whitespace and return the next character, or None at end of stream."""
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if self._eof:
+                return None
+            self._fill(self._chunk_size)
+
+    def _expect(self, chars):
+        char = self._peek()
+        if char is None or char not in chars:
+            raise ValueError(f"Malformed JSON results stream: expected one of {chars!r}, got {char!r}")
+        self._pos += 1
+        return char
+
+    def _decode_value(self):
+        """Decode the next complete JSON value from the stream."""
+        while True:
+            if self._peek() is None:
+                raise ValueError("Malformed JSON results stream: unexpected end of stream")
+            try:
+                value, end = self._scan(self._buffer, self._pos)
+            except JSONDecodeError:
+                if self._eof:
+                    raise
+                # Grow the read with the pending text so a value larger than
+                # chunk_size is re-scanned a logarithmic number of times.
+                self._fill(max(self._chunk_size, len(self._buffer) - self._pos))
+                continue
+            if (not self._eof and self._buffer[self._pos] not in '"[{'
+                    and (end == len(self._buffer) or self._buffer[end] not in _VALUE_DELIMITERS)):
+                # A number cut at the chunk boundary (after "2", "2." or
+                # "2.5e") still decodes as a shorter one; only trust a
+                # scalar that is followed by a delimiter.
+                self._fill(self._chunk_size)
+                continue
+            self._pos = end
+            return value
+
+    def _handle(self, key, value):
+        """Return the results and messages carried by one decoded document member."""
+        if key == "preview":
+            self.is_preview = value
+        elif key == "messages":
+            return [Message(message.get("type", "Unknown Message Type"), message.get("text"))
+                    for message in value or ()]
+        elif key == "result":
+            return [value]
+        elif key == "results":
+            return value or ()
+        return ()
+
+    def _parse_results(self):
+        """Parse results and messages out of the stream, one document at a time."""
+        while self._peek() is not None:
+            # Export streams one small document per line: when the buffer
+            # already holds a full line, decode the document in one call.
+            newline = self._buffer.find("\n", self._pos)
+            if newline != -1:
+                try:
+                    document, end = self._scan(self._buffer, self._pos)
+                except JSONDecodeError:
+                    document = None
+                if isinstance(document, dict) and end <= newline:
+                    self._pos = end
+                    for key, value in document.items():
+                        yield from self._handle(key, value)
+                    continue
+            self._expect("{")
+            if self._peek() == "}":
+                self._pos += 1
+                continue
+            while True:
+                key = self._decode_value()
+                self._expect(":")
+                if key == "results" and self._peek() == "[":
+                    self._pos += 1
+                    if self._peek() == "]":
+                        self._pos += 1
+                    else:
+                        while True:
+                            yield self._decode_value()
+                            if self._expect(",]") == "]":
+                                break
+                else:
+                    yield from self._handle(key, self._decode_value())
+                if self._expect(",}") == "}":
+                    break
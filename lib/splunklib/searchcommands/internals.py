@@ -440,31 +440,108 @@ class Recorder:
 
     def __iter__(self):
         for line in self._file:
-            self._recording.write(line)
-            self._recording.flush()
+            self._record(line)
             yield line
 
-    def read(self, size=None):
-        value = self._file.read() if size is None else self._file.read(size)
+    def _record(self, value):
+        # The recording is binary; protocol v1 passes text, protocol v2 bytes
+        if isinstance(value, str):
+            value = value.encode("utf-8")
         self._recording.write(value)
         self._recording.flush()
+
+    def read(self, size=None):
+        value = self._file.read() if size is None else self._file.read(size)
+        self._record(value)
         return value
 
     def readline(self, size=None):
         value = self._file.readline() if size is None else self._file.readline(size)
         if len(value) > 0:
-            self._recording.write(value)
-            self._recording.flush()
+            self._record(value)
         return value
 
     def record(self, *args):
         for arg in args:
-            self._recording.write(arg)
+            self._record(arg)
 
     def write(self, text):
-        self._recording.write(text)
+        self._record(text)
         self._file.write(text)
-        self._recording.flush()
+
+
+def _encode_json(value):
+    return str("".join(RecordWriter._iterencode_json(value, 0)))
+
+
+def _encode_multivalue(value):
+    """Encode one item of a multi-value field as text."""
+    if value is None:
+        return ""
+
+    encode = _MULTIVALUE_ENCODERS.get(type(value))
+    if encode is not None:
+        return encode(value)
+
+    if isinstance(value, int):
+        return str(value)
+
+    if isinstance(value, (dict, list, tuple)):
+        return _encode_json(value)
+
+    return repr(value)
+
+
+def _encode_bool(value):
+    return str(value.real)
+
+
+def _identity(value):
+    return value
+
+
+def _decode_bytes(value):
+    return value.decode("utf-8", errors="backslashreplace")
+
+
+# Exact-type dispatch tables for RecordWriter; subclasses fall back to the
+# isinstance checks in _encode_value and _encode_multivalue.
+_SINGLE_VALUE_ENCODERS = {
+    str: _identity,
+    bool: _encode_bool,
+    bytes: _identity,
+    int: str,
+    float: str,
+    complex: str,
+    dict: _encode_json,
+}
+
+_MULTIVALUE_ENCODERS = {
+    str: _identity,
+    bool: _encode_bool,
+    bytes: _decode_bytes,
+    int: str,
+    float: str,
+    complex: str,
+    dict: _encode_json,
+    list: _encode_json,
+    tuple: _encode_json,
+}
+
+_STR_ONLY_TYPES = frozenset((str, type(None)))
+
+_csv_needs_quoting = re.compile(r'[,"\r\n]').search
+
+
+def _csv_quote(value):
+    """Quote one field the way csv.writer does for CsvDialect (QUOTE_MINIMAL)."""
+    if value is None:
+        return ""
+    if type(value) is not str:
+        value = str(value)
+    if _csv_needs_quoting(value):
+        return '"' + value.replace('"', '""') + '"'
+    return value
 
 
 class RecordWriter:
@@ -474,9 +551,7 @@ class RecordWriter:
         self._ofile = set_binary_mode(ofile)
         self._fieldnames = None
         self._buffer = StringIO()
-
-        self._writer = csv.writer(self._buffer, dialect=CsvDialect)
-        self._writerow = self._writer.writerow
+        self._encode_record = None
         self._finished = False
         self._flushed = False
 
@@ -557,8 +632,8 @@ class RecordWriter:
             write_record(record)
 
     def _clear(self):
-        self._buffer.seek(0)
-        self._buffer.truncate()
+        # A fresh StringIO is cheaper than truncating a large one in place
+        self._buffer = StringIO()
         self._inspector.clear()
         self._pending_record_count = 0
 
@@ -577,93 +652,89 @@ class RecordWriter:
             )
             value_list = map(lambda fn: (str(fn), str("__mv_") + str(fn)), fieldnames)
             self._writerow(list(chain.from_iterable(value_list)))
+            self._encode_record = self._compile_record_encoder(fieldnames)
 
-        get_value = record.get
-        values = []
+        self._buffer.write(self._encode_record(record))
+        self._pending_record_count += 1
 
-        for fieldname in fieldnames:
-            value = get_value(fieldname, None)
+        if self.pending_record_count >= self._maxresultrows:
+            self.flush(partial=True)
 
-            if value is None:
-                values += (None, None)
-                continue
+    def _writerow(self, values):
+        self._buffer.write(
+            ",".join([_csv_quote(value) for value in values]) + CsvDialect.lineterminator
+        )
 
-            value_t = type(value)
+    @staticmethod
+    def _compile_record_encoder(fieldnames):
+        """Return a function that encodes a record as one CSV row of value and
+        ``__mv_`` column pairs for *fieldnames*.
+
+        The encoder is built once per chunk header. Rows whose values are all
+        ``str`` (or missing) take a fast path that never builds ``__mv_``
+        values; other rows are encoded field by field with
+        :meth:`_encode_value`. Output is byte-for-byte what ``csv.writer``
+        produces for :class:`CsvDialect`.
+        """
+        lineterminator = CsvDialect.lineterminator
 
-            if issubclass(value_t, (list, tuple)):
-                if len(value) == 0:
-                    values += (None, None)
-                    continue
+        if not fieldnames:
+            return lambda record: lineterminator
 
-                if len(value) > 1:
-                    value_list = value
-                    sv = ""
-                    mv = "$"
-
-                    for value in value_list:
-                        if value is None:
-                            sv += "\n"
-                            mv += "$;$"
-                            continue
-
-                        value_t = type(value)
-
-                        if value_t is not bytes:
-                            if value_t is bool:
-                                value = str(value.real)
-                            elif value_t is str:
-                                value = value
-                            elif (
-                                isinstance(value, int)
-                                or value_t is float
-                                or value_t is complex
-                            ):
-                                value = str(value)
-                            elif issubclass(value_t, (dict, list, tuple)):
-                                value = str(
-                                    "".join(RecordWriter._iterencode_json(value, 0))
-                                )
-                            else:
-                                value = repr(value).encode(
-                                    "utf-8", errors="backslashreplace"
-                                )
-
-                        sv += value + "\n"
-                        mv += value.replace("$", "$$") + "$;$"
-
-                    values += (sv[:-1], mv[:-2])
-                    continue
+        str_only_types = _STR_ONLY_TYPES
+        encode_value = RecordWriter._encode_value
 
-                value = value[0]
-                value_t = type(value)
+        def encode_record(record):
+            values = list(map(record.get, fieldnames))
 
-            if value_t is bool:
-                values += (str(value.real), None)
-                continue
+            if str_only_types.issuperset(map(type, values)):
+                return (
+                    ",,".join([_csv_quote(value) if value else "" for value in values])
+                    + ","
+                    + lineterminator
+                )
 
-            if value_t is bytes:
-                values += (value, None)
-                continue
+            fields = []
+            for value in values:
+                if value is None:
+                    fields += ("", "")
+                    continue
+                sv, mv = encode_value(value)
+                fields += (_csv_quote(sv), _csv_quote(mv))
+            return ",".join(fields) + lineterminator
 
-            if value_t is str:
-                values += (value, None)
-                continue
+        return encode_record
 
-            if isinstance(value, int) or value_t is float or value_t is complex:
-                values += (str(value), None)
-                continue
+    @staticmethod
+    def _encode_value(value):
+        """Return the (value, __mv_value) column pair for a non-None field value."""
+        value_t = type(value)
+
+        if value_t is list or value_t is tuple or issubclass(value_t, (list, tuple)):
+            if len(value) == 0:
+                return None, None
+
+            if len(value) > 1:
+                values = [_encode_multivalue(item) for item in value]
+                return (
+                    "\n".join(values),
+                    "$" + "$;$".join([item.replace("$", "$$") for item in values]) + "$",
+                )
 
-            if issubclass(value_t, dict):
-                values += (str("".join(RecordWriter._iterencode_json(value, 0))), None)
-                continue
+            value = value[0]
+            value_t = type(value)
 
-            values += (repr(value), None)
+        encode = _SINGLE_VALUE_ENCODERS.get(value_t)
+        if encode is not None:
+            return encode(value), None
 
-        self._writerow(values)
-        self._pending_record_count += 1
+        if isinstance(value, int):
+            return str(value), None
 
-        if self.pending_record_count >= self._maxresultrows:
-            self.flush(partial=True)
+        if issubclass(value_t, dict):
+            return _encode_json(value), None
+
+        return repr(value), None
 
     try:
         # noinspection PyUnresolvedReferences
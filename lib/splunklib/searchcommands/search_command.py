@@ -23,10 +23,11 @@ import re
 import sys
 import tempfile
 import traceback
-from collections import namedtuple, OrderedDict
+from collections import namedtuple
 from copy import deepcopy
-from io import StringIO
+from io import BytesIO, StringIO, TextIOWrapper
 from itertools import chain, islice
+from operator import itemgetter
 from logging import _nameToLevel as _levelNames, getLevelName, getLogger
 from shutil import make_archive
 from time import time
@@ -49,8 +50,8 @@ from .internals import (
     RecordWriterV1,
     RecordWriterV2,
     json_encode_string,
+    set_binary_mode,
 )
-from ..client import Service
 from ..utils import ensure_str
 
 
@@ -390,6 +391,10 @@ class SearchCommand:
             )
             return None
 
+        # Imported here so commands that never touch splunkd do not pay for
+        # loading splunklib.client and splunklib.binding at startup.
+        from ..client import Service
+
         uri = urlsplit(splunkd_uri, allow_fragments=False)
 
         self._service = Service(
@@ -825,7 +830,10 @@ class SearchCommand:
             self.prepare()
 
             if self.record:
-                ifile, ofile = self._prepare_recording(argv, ifile, ofile)
+                # Chunks are read and written as bytes, so record the binary streams
+                ifile, ofile = self._prepare_recording(
+                    argv, self._as_binary_stream(ifile), set_binary_mode(ofile)
+                )
                 self._record_writer.ofile = ofile
 
                 # Record the metadata that initiated this command after removing the record option from args/raw_args
@@ -843,7 +851,7 @@ class SearchCommand:
                         ],
                     )
 
-                metadata = MetadataEncoder().encode(self._metadata)
+                metadata = MetadataEncoder().encode(self._metadata).encode("utf-8")
                 ifile.record("chunked 1.0,", str(len(metadata)), ",0\n", metadata)
 
             if self.show_configuration:
@@ -921,6 +929,9 @@ class SearchCommand:
 
     @staticmethod
     def _decode_list(mv):
+        if "$$" not in mv:
+            # No escaped "$", so every "$;$" is a separator
+            return mv[1:-1].split("$;$")
         return [
             match.replace("$$", "$")
             for match in SearchCommand._encoded_value.findall(mv)
@@ -1001,17 +1012,29 @@ class SearchCommand:
                 f"Failed to parse metadata of length {metadata_length}: {error}"
             )
 
-        # if body_length <= 0:
-        #     return metadata, ''
-
-        body = ""
+        # The body is returned as the bytes read from the stream. Decoding it
+        # to one str here (and copying that into a StringIO for csv.reader)
+        # held three copies of every chunk in memory before the first record
+        # was produced; _chunk_body_stream decodes it incrementally instead.
+        body = b""
         try:
             if body_length > 0:
                 body = istream.read(body_length)
         except Exception as error:
             raise RuntimeError(f"Failed to read body of length {body_length}: {error}")
 
-        return metadata, ensure_str(body, errors="replace")
+        return metadata, body
+
+    @staticmethod
+    def _chunk_body_stream(body):
+        """Return a text stream over a chunk body for csv.reader.
+
+        BytesIO shares the immutable body without copying it and
+        TextIOWrapper decodes it a block at a time as csv.reader pulls lines.
+        """
+        if isinstance(body, str):
+            return StringIO(body)
+        return TextIOWrapper(BytesIO(body), encoding="utf-8", errors="replace", newline="")
 
     _header = re.compile(r"chunked\s+1.0\s*,\s*(\d+)\s*,\s*(\d+)\s*\n")
 
@@ -1032,19 +1055,46 @@ class SearchCommand:
             if name.startswith("__mv_")
         )
 
+        # Records are plain dicts (insertion ordered) rather than OrderedDicts
         if len(mv_fieldnames) == 0:
             for values in reader:
-                yield OrderedDict(list(zip(fieldnames, values)))
+                yield dict(zip(fieldnames, values))
             return
 
+        # Splunk sends every field as a "name,__mv_name" column pair. Resolve
+        # the column positions once per chunk rather than once per value.
+        width = len(fieldnames)
+        names = []
+        positions = []
+        for position, fieldname in enumerate(fieldnames):
+            if not fieldname.startswith("__mv_") and fieldname not in names:
+                names.append(fieldname)
+                positions.append(position)
+        mv_positions = [
+            (position, mv_fieldnames[fieldname])
+            for position, fieldname in enumerate(fieldnames)
+            if fieldname in mv_fieldnames
+        ]
+        get_values = itemgetter(*positions) if len(positions) > 1 else None
+        decode_list = self._decode_list
+
         for values in reader:
-            record = OrderedDict()
-            for fieldname, value in zip(fieldnames, values):
-                if fieldname.startswith("__mv_"):
-                    if len(value) > 0:
-                        record[mv_fieldnames[fieldname]] = self._decode_list(value)
-                elif fieldname not in record:
-                    record[fieldname] = value
+            if len(values) != width or get_values is None:
+                record = {}
+                for fieldname, value in zip(fieldnames, values):
+                    if fieldname.startswith("__mv_"):
+                        if len(value) > 0:
+                            record[mv_fieldnames[fieldname]] = decode_list(value)
+                    elif fieldname not in record:
+                        record[fieldname] = value
+                yield record
+                continue
+
+            record = dict(zip(names, get_values(values)))
+            for position, fieldname in mv_positions:
+                value = values[position]
+                if value:
+                    record[fieldname] = decode_list(value)
             yield record
 
     def _execute_v2(self, ifile, process):
@@ -1077,7 +1127,7 @@ class SearchCommand:
                 "with empty records."
             )
 
-        records = self._read_csv_records(StringIO(body))
+        records = self._read_csv_records(self._chunk_body_stream(body))
         self._record_writer.write_records(process(records))
 
     def _report_unexpected_error(self):
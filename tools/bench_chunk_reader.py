@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# encoding=utf-8
+"""
+bench_chunk_reader.py - Developer-only microbenchmark for the protocol v2 chunk reader
+
+Times SearchCommand reading one execute chunk and materializing every
+record, the work done before a StreamingCommand sees its first record.
+The current reader (_read_chunk returning bytes, _chunk_body_stream,
+dict records) is compared with a copy of the previous one (decode the
+whole body to str, wrap it in StringIO, build OrderedDict records). Peak
+memory is measured with tracemalloc in a separate pass.
+
+Chunks hold synthetic index=gen_ai_log events (see
+bench_field_projection.py), either with every extracted field or
+projected to genaiscore's required_fields.
+
+This is NOT shipped in the Splunkbase / Splunk Cloud package
+(excluded by ../package.sh).
+
+Usage:
+    python3 tools/bench_chunk_reader.py
+    python3 tools/bench_chunk_reader.py --rows 1000 10000 --fields required
+
+Copyright 2026 Splunk Inc.
+Licensed under Apache License 2.0
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import OrderedDict
+from io import BytesIO, StringIO
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_field_projection import GenAIScoreCommand, _event, _search_time_fields, build_chunk
+from splunklib.searchcommands.internals import CsvDialect
+from splunklib.searchcommands.search_command import SearchCommand
+
+
+def _legacy_read(command, data):
+    """The reader as it was before: full str body, StringIO, OrderedDict rows."""
+    istream = BytesIO(data)
+    header = istream.readline()
+    metadata_length, body_length = SearchCommand._header.match(header.decode('utf-8')).groups()
+    istream.read(int(metadata_length))
+    body = istream.read(int(body_length)).decode('utf-8', errors='replace')
+    reader = csv.reader(StringIO(body), dialect=CsvDialect)
+    fieldnames = next(reader)
+    mv_fieldnames = dict((name, name[len('__mv_'):]) for name in fieldnames if name.startswith('__mv_'))
+    for values in reader:
+        record = OrderedDict()
+        for fieldname, value in zip(fieldnames, values):
+            if fieldname.startswith('__mv_'):
+                if len(value) > 0:
+                    record[mv_fieldnames[fieldname]] = [
+                        match.replace('$$', '$') for match in SearchCommand._encoded_value.findall(value)]
+            elif fieldname not in record:
+                record[fieldname] = value
+        yield record
+
+
+def _current_read(command, data):
+    metadata, body = command._read_chunk(BytesIO(data))
+    return command._read_csv_records(command._chunk_body_stream(body))
+
+
+READERS = (('previous', _legacy_read), ('current', _current_read))
+
+
+def measure(read, command, data, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in read(command, data):
+            pass
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    for _ in read(command, data):
+        pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--fields', choices=('all', 'required', 'both'), default='both',
+                        help='every extracted field, genaiscore required_fields, or both')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per case; the best is reported')
+    args = parser.parse_args()
+
+    command = GenAIScoreCommand()
+    required = set(GenAIScoreCommand._required_fields())
+    search_time_fields = _search_time_fields()
+    projections = ('all', 'required') if args.fields == 'both' else (args.fields,)
+    report = []
+    for rows in args.rows:
+        rng = random.Random(rows)
+        records = [_event(rng, i, search_time_fields) for i in range(rows)]
+        for projection in projections:
+            chunk_records = records if projection == 'all' else [
+                {k: v for k, v in record.items() if k in required} for record in records]
+            data = build_chunk(chunk_records)
+            for name, read in READERS:
+                elapsed, peak = measure(read, command, data, args.repeat)
+                result = {
+                    'reader': name,
+                    'fields': projection,
+                    'rows': rows,
+                    'chunk_mb': round(len(data) / (1024.0 * 1024.0), 1),
+                    'decode_ms': round(elapsed * 1000, 1),
+                    'us_per_row': round(elapsed * 1e6 / rows, 1),
+                    'peak_mb': round(peak / (1024.0 * 1024.0), 1),
+                }
+                print('{reader:<9} {fields:<8} {rows:>6} rows  {chunk_mb:>7.1f} MB chunk  '
+                      '{decode_ms:>8.1f} ms  {us_per_row:>6.1f} us/row  peak {peak_mb:>7.1f} MB'.format(**result),
+                      file=sys.stderr)
+                report.append(result)
+            del data, chunk_records
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
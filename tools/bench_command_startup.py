@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# encoding=utf-8
+"""
+bench_command_startup.py - Developer-only startup benchmark for the custom search commands
+
+Splunk starts a fresh Python process for every search (and on every search
+peer) that uses genaiscore or aicase, so import-time work is paid on each
+run. This script spawns each command the way splunkd does for chunked = true
+(protocol v2, no command-line arguments), sends the getinfo chunk and
+measures the wall time until the command's first reply chunk arrives.
+
+With --budget-ms it exits non-zero when any command's median time to first
+chunk exceeds the budget, so it can be used as a regression check.
+--importtime prints the slowest modules from "python -X importtime".
+
+This is NOT shipped in the Splunkbase / Splunk Cloud package
+(excluded by ../package.sh).
+
+Usage:
+    python3 tools/bench_command_startup.py
+    python3 tools/bench_command_startup.py --runs 20 --budget-ms 250
+    python3 tools/bench_command_startup.py --importtime
+
+Copyright 2026 Splunk Inc.
+Licensed under Apache License 2.0
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+TA_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BIN_PATH = os.path.join(TA_ROOT, 'bin')
+
+COMMANDS = {
+    'genaiscore': ['pipeline=pipeline_1'],
+    'aicase': ['event_id=abc123', 'mode=lookup'],
+}
+
+
+def _getinfo_chunk(command, args, splunk_home):
+    metadata = json.dumps({
+        'action': 'getinfo',
+        'preview': False,
+        'searchinfo': {
+            'args': args,
+            'raw_args': args,
+            'app': 'TA-gen_ai_cim',
+            'owner': 'admin',
+            'username': 'admin',
+            'session_key': 'bench',
+            'splunkd_uri': 'https://127.0.0.1:8089',
+            'splunk_version': '9.3.0',
+            'search': '| {} {}'.format(command, ' '.join(args)),
+            'earliest_time': '0',
+            'latest_time': '0',
+            'maxresultrows': 50000,
+            'sid': 'bench_startup',
+            'dispatch_dir': os.path.join(splunk_home, 'var', 'run', 'splunk', 'dispatch', 'bench_startup'),
+        },
+    }).encode('utf-8')
+    return 'chunked 1.0,{},0\n'.format(len(metadata)).encode('utf-8') + metadata
+
+
+def time_to_first_chunk(command, args, env):
+    """Spawn *command*, send getinfo and return (seconds until its first reply
+    chunk header, reply metadata)."""
+    chunk = _getinfo_chunk(command, args, env['SPLUNK_HOME'])
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(BIN_PATH, command + '.py')],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, env=env)
+    try:
+        proc.stdin.write(chunk)
+        proc.stdin.flush()
+        header = proc.stdout.readline()
+        elapsed = time.perf_counter() - start
+        metadata_length = int(header.split(b',')[1]) if header.startswith(b'chunked 1.0,') else 0
+        reply = json.loads(proc.stdout.read(metadata_length) or b'{}')
+    finally:
+        proc.kill()
+        proc.wait()
+    if not header.startswith(b'chunked 1.0,'):
+        raise RuntimeError('{} did not answer getinfo (got {!r})'.format(command, header[:80]))
+    return elapsed, reply
+
+
+def importtime(command, env, top):
+    """Return the *top* modules by cumulative import time (microseconds) for *command*."""
+    out = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import {}'.format(command)],
+        cwd=BIN_PATH, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        universal_newlines=True, check=True).stderr
+    rows = []
+    for line in out.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = [part.strip() for part in line[len('import time:'):].split('|')]
+        rows.append((int(cumulative_us), int(self_us), name))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--command', choices=sorted(COMMANDS), action='append',
+                        help='command to measure (repeatable; default all)')
+    parser.add_argument('--budget-ms', type=float, default=None,
+                        help='fail when a median time to first chunk exceeds this')
+    parser.add_argument('--importtime', action='store_true',
+                        help='also print the slowest imports for each command')
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    commands = args.command or sorted(COMMANDS)
+    report = []
+    over_budget = []
+    with tempfile.TemporaryDirectory(prefix='bench_command_startup_') as splunk_home:
+        os.makedirs(os.path.join(splunk_home, 'var', 'log', 'splunk'))
+        env = dict(os.environ, SPLUNK_HOME=splunk_home)
+        for command in commands:
+            # One unmeasured run warms the page cache and .pyc files, and
+            # confirms the command accepted getinfo
+            _, reply = time_to_first_chunk(command, COMMANDS[command], env)
+            messages = (reply.get('inspector') or {}).get('messages')
+            if messages:
+                raise RuntimeError('{} rejected getinfo: {}'.format(command, messages))
+            samples = [time_to_first_chunk(command, COMMANDS[command], env)[0] for _ in range(args.runs)]
+            result = {
+                'command': command,
+                'runs': args.runs,
+                'median_ms': round(statistics.median(samples) * 1000, 1),
+                'min_ms': round(min(samples) * 1000, 1),
+                'max_ms': round(max(samples) * 1000, 1),
+            }
+            print('{command:<12} first chunk median {median_ms:>7.1f} ms  '
+                  'min {min_ms:>7.1f} ms  max {max_ms:>7.1f} ms'.format(**result), file=sys.stderr)
+            if args.importtime:
+                result['slowest_imports'] = []
+                for cumulative_us, self_us, name in importtime(command, env, args.top):
+                    print('    {:>8.1f} ms cumulative  {:>7.1f} ms self  {}'.format(
+                        cumulative_us / 1000.0, self_us / 1000.0, name), file=sys.stderr)
+                    result['slowest_imports'].append(
+                        {'module': name, 'cumulative_ms': cumulative_us / 1000.0, 'self_ms': self_us / 1000.0})
+            if args.budget_ms is not None and result['median_ms'] > args.budget_ms:
+                over_budget.append(command)
+            report.append(result)
+
+    print(json.dumps(report, indent=2))
+    if over_budget:
+        print('Over the {} ms startup budget: {}'.format(args.budget_ms, ', '.join(over_budget)), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# encoding=utf-8
+"""
+bench_entity_parse.py - Developer-only benchmark for splunklib entity parsing
+
+Builds the same synthetic splunkd collection response twice, as an Atom XML
+feed and as output_mode=json, and times splunklib.client turning each into
+entities (ReadOnlyCollection._load_list, the path taken by service.confs[...]
+iteration, service.storage_passwords and service.kvstore[...]). Before
+timing, the entity state (title, links, access, fields, content) parsed from
+both formats is compared so the JSON path is checked for parity.
+
+Profiles:
+    conf       - ta_gen_ai_cim_genai_scoring-style stanzas (~25 keys each)
+    passwords  - storage/passwords entries
+    kvstore    - storage/collections/config entries with field.* and
+                 accelerated_fields.* keys
+
+This is NOT shipped in the Splunkbase / Splunk Cloud package
+(excluded by ../package.sh).
+
+Usage:
+    python3 tools/bench_entity_parse.py
+    python3 tools/bench_entity_parse.py --entries 10 100 1000 --profile conf
+
+Copyright 2026 Splunk Inc.
+Licensed under Apache License 2.0
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from io import BytesIO
+from xml.sax.saxutils import escape, quoteattr
+
+TA_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(TA_ROOT, 'lib'))
+
+from splunklib import client
+from splunklib.data import record
+
+APP = 'TA-gen_ai_cim'
+BASE = '/servicesNS/nobody/{}/'.format(APP)
+
+ACL = {
+    'app': APP, 'can_change_perms': True, 'can_list': True, 'can_share_app': True,
+    'can_share_global': True, 'can_share_user': False, 'can_write': True,
+    'modifiable': True, 'owner': 'nobody', 'perms': {'read': ['*'], 'write': ['admin', 'sc_admin']},
+    'removable': False, 'sharing': 'app',
+}
+
+
+def _conf_content(i):
+    content = {
+        'disabled': False,
+        'eai:appName': APP,
+        'eai:userName': 'nobody',
+        'description': 'Scoring pipeline {}'.format(i),
+        'connection_name': 'openai_prod',
+        'model': 'gpt-4o-mini',
+        'max_tokens': '1024',
+        'temperature': '0',
+        'timeout': '60',
+        'batch_size': '20',
+        'system_prompt': 'You are a strict GenAI safety evaluator. ' * 8,
+        'user_prompt_template': 'Score the following exchange: {input} => {output}',
+        'output_fields': 'gen_ai.scoring.pii_score,gen_ai.scoring.toxicity_score',
+        'enabled': '1',
+        'empty_value': '',
+    }
+    for n in range(10):
+        content['score.threshold_{}'.format(n)] = '0.{}'.format(n)
+    return 'pipeline_{}'.format(i), 'configs/conf-ta_gen_ai_cim_genai_scoring/', content
+
+
+def _password_content(i):
+    realm = 'ta_gen_ai_cim_account__account_{}'.format(i)
+    name = 'password' if i % 2 else 'client_secret'
+    content = {
+        'clear_password': 'sEcReT-{:08d}'.format(i),
+        'encr_password': '$7$' + 'x' * 80,
+        'password': '********',
+        'realm': realm,
+        'username': name,
+        'eai:appName': APP,
+        'eai:userName': 'nobody',
+    }
+    return '{}:{}:'.format(realm, name), 'storage/passwords/', content
+
+
+def _kvstore_content(i):
+    content = {
+        'disabled': False,
+        'eai:appName': APP,
+        'eai:userName': 'nobody',
+        'enforceTypes': True,
+        'replicate': False,
+        'accelerated_fields.by_event': '{"gen_ai_event_id": 1}',
+    }
+    for n, name in enumerate(('gen_ai_event_id', 'sys_id', 'case_number', 'state', 'priority',
+                              'assignment_group', 'created_at', 'updated_at')):
+        content['field.{}'.format(name)] = 'number' if n % 4 == 3 else 'string'
+    return 'gen_ai_collection_{}'.format(i), 'storage/collections/config/', content
+
+
+PROFILES = {
+    'conf': (_conf_content, 'configs/conf-ta_gen_ai_cim_genai_scoring/'),
+    'passwords': (_password_content, 'storage/passwords/'),
+    'kvstore': (_kvstore_content, 'storage/collections/config/'),
+}
+
+
+def _atom_value(value):
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, dict):
+        return '<s:dict>{}</s:dict>'.format(''.join(
+            '<s:key name={}>{}</s:key>'.format(quoteattr(k), _atom_value(v)) for k, v in value.items()))
+    if isinstance(value, list):
+        return '<s:list>{}</s:list>'.format(''.join('<s:item>{}</s:item>'.format(_atom_value(v)) for v in value))
+    return escape(str(value))
+
+
+def _links(path):
+    href = BASE + path
+    return {'alternate': href, 'list': href, '_reload': href + '/_reload', 'edit': href,
+            'remove': href, 'disable': href + '/disable'}
+
+
+def build_responses(profile, count):
+    """Return (atom bytes, json bytes) for a collection of *count* entries."""
+    make, collection_path = PROFILES[profile]
+    updated = '2026-10-19T12:00:00+00:00'
+    fields = {'required': [], 'optional': ['description', 'disabled'], 'wildcard': ['.*']}
+    atom_entries = []
+    json_entries = []
+    for i in range(count):
+        name, path, content = make(i)
+        links = _links(path + client.UrlEncoded(name, encode_slash=True))
+        atom_content = dict(content)
+        atom_content['eai:acl'] = ACL
+        atom_content['eai:attributes'] = {'optionalFields': fields['optional'],
+                                          'requiredFields': fields['required'],
+                                          'wildcardFields': fields['wildcard']}
+        atom_entries.append(
+            '<entry><title>{title}</title><id>https://127.0.0.1:8089{alt}</id><updated>{updated}</updated>'
+            '{links}<author><name>nobody</name></author>'
+            '<content type="text/xml">{content}</content></entry>'.format(
+                title=escape(name), alt=escape(links['alternate']), updated=updated,
+                links=''.join('<link href={} rel={}/>'.format(quoteattr(href), quoteattr(rel))
+                              for rel, href in links.items()),
+                content=_atom_value(atom_content)))
+        json_content = dict(content)
+        json_content['eai:acl'] = None
+        json_entries.append({'name': name, 'id': 'https://127.0.0.1:8089' + links['alternate'],
+                             'updated': updated, 'links': links, 'author': 'nobody', 'acl': ACL,
+                             'fields': fields, 'content': json_content})
+    atom = (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<feed xmlns="http://www.w3.org/2005/Atom" xmlns:s="http://dev.splunk.com/ns/rest" '
+        'xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">'
+        '<title>{path}</title><id>https://127.0.0.1:8089{base}{path}</id><updated>{updated}</updated>'
+        '<generator build="bench" version="9.3.0"/><author><name>Splunk</name></author>'
+        '<opensearch:totalResults>{count}</opensearch:totalResults>'
+        '<opensearch:itemsPerPage>{count}</opensearch:itemsPerPage>'
+        '<opensearch:startIndex>0</opensearch:startIndex><s:messages/>{entries}</feed>'.format(
+            path=escape(collection_path), base=BASE, updated=updated, count=count,
+            entries=''.join(atom_entries))
+    ).encode('utf-8')
+    body = json.dumps({'links': {}, 'origin': 'https://127.0.0.1:8089' + BASE + collection_path,
+                       'updated': updated, 'generator': {'build': 'bench', 'version': '9.3.0'},
+                       'entry': json_entries, 'paging': {'total': count, 'perPage': count, 'offset': 0},
+                       'messages': []}).encode('utf-8')
+    return atom, body
+
+
+def _response(body, content_type):
+    return record({'status': 200, 'reason': 'OK', 'body': BytesIO(body),
+                   'headers': [('Content-Type', content_type)]})
+
+
+def _collection(service, profile):
+    path = PROFILES[profile][1]
+    if profile == 'conf':
+        return client.ConfigurationFile(service, path, state={'title': 'ta_gen_ai_cim_genai_scoring'})
+    if profile == 'passwords':
+        return client.StoragePasswords(service)
+    return client.KVStoreCollections(service)
+
+
+def _state(entity):
+    state = entity.state
+    return {key: state[key] for key in ('title', 'links', 'access', 'fields', 'content')}
+
+
+def bench(collection, body, content_type, repeat):
+    """Return (best seconds for _load_list, entities)."""
+    best = None
+    entities = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        entities = collection._load_list(_response(body, content_type))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, entities
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--entries', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--profile', choices=sorted(PROFILES) + ['all'], default='all')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per case; the best is reported')
+    args = parser.parse_args()
+
+    service = client.Service(owner='nobody', app=APP)
+    profiles = sorted(PROFILES) if args.profile == 'all' else [args.profile]
+    report = []
+    for profile in profiles:
+        collection = _collection(service, profile)
+        for count in args.entries:
+            atom, body = build_responses(profile, count)
+            atom_s, atom_entities = bench(collection, atom, 'text/xml; charset=utf-8', args.repeat)
+            json_s, json_entities = bench(collection, body, 'application/json; charset=UTF-8', args.repeat)
+            mismatches = sum(1 for a, b in zip(atom_entities, json_entities) if _state(a) != _state(b))
+            if len(atom_entities) != count or len(json_entities) != count or mismatches:
+                raise RuntimeError('{}: Atom and JSON parsing disagree on {} of {} entries'.format(
+                    profile, mismatches or abs(len(atom_entities) - len(json_entities)), count))
+            result = {
+                'profile': profile,
+                'entries': count,
+                'atom_kb': round(len(atom) / 1024.0, 1),
+                'json_kb': round(len(body) / 1024.0, 1),
+                'atom_us_per_entry': round(atom_s * 1e6 / count, 1),
+                'json_us_per_entry': round(json_s * 1e6 / count, 1),
+                'speedup': round(atom_s / json_s, 2) if json_s else None,
+            }
+            print('{profile:<10} {entries:>5} entries  atom {atom_us_per_entry:>8.1f} us/entry '
+                  '({atom_kb:>8.1f} KB)  json {json_us_per_entry:>8.1f} us/entry ({json_kb:>8.1f} KB)  '
+                  'x{speedup}'.format(**result), file=sys.stderr)
+            report.append(result)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
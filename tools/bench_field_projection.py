@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# encoding=utf-8
+"""
+bench_field_projection.py - Developer-only benchmark for genaiscore/aicase field projection
+
+Builds one chunked protocol v2 chunk of synthetic gen_ai_log events twice:
+once with every field Splunk extracts for the index (the _raw JSON, the
+input_messages{}.* / output_messages{}.* expansions and every FIELDALIAS /
+EVAL output of [index::gen_ai_log] in default/props.conf), and once
+restricted to the command's required_fields. Reports chunk bytes and the
+time SearchCommand spends decoding the chunk (_read_chunk plus building
+every record with _read_csv_records).
+
+This is NOT shipped in the Splunkbase / Splunk Cloud package
+(excluded by ../package.sh).
+
+Usage:
+    python3 tools/bench_field_projection.py
+    python3 tools/bench_field_projection.py --rows 1000 --command aicase
+
+Copyright 2026 Splunk Inc.
+Licensed under Apache License 2.0
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from io import BytesIO
+
+TA_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(TA_ROOT, 'lib'))
+sys.path.insert(0, os.path.join(TA_ROOT, 'bin'))
+# genaiscore opens its debug log under $SPLUNK_HOME/var/log/splunk
+os.environ.setdefault('SPLUNK_HOME', tempfile.mkdtemp(prefix='bench_field_projection_'))
+os.makedirs(os.path.join(os.environ['SPLUNK_HOME'], 'var', 'log', 'splunk'), exist_ok=True)
+
+from splunklib.searchcommands.internals import RecordWriterV2
+from aicase import AICaseCommand
+from genaiscore import GenAIScoreCommand
+
+
+def _search_time_fields():
+    """Field names produced by FIELDALIAS/EVAL in [index::gen_ai_log]."""
+    fields = []
+    in_stanza = False
+    with open(os.path.join(TA_ROOT, 'default', 'props.conf'), encoding='utf-8') as f:
+        for line in f:
+            if line.startswith('['):
+                in_stanza = line.strip() == '[index::gen_ai_log]'
+                continue
+            if not in_stanza:
+                continue
+            if line.startswith('FIELDALIAS-'):
+                fields.extend(re.findall(r'\bAS\s+("?)([^\s"]+)\1', line, flags=re.IGNORECASE))
+            elif line.startswith('EVAL-'):
+                fields.append(('', line[len('EVAL-'):].split('=', 1)[0].strip()))
+    return [name for _, name in fields]
+
+
+def _event(rng, i, search_time_fields):
+    turns = rng.randint(2, 6)
+    input_messages = [{'role': rng.choice(['system', 'user']), 'content': 'prompt text ' * rng.randint(10, 80)}
+                      for _ in range(turns)]
+    output_messages = [{'role': 'assistant', 'content': 'response text ' * rng.randint(20, 150)}]
+    raw = {
+        'timestamp': '2026-10-19T12:00:{:02d}.000000Z'.format(i % 60),
+        'gen_ai.event.id': 'evt-{:012d}'.format(i),
+        'gen_ai.request.id': 'req-{:012d}'.format(i),
+        'gen_ai.session.id': 'sess-{:06d}'.format(i // 10),
+        'gen_ai.app.name': 'medadvice',
+        'gen_ai.request.model': 'gpt-4o',
+        'service.name': 'medadvice-api',
+        'client.address': '10.0.{}.{}'.format(i % 255, (i // 255) % 255),
+        'trace_id': '{:032x}'.format(rng.getrandbits(128)),
+        'input_messages': input_messages,
+        'output_messages': output_messages,
+    }
+    record = {'_time': str(1760875200 + i), 'host': 'gw-01', 'source': 'genai_gateway',
+              'sourcetype': 'medadvice:json', 'index': 'gen_ai_log', '_raw': json.dumps(raw)}
+    for key, value in raw.items():
+        if isinstance(value, list):
+            record[key + '{}.role'] = [m['role'] for m in value]
+            record[key + '{}.content'] = [m['content'] for m in value]
+        else:
+            record[key] = value
+    record['gen_ai.input.messages'] = ' '.join(m['content'] for m in input_messages)
+    record['gen_ai.output.messages'] = ' '.join(m['content'] for m in output_messages)
+    for name in search_time_fields:
+        record.setdefault(name, 'value-{}'.format(rng.randint(0, 999)))
+    return record
+
+
+def build_chunk(records):
+    ofile = BytesIO()
+    writer = RecordWriterV2(ofile, maxresultrows=len(records) + 1)
+    writer.write_records(records)
+    writer.write_chunk(finished=False)
+    return ofile.getvalue()
+
+
+def decode_chunk(command, data, repeat):
+    """Return (best seconds to read and materialize every record, record count)."""
+    best = None
+    count = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        metadata, body = command._read_chunk(BytesIO(data))
+        count = sum(1 for _ in command._read_csv_records(command._chunk_body_stream(body)))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, count
+
+
+def required_fields(name):
+    if name == 'genaiscore':
+        return GenAIScoreCommand._required_fields()
+    command = AICaseCommand()
+    command.prepare()
+    return command.configuration.required_fields
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--rows', type=int, default=5000, help='records per chunk (default 5000)')
+    parser.add_argument('--command', choices=('genaiscore', 'aicase', 'both'), default='both')
+    parser.add_argument('--repeat', type=int, default=3, help='decode runs per case; the best is reported')
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    search_time_fields = _search_time_fields()
+    records = [_event(rng, i, search_time_fields) for i in range(args.rows)]
+
+    commands = ('genaiscore', 'aicase') if args.command == 'both' else (args.command,)
+    report = []
+    for name in commands:
+        fields = required_fields(name)
+        projected = [{k: v for k, v in record.items() if k in fields} for record in records]
+        decoder = GenAIScoreCommand() if name == 'genaiscore' else AICaseCommand()
+        for label, chunk_records in (('all fields', records), ('required_fields', projected)):
+            data = build_chunk(chunk_records)
+            elapsed, count = decode_chunk(decoder, data, args.repeat)
+            result = {
+                'command': name,
+                'projection': label,
+                'rows': count,
+                'fields': len(chunk_records[0]),
+                'chunk_mb': round(len(data) / (1024.0 * 1024.0), 2),
+                'decode_ms': round(elapsed * 1000, 1),
+            }
+            print('{command:<10} {projection:<15} {fields:>4} fields  {chunk_mb:>8.2f} MB  '
+                  'decode {decode_ms:>8.1f} ms'.format(**result), file=sys.stderr)
+            report.append(result)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+# encoding=utf-8
+"""
+bench_genaiscore_throughput.py - Developer-only scoring throughput benchmark for genaiscore
+
+Feeds synthetic gen_ai_log events through GenAIScoreCommand.stream, chunk
+by chunk as splunkd does, against mock_llm_server.py, and reports for each
+configuration (provider shape x scenario x max_concurrency):
+
+    events_per_sec         events out of stream() per wall-clock second
+    latency_ms p50/p95/p99 request latency recorded on scored events
+                           (genai_scoring_latency_ms)
+    parse_failure_rate     events whose reply arrived but did not parse
+    error counts           HTTP 429, HTTP 5xx and other failures
+
+The mock server runs in its own process (one per configuration), so its
+threads do not compete with the command for the GIL. Pipeline settings and
+the LLM connection are set on the command directly; no splunkd is needed.
+
+Scenarios:
+    fast     - 20 ms replies, no faults (client-side overhead dominates)
+    typical  - 800 +/- 250 ms replies, no faults
+    flaky    - 400 +/- 150 ms, 2% HTTP 500, 5% HTTP 429, 3% malformed replies
+    prefill  - 300 +/- 50 ms plus 150 us per uncached prompt token, no faults
+               (use with --prompt-tokens to see the effect of prompt caching)
+
+--structured-output off sends the requests without provider-native
+structured output (response_format / forced tool call / responseSchema),
+as before structured_output existed; the mock server only injects
+malformed replies into those. --prompt-tokens pads the pipeline prompt
+to about that many tokens (scoring prompts are typically 2-3k), and
+--prompt-cache off sends requests without the prompt-cache layout
+(prompt_cache = false); cached_input_share reports the fraction of input
+tokens the provider read from its cache.
+
+--time-budget N sets genaiscore's time_budget: events are scored highest
+priority first (the synthetic events carry random prompt-injection and
+PII scores and occasional guardrail flags) and the rest come back
+deferred. deferred counts them, and priority_scored / priority_deferred
+give the mean priority of each group. events_per_sec then counts every
+event returned, deferred ones included.
+
+Results are printed (or written with --output) as JSON. With --baseline
+and --max-regression the script exits non-zero when a configuration's
+events/sec falls more than that percentage below the baseline file.
+
+This is NOT shipped in the Splunkbase / Splunk Cloud package
+(excluded by ../package.sh).
+
+Usage:
+    python3 tools/bench_genaiscore_throughput.py
+    python3 tools/bench_genaiscore_throughput.py --provider openai --provider anthropic \\
+        --scenario typical --concurrency 8 32 64 --events 2000
+    python3 tools/bench_genaiscore_throughput.py --scenario flaky --structured-output on off
+    python3 tools/bench_genaiscore_throughput.py --scenario prefill --prompt-tokens 2500 \
+        --prompt-cache on off
+    python3 tools/bench_genaiscore_throughput.py --scenario typical --concurrency 8 \
+        --events 2000 --time-budget 30
+    python3 tools/bench_genaiscore_throughput.py --output base.json
+    python3 tools/bench_genaiscore_throughput.py --baseline base.json --max-regression 10
+
+Copyright 2026 Splunk Inc.
+Licensed under Apache License 2.0
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import datetime, timezone
+
+TA_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BIN_PATH = os.path.join(TA_ROOT, 'bin')
+TOOLS_PATH = os.path.dirname(os.path.abspath(__file__))
+
+SCENARIOS = {
+    'fast': {'latency_ms': 20, 'jitter_ms': 0, 'error_rate': 0.0,
+             'rate_limit_rate': 0.0, 'malformed_rate': 0.0},
+    'typical': {'latency_ms': 800, 'jitter_ms': 250, 'error_rate': 0.0,
+                'rate_limit_rate': 0.0, 'malformed_rate': 0.0},
+    'flaky': {'latency_ms': 400, 'jitter_ms': 150, 'error_rate': 0.02,
+              'rate_limit_rate': 0.05, 'malformed_rate': 0.03},
+    'prefill': {'latency_ms': 300, 'jitter_ms': 50, 'error_rate': 0.0,
+                'rate_limit_rate': 0.0, 'malformed_rate': 0.0, 'prefill_us_per_token': 150},
+}
+
+# AI Toolkit provider name, endpoint path under the mock server and model,
+# as _build_llm_request receives them from Connection Management
+PROVIDERS = {
+    'openai': ('OpenAI', '/v1', 'gpt-4o-mini'),
+    'groq': ('Groq', '/openai/v1', 'llama-3.1-8b-instant'),
+    'ollama': ('Ollama', '', 'llama3.1:8b'),
+    'azure': ('Azure OpenAI', '/openai/deployments/gpt-4o-mini', 'gpt-4o-mini'),
+    'anthropic': ('Anthropic', '', 'claude-3-5-haiku-latest'),
+    'gemini': ('Gemini', '/v1beta/models', 'gemini-2.0-flash'),
+}
+
+PIPELINE_PROMPT = ('Assess whether the prompt or response contains personally identifiable '
+                   'information. Return risk_score, genai_detected, confidence, explanation, types.')
+
+# Repeated by --prompt-tokens to stand in for a detailed scoring rubric
+PROMPT_GUIDANCE = ('Rubric item {}: treat names combined with dates of birth, account numbers, '
+                   'addresses, phone numbers or government identifiers as PII; weigh partial '
+                   'identifiers by how easily they re-identify a person; ignore synthetic examples. ')
+
+
+def pipeline_prompt(prompt_tokens):
+    """Return PIPELINE_PROMPT padded with rubric text to about *prompt_tokens* tokens."""
+    prompt = PIPELINE_PROMPT
+    item = 1
+    while len(prompt) // 4 < prompt_tokens:
+        prompt += ' ' + PROMPT_GUIDANCE.format(item)
+        item += 1
+    return prompt
+
+
+def synthetic_records(count, seed):
+    """Return *count* gen_ai_log-shaped records (flattened as KV_MODE=json extracts them)."""
+    rng = random.Random(seed)
+    # Separate stream, so the message text stays as in earlier baselines
+    signal_rng = random.Random(seed + 1)
+    words = ('account', 'balance', 'summary', 'patient', 'visit', 'refund', 'order', 'policy',
+             'weather', 'meeting', 'schedule', 'invoice', 'contract', 'shipping', 'support')
+    records = []
+    for i in range(count):
+        prompt = ' '.join(rng.choice(words) for _ in range(rng.randint(15, 120)))
+        response = ' '.join(rng.choice(words) for _ in range(rng.randint(30, 300)))
+        records.append({
+            '_time': '{:.3f}'.format(1760000000 + i * 0.5),
+            'index': 'gen_ai_log',
+            'sourcetype': 'medadvice3:json',
+            'gen_ai.event.id': 'bench-{:08d}'.format(i),
+            'gen_ai.request.id': 'req-{:08d}'.format(i),
+            'gen_ai.app.name': rng.choice(['medadvice', 'toyapp', 'support-bot']),
+            'gen_ai.provider.name': rng.choice(['openai', 'anthropic', 'gcp.gemini']),
+            'gen_ai.request.model': rng.choice(['gpt-4o', 'claude-sonnet-4', 'gemini-2.5-pro']),
+            'gen_ai.input.messages': json.dumps([{'role': 'user', 'content': prompt}]),
+            'gen_ai.output.messages': json.dumps([{'role': 'assistant', 'content': response}]),
+            'gen_ai.usage.input_tokens': str(len(prompt) // 4),
+            'gen_ai.usage.output_tokens': str(len(response) // 4),
+            'gen_ai.prompt_injection.risk_score': '{:.3f}'.format(signal_rng.random() ** 3),
+            'gen_ai.pii.risk_score': '{:.3f}'.format(signal_rng.random() ** 3),
+            'gen_ai.guardrail.triggered': 'true' if signal_rng.random() < 0.02 else 'false',
+        })
+    return records
+
+
+def start_mock_server(scenario, seed):
+    """Start mock_llm_server.py in a child process; return (process, base URL)."""
+    profile = SCENARIOS[scenario]
+    command = [sys.executable, os.path.join(TOOLS_PATH, 'mock_llm_server.py'), '--port', '0',
+               '--seed', str(seed)]
+    for name, value in profile.items():
+        command += ['--' + name.replace('_', '-'), str(value)]
+    proc = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                            universal_newlines=True)
+    url = proc.stdout.readline().strip()
+    if not url.startswith('http://'):
+        proc.kill()
+        raise RuntimeError('mock_llm_server.py did not start (got {!r})'.format(url))
+    return proc, url
+
+
+def _percentile(sorted_values, percentile):
+    if not sorted_values:
+        return None
+    rank = min(len(sorted_values) - 1, int(round(percentile / 100.0 * (len(sorted_values) - 1))))
+    return round(sorted_values[rank], 1)
+
+
+def run_configuration(genaiscore, provider, base_url, concurrency, records, chunk_size,
+                      structured_output=True, prompt_cache=True, prompt=PIPELINE_PROMPT,
+                      time_budget=None):
+    """Score *records* with one command instance and return the measurements."""
+    provider_name, path, model = PROVIDERS[provider]
+    command = genaiscore.GenAIScoreCommand()
+    command.pipeline = 'pipeline_1'
+    command.time_budget = time_budget
+    command._system_prompt = 'You are a scoring engine. Reply with one JSON object only.'
+    command._pipeline_config = {'enabled': '1', 'name': 'bench', 'prompt': prompt,
+                                'near_duplicate_reuse': False}
+    command._routing = command._parse_routing({'max_concurrency': str(concurrency)})
+    command._llm_configs = {'bench': {
+        'name': 'bench', 'provider': provider_name, 'model': model, 'endpoint': base_url + path,
+        'max_tokens': 300, 'temperature': 0.0, 'timeout': 30, 'provider_data': {},
+    }}
+    command._structured_output = structured_output
+    command._prompt_cache = prompt_cache
+    command._get_api_key = lambda provider_name, config=None: 'bench-key'
+    command.write_metric = lambda name, value: None
+    command.logger.setLevel(logging.ERROR)
+
+    statuses = {'success': 0, 'parse_failed': 0, 'http_429': 0, 'http_5xx': 0, 'other_error': 0,
+                'deferred': 0}
+    priorities = {'success': [], 'deferred': []}
+    latencies = []
+    tokens = {'input': 0, 'cached': 0}
+    events = 0
+    start = time.perf_counter()
+    for offset in range(0, len(records), chunk_size):
+        chunk = [dict(record) for record in records[offset:offset + chunk_size]]
+        command._finished = offset + chunk_size >= len(records)
+        for record in command.stream(chunk):
+            events += 1
+            error = record.get('genai_scoring_error', '')
+            status = record.get('genai_scoring_status')
+            if status in priorities and record.get('genai_scoring_priority'):
+                priorities[status].append(float(record['genai_scoring_priority']))
+            if status == 'success':
+                statuses['success'] += 1
+            elif status == 'deferred':
+                statuses['deferred'] += 1
+            elif error.startswith('JSON parse failed'):
+                statuses['parse_failed'] += 1
+            elif 'HTTP 429' in error:
+                statuses['http_429'] += 1
+            elif 'HTTP 5' in error:
+                statuses['http_5xx'] += 1
+            else:
+                statuses['other_error'] += 1
+            if record.get('genai_scoring_latency_ms'):
+                latencies.append(float(record['genai_scoring_latency_ms']))
+            tokens['input'] += int(record.get('genai_scoring_input_tokens') or 0)
+            tokens['cached'] += int(record.get('genai_scoring_cached_input_tokens') or 0)
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    replies = statuses['success'] + statuses['parse_failed']
+
+    def _mean(values):
+        return round(sum(values) / len(values), 4) if values else None
+
+    return {
+        'events': events,
+        'elapsed_s': round(elapsed, 3),
+        'events_per_sec': round(events / elapsed, 1) if elapsed else None,
+        'latency_ms': {'p50': _percentile(latencies, 50), 'p95': _percentile(latencies, 95),
+                       'p99': _percentile(latencies, 99)},
+        'statuses': statuses,
+        'parse_failure_rate': round(statuses['parse_failed'] / float(replies), 4) if replies else None,
+        'input_tokens': tokens['input'],
+        'cached_input_share': round(tokens['cached'] / float(tokens['input']), 4) if tokens['input'] else None,
+        'error_rate': round((events - statuses['success'] - statuses['deferred']) / float(events), 4)
+        if events else None,
+        'deferred': statuses['deferred'],
+        'priority_scored': _mean(priorities['success']),
+        'priority_deferred': _mean(priorities['deferred']),
+    }
+
+
+def _key(result):
+    key = '{provider}/{scenario}/c{max_concurrency}'.format(**result)
+    if not result.get('structured_output', True):
+        key += '/unstructured'
+    if not result.get('prompt_cache', True):
+        key += '/nocache'
+    if result.get('time_budget'):
+        key += '/budget{}'.format(result['time_budget'])
+    return key
+
+
+def check_regressions(report, baseline_path, max_regression):
+    """Add baseline events/sec and change_pct to each result; return descriptions of
+    configurations slower than the baseline by more than *max_regression* percent."""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {_key(result): result for result in json.load(f)['results']}
+    regressions = []
+    for result in report['results']:
+        previous = baseline.get(_key(result))
+        if not previous or not previous.get('events_per_sec') or result['events_per_sec'] is None:
+            continue
+        change = (result['events_per_sec'] - previous['events_per_sec']) / previous['events_per_sec'] * 100.0
+        result['baseline_events_per_sec'] = previous['events_per_sec']
+        result['change_pct'] = round(change, 1)
+        if max_regression is not None and change < -max_regression:
+            regressions.append('{}: {} -> {} events/sec ({:.1f}%)'.format(
+                _key(result), previous['events_per_sec'], result['events_per_sec'], change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--provider', choices=sorted(PROVIDERS), action='append',
+                        help='provider shape to measure (repeatable; default all)')
+    parser.add_argument('--scenario', choices=sorted(SCENARIOS), action='append',
+                        help='mock server scenario (repeatable; default fast and flaky)')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[8, 32],
+                        help='max_concurrency values to measure')
+    parser.add_argument('--events', type=int, default=1000)
+    parser.add_argument('--chunk-size', type=int, default=500,
+                        help='records per stream() call (splunkd sends up to 50000)')
+    parser.add_argument('--structured-output', choices=['on', 'off'], nargs='+', default=['on'],
+                        help='request provider-native structured output (default on)')
+    parser.add_argument('--prompt-cache', choices=['on', 'off'], nargs='+', default=['on'],
+                        help='send the cacheable prompt-prefix layout (default on)')
+    parser.add_argument('--prompt-tokens', type=int, default=0,
+                        help='pad the pipeline prompt to about this many tokens')
+    parser.add_argument('--time-budget', type=float, default=None,
+                        help="genaiscore time_budget in seconds (default: none)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='write the JSON report to this file')
+    parser.add_argument('--baseline', help='JSON report of an earlier run to compare with')
+    parser.add_argument('--max-regression', type=float, default=None,
+                        help='fail when events/sec drops more than this %% below --baseline')
+    args = parser.parse_args()
+
+    # genaiscore writes its log under $SPLUNK_HOME/var/log/splunk
+    os.environ['SPLUNK_HOME'] = tempfile.mkdtemp(prefix='bench_genaiscore_')
+    sys.path.insert(0, BIN_PATH)
+    import genaiscore
+    # Injected failures would otherwise print a traceback each to stderr
+    # (splunklib logs the root logger there); genaiscore.log still gets them
+    genaiscore.debug_logger.propagate = False
+
+    records = synthetic_records(args.events, args.seed)
+    prompt = pipeline_prompt(args.prompt_tokens)
+    report = {
+        'benchmark': 'genaiscore_throughput',
+        'generated_at': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'events': args.events,
+        'chunk_size': args.chunk_size,
+        'seed': args.seed,
+        'prompt_tokens': len(prompt) // 4,
+        'time_budget': args.time_budget,
+        'scenarios': {name: SCENARIOS[name] for name in (args.scenario or ['fast', 'flaky'])},
+        'results': [],
+    }
+    for provider in args.provider or sorted(PROVIDERS):
+        for scenario in args.scenario or ['fast', 'flaky']:
+            for concurrency in args.concurrency:
+                for structured_output in args.structured_output:
+                    for prompt_cache in args.prompt_cache:
+                        proc, url = start_mock_server(scenario, args.seed)
+                        try:
+                            result = run_configuration(
+                                genaiscore, provider, url, concurrency, records, args.chunk_size,
+                                structured_output == 'on', prompt_cache == 'on', prompt,
+                                args.time_budget)
+                            with urllib.request.urlopen(url + '/stats', timeout=5) as response:
+                                result['server_requests'] = json.loads(response.read().decode('utf-8'))
+                        finally:
+                            proc.terminate()
+                            proc.wait()
+                        result = dict({'provider': provider, 'scenario': scenario,
+                                       'max_concurrency': concurrency,
+                                       'structured_output': structured_output == 'on',
+                                       'prompt_cache': prompt_cache == 'on',
+                                       'time_budget': args.time_budget}, **result)
+                        report['results'].append(result)
+                        print('{:<47} {:>8.1f} ev/s  p50 {:>7} ms  p95 {:>7} ms  p99 {:>7} ms  '
+                              'parse_fail {:>6}  errors {:>6}  cached {:>6}  deferred {:>6}'.format(
+                                  _key(result), result['events_per_sec'], result['latency_ms']['p50'],
+                                  result['latency_ms']['p95'], result['latency_ms']['p99'],
+                                  result['parse_failure_rate'], result['error_rate'],
+                                  result['cached_input_share'], result['deferred']), file=sys.stderr)
+
+    regressions = check_regressions(report, args.baseline, args.max_regression) if args.baseline else []
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+    if regressions:
+        print('Throughput regressions over {}%:\n  {}'.format(
+            args.max_regression, '\n  '.join(regressions)), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
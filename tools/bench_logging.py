@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# encoding=utf-8
+"""
+bench_logging.py - Developer-only benchmark for per-event logging overhead
+
+Measures what the per-event log lines of genaiscore.py (event JSON built,
+LLM call start, LLM HTTP request, LLM response OK) and of
+make_snow_request() cost the calling thread, for each logging setup:
+
+    off             lines below the logger level (the floor: call overhead only)
+    file            synchronous logging.FileHandler, every line (the setup
+                    genaiscore and the ServiceNow scripts used before
+                    ta_gen_ai_cim_logging.py)
+    queued          ta_gen_ai_cim_logging.setup_logger(), every line
+                    (debug_logging = true)
+    queued_sampled  setup_logger() plus LogSampler at its defaults (the
+                    default INFO behaviour)
+
+Each setup logs --events events from --threads threads at once.
+--io-wait-us sleeps that long per event in the calling thread, standing
+in for the LLM or ServiceNow round trip the real loop waits on (the
+listener thread writes during those waits); --write-delay-us adds that
+much to every file write, standing in for a slow or contended log disk.
+Reported per setup and thread count: microseconds per event in the calling
+threads, the time to drain the queue to disk after the last event (queued
+setups), lines and bytes written. The log files go to a temporary directory.
+
+This is NOT shipped in the Splunkbase / Splunk Cloud package
+(excluded by ../package.sh).
+
+Usage:
+    python3 tools/bench_logging.py
+    python3 tools/bench_logging.py --events 50000 --threads 1 4 16 --output logging.json
+    python3 tools/bench_logging.py --io-wait-us 200 --write-delay-us 50
+
+Copyright 2026 Splunk Inc.
+Licensed under Apache License 2.0
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+TA_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(TA_ROOT, 'bin'))
+
+import ta_gen_ai_cim_logging
+from ta_gen_ai_cim_logging import LogSampler, LOG_FORMAT, setup_logger
+
+SETUPS = ('off', 'file', 'queued', 'queued_sampled')
+
+
+def _log_event(logger, sampler, i):
+    """The INFO lines genaiscore and make_snow_request write for one event."""
+    event_id = '{:08x}-7f3a-4c1e-9d2b-5e8f1a2b3c4d'.format(i)
+    if sampler is None or sampler.allow('event_json'):
+        logger.info("Event JSON built: event_id=%s len=%d", event_id, 1843)
+    if sampler is None or sampler.allow('llm_call_start'):
+        logger.info("LLM call start: event_id=%s provider=%s model=%s prompt_len=%d",
+                    event_id, 'openai', 'gpt-4o-mini', 2210)
+    if sampler is None or sampler.allow('llm_http_request'):
+        logger.info("LLM HTTP request: provider=%s model=%s url=%s%s body_len=%d",
+                    'openai', 'gpt-4o-mini', 'api.openai.com', '/v1/chat/completions', 2604)
+    if sampler is None or sampler.allow('llm_response'):
+        logger.info(
+            "LLM response OK: event_id=%s len=%d latency_ms=%.0f input_tokens=%s output_tokens=%s "
+            "model=%s request_id=%s", event_id, 212, 412.5, 611, 48, 'gpt-4o-mini-2024-07-18',
+            'chatcmpl-' + event_id)
+    if sampler is None or sampler.allow('snow_request'):
+        logger.info("ServiceNow API Request - Method: {}, URL: {}, Auth Type: {}".format(
+            'GET', 'https://dev12345.service-now.com/api/now/table/alm_ai_system_digital_asset'
+            '?sysparm_query=display_name%3Dsupport-bot&sysparm_limit=1', 'basic'))
+
+
+def _make_logger(setup, name, log_file):
+    if setup in ('queued', 'queued_sampled'):
+        return setup_logger(name, log_file)
+    logger = logging.getLogger(name)
+    logger.propagate = False
+    logger.setLevel(logging.WARNING if setup == 'off' else logging.INFO)
+    handler = logging.FileHandler(log_file, delay=True)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    logger.addHandler(handler)
+    return logger
+
+
+def run_setup(setup, events, threads, log_dir, io_wait_us=0.0):
+    name = 'bench_{}_{}'.format(setup, threads)
+    log_file = os.path.join(log_dir, name + '.log')
+    logger = _make_logger(setup, name, log_file)
+    sampler = LogSampler() if setup == 'queued_sampled' else None
+    per_thread = events // threads
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(offset):
+        barrier.wait()
+        for i in range(offset, offset + per_thread):
+            if io_wait_us:
+                time.sleep(io_wait_us / 1e6)
+            _log_event(logger, sampler, i)
+
+    workers = [threading.Thread(target=worker, args=(n * per_thread,)) for n in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    caller_s = time.perf_counter() - start
+    ta_gen_ai_cim_logging.stop_logging()
+    drain_s = time.perf_counter() - start - caller_s
+    for handler in logger.handlers:
+        handler.close()
+
+    lines = size = 0
+    if os.path.exists(log_file):
+        size = os.path.getsize(log_file)
+        with open(log_file, 'rb') as f:
+            lines = sum(1 for _ in f)
+    total_events = per_thread * threads
+    return {
+        'setup': setup,
+        'threads': threads,
+        'events': total_events,
+        'us_per_event': round(caller_s * 1e6 / total_events, 2),
+        'caller_s': round(caller_s, 3),
+        'drain_s': round(drain_s, 3) if setup.startswith('queued') else None,
+        'lines_written': lines,
+        'bytes_written': size,
+        'sampled_lines': sampler.summary() if sampler is not None else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--events', type=int, default=20000)
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 8])
+    parser.add_argument('--io-wait-us', type=float, default=0.0,
+                        help='per-event wait in the calling thread (stands in for network I/O)')
+    parser.add_argument('--write-delay-us', type=float, default=0.0,
+                        help='added to every log file write (stands in for a slow disk)')
+    parser.add_argument('--setup', choices=SETUPS, action='append',
+                        help='logging setup to run (repeatable; default all)')
+    parser.add_argument('--output', help='write the JSON report to this file')
+    args = parser.parse_args()
+
+    if args.write_delay_us:
+        file_emit = logging.FileHandler.emit
+
+        def slow_emit(handler, record):
+            time.sleep(args.write_delay_us / 1e6)
+            file_emit(handler, record)
+        logging.FileHandler.emit = slow_emit
+
+    log_dir = tempfile.mkdtemp(prefix='bench_logging_')
+    report = {
+        'benchmark': 'logging',
+        'generated_at': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'lines_per_event': 5,
+        'io_wait_us': args.io_wait_us,
+        'write_delay_us': args.write_delay_us,
+        'log_dir': log_dir,
+        'results': [],
+    }
+    for threads in args.threads:
+        for setup in args.setup or SETUPS:
+            result = run_setup(setup, args.events, threads, log_dir, args.io_wait_us)
+            report['results'].append(result)
+            print('{:>15} threads={:<3} {:>8.2f} us/event  drain {:>6}  lines={}'.format(
+                setup, threads, result['us_per_event'],
+                '{:.3f}s'.format(result['drain_s']) if result['drain_s'] is not None else '-',
+                result['lines_written']), file=sys.stderr)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
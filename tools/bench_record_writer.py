@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# encoding=utf-8
+"""
+bench_record_writer.py - Developer-only microbenchmark for the chunked protocol writer
+
+Times splunklib.searchcommands.internals.RecordWriterV2 serializing one
+chunk of records (write_records + write_chunk) to an in-memory stream, the
+same path StreamingCommand takes when it answers a SCP v2 chunk.
+
+Record profiles:
+    str     - every field is a str (typical of events passed through untouched)
+    genai   - wide gen_ai.* records as emitted by genaiscore: str, int, float
+              and bool fields, a multi-value field and a large JSON _raw
+
+This is NOT shipped in the Splunkbase / Splunk Cloud package
+(excluded by ../package.sh).
+
+Usage:
+    python3 tools/bench_record_writer.py
+    python3 tools/bench_record_writer.py --rows 1000 10000 --repeat 5
+
+Copyright 2026 Splunk Inc.
+Licensed under Apache License 2.0
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from io import BytesIO
+
+TA_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(TA_ROOT, 'lib'))
+
+from splunklib.searchcommands.internals import RecordWriterV2
+
+
+def _str_record(rng, i):
+    return {
+        '_time': '{:.3f}'.format(1760000000 + i * 0.25),
+        'host': 'gw-{:02d}'.format(i % 16),
+        'source': 'genai_gateway',
+        'sourcetype': 'gen_ai:gateway',
+        'gen_ai.event.id': 'evt-{:012d}'.format(i),
+        'gen_ai.request.model': rng.choice(['gpt-4o', 'claude-sonnet-4', 'gemini-2.5-pro']),
+        'gen_ai.input.messages': 'prompt ' * rng.randint(20, 120),
+        'gen_ai.output.messages': 'response ' * rng.randint(20, 200),
+    }
+
+
+def _genai_record(rng, i):
+    record = _str_record(rng, i)
+    record.update({
+        'gen_ai.usage.input_tokens': rng.randint(10, 4000),
+        'gen_ai.usage.output_tokens': rng.randint(10, 2000),
+        'gen_ai.scoring.pii_score': round(rng.random(), 3),
+        'gen_ai.pii.detected': rng.random() < 0.1,
+        'gen_ai.scoring.pii_types': rng.sample(['EMAIL', 'PHONE', 'SSN', 'CREDIT_CARD', 'NAME'], rng.randint(0, 3)),
+        'genai_scoring_status': 'success',
+    })
+    record['_raw'] = json.dumps(record)
+    return record
+
+
+PROFILES = {'str': _str_record, 'genai': _genai_record}
+
+
+def bench(profile, rows, repeat):
+    """Return (best seconds, output bytes) for serializing one chunk of *rows* records."""
+    rng = random.Random(rows)
+    records = [PROFILES[profile](rng, i) for i in range(rows)]
+    best = None
+    size = 0
+    for _ in range(repeat):
+        ofile = BytesIO()
+        writer = RecordWriterV2(ofile, maxresultrows=rows + 1)
+        start = time.perf_counter()
+        writer.write_records(records)
+        writer.write_chunk(finished=False)
+        elapsed = time.perf_counter() - start
+        size = len(ofile.getvalue())
+        best = elapsed if best is None else min(best, elapsed)
+    return best, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--profile', choices=sorted(PROFILES) + ['both'], default='both')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per case; the best is reported')
+    args = parser.parse_args()
+
+    profiles = sorted(PROFILES) if args.profile == 'both' else [args.profile]
+    report = []
+    for profile in profiles:
+        for rows in args.rows:
+            elapsed, size = bench(profile, rows, args.repeat)
+            result = {
+                'profile': profile,
+                'rows': rows,
+                'elapsed_ms': round(elapsed * 1000, 2),
+                'us_per_row': round(elapsed * 1e6 / rows, 2),
+                'chunk_mb': round(size / (1024.0 * 1024.0), 2),
+            }
+            print('{profile:<6} {rows:>6} rows  {elapsed_ms:>9.2f} ms  {us_per_row:>7.2f} us/row  '
+                  '{chunk_mb:>7.2f} MB'.format(**result), file=sys.stderr)
+            report.append(result)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# encoding=utf-8
+"""
+bench_results_reader.py - Developer-only benchmark for splunklib JSON results readers
+
+Compares splunklib.results.JSONResultsReader (readlines() + json.loads per
+line) with StreamingJSONResultsReader (incremental decode) on a synthetic
+output_mode=json response written to a temporary file. Each reader runs in
+its own child process so peak RSS is measured independently.
+
+Two response shapes are generated:
+    export  - line-delimited documents, one "result" per line
+              (search/jobs/export)
+    results - a single document with one large "results" array
+              (search/jobs/<sid>/results, oneshot)
+
+This is NOT shipped in the Splunkbase / Splunk Cloud package
+(excluded by ../package.sh).
+
+Usage:
+    python3 tools/bench_results_reader.py                 # ~300 MB, both shapes
+    python3 tools/bench_results_reader.py --size-mb 50 --shape results
+
+Copyright 2026 Splunk Inc.
+Licensed under Apache License 2.0
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+TA_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LIB_PATH = os.path.join(TA_ROOT, 'lib')
+
+READERS = ('JSONResultsReader', 'StreamingJSONResultsReader')
+
+
+def _synthetic_row(rng, i):
+    """One row shaped like a gen_ai_log event returned by a search."""
+    return {
+        '_time': '{:.3f}'.format(1760000000 + i * 0.25),
+        'gen_ai.event.id': 'evt-{:012d}'.format(i),
+        'gen_ai.request.model': rng.choice(['gpt-4o', 'claude-sonnet-4', 'gemini-2.5-pro']),
+        'gen_ai.usage.input_tokens': str(rng.randint(10, 4000)),
+        'gen_ai.usage.output_tokens': str(rng.randint(10, 2000)),
+        'gen_ai.input.messages': 'prompt ' * rng.randint(20, 120),
+        'gen_ai.output.messages': 'response ' * rng.randint(20, 200),
+        'gen_ai.guardrail.ids': ['gr-{}'.format(n) for n in range(rng.randint(0, 3))],
+    }
+
+
+def generate(path, shape, size_mb, seed=7):
+    """Write a synthetic JSON response of roughly size_mb megabytes; return the row count."""
+    rng = random.Random(seed)
+    target = size_mb * 1024 * 1024
+    written = 0
+    rows = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        if shape == 'results':
+            header = '{"preview":false,"init_offset":0,"messages":[],"fields":[{"name":"_time"}],"results":['
+            f.write(header)
+            written += len(header)
+        while written < target:
+            row = _synthetic_row(rng, rows)
+            if shape == 'results':
+                text = (',' if rows else '') + json.dumps(row)
+            else:
+                text = json.dumps({'preview': False, 'offset': rows, 'result': row}) + '\n'
+            f.write(text)
+            written += len(text)
+            rows += 1
+        if shape == 'results':
+            f.write(']}')
+    return rows
+
+
+def run_reader(reader_name, path):
+    """Child-process entry point: read every row and print one JSON summary line."""
+    sys.path.insert(0, LIB_PATH)
+    from splunklib import results
+
+    reader_cls = getattr(results, reader_name)
+    rows = 0
+    first_row_s = None
+    start = time.perf_counter()
+    with open(path, 'rb') as f:
+        for item in reader_cls(f):
+            if isinstance(item, dict):
+                rows += 1
+                if first_row_s is None:
+                    first_row_s = time.perf_counter() - start
+    elapsed = time.perf_counter() - start
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_mb = maxrss / (1024.0 * 1024.0) if sys.platform == 'darwin' else maxrss / 1024.0
+    print(json.dumps({
+        'reader': reader_name,
+        'rows': rows,
+        'elapsed_s': round(elapsed, 3),
+        'first_row_s': round(first_row_s or 0.0, 4),
+        'rows_per_s': int(rows / elapsed) if elapsed else 0,
+        'peak_rss_mb': round(peak_mb, 1),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--size-mb', type=int, default=300,
+                        help='approximate size of each generated response (default 300)')
+    parser.add_argument('--shape', choices=('export', 'results', 'both'), default='both')
+    parser.add_argument('--run-reader', nargs=2, metavar=('READER', 'PATH'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_reader:
+        run_reader(*args.run_reader)
+        return
+
+    shapes = ('export', 'results') if args.shape == 'both' else (args.shape,)
+    report = []
+    with tempfile.TemporaryDirectory(prefix='bench_results_reader_') as tmp:
+        for shape in shapes:
+            path = os.path.join(tmp, '{}.json'.format(shape))
+            rows = generate(path, shape, args.size_mb)
+            size_mb = os.path.getsize(path) / (1024.0 * 1024.0)
+            print('{}: {:.0f} MB, {} rows'.format(shape, size_mb, rows), file=sys.stderr)
+            for reader_name in READERS:
+                out = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), '--run-reader', reader_name, path],
+                    check=True, stdout=subprocess.PIPE, universal_newlines=True)
+                result = json.loads(out.stdout.strip().splitlines()[-1])
+                result.update({'shape': shape, 'size_mb': round(size_mb, 1)})
+                print('  {reader:<28} {elapsed_s:>8.2f}s  first row {first_row_s:>7.3f}s  '
+                      '{rows_per_s:>9} rows/s  peak RSS {peak_rss_mb:>8.1f} MB'.format(**result),
+                      file=sys.stderr)
+                report.append(result)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
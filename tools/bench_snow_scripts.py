@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+# encoding=utf-8
+"""
+bench_snow_scripts.py - Developer-only benchmark for the ServiceNow asset and case scripts
+
+Runs the ServiceNow code paths of pull_snow_inventory.py, sync_snow_asset.py
+and create_snow_case.py against mock_snow_server.py and an in-memory KV
+Store (stub_kvstore.py), and reports wall time, ServiceNow HTTP calls,
+KV Store operations and splunkd connects, in total and per asset or case:
+
+    inventory_pull   pull_table_inventory() over the whole AI System table
+                     (KV pre-filled: half unchanged, a tenth stale, rest new)
+    asset_sync       process_app_name() for --assets names (80% present in
+                     ServiceNow), first with an empty KV Store ("new"), then
+                     again with the mappings just written ("reverify")
+    case_escalation  the create_snow_case.py flow (KV lookup, POST the case,
+                     save the mapping) for --cases event ids ("new"), then
+                     the same ids again, answered from the KV Store ("existing")
+
+The scripts' own functions run unmodified, with two substitutions: the
+splunkd connect helper returns the stub KV Store, and requests to
+https://<instance>.service-now.com are sent to the mock server over plain
+HTTP (TLS handshakes are therefore not included in the timings). Stage
+timings come from ta_gen_ai_cim_perf.
+
+One mock server (in a child process) is started per --rows value. Results
+are printed (or written with --output) as JSON.
+
+This is NOT shipped in the Splunkbase / Splunk Cloud package
+(excluded by ../package.sh).
+
+Usage:
+    python3 tools/bench_snow_scripts.py
+    python3 tools/bench_snow_scripts.py --rows 1000 10000 100000 --latency-ms 150
+    python3 tools/bench_snow_scripts.py --scenario asset_sync --assets 500 --auth oauth
+
+Copyright 2026 Splunk Inc.
+Licensed under Apache License 2.0
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+TA_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BIN_PATH = os.path.join(TA_ROOT, 'bin')
+TOOLS_PATH = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, TOOLS_PATH)
+
+from mock_snow_server import MODEL_TABLE, SYSTEM_TABLE, build_tables, system_name
+from stub_kvstore import StubService
+
+SCENARIOS = ('inventory_pull', 'asset_sync', 'case_escalation')
+SESSION_KEY = 'bench-session-key'
+INSTANCE = 'benchdev'
+
+
+def start_mock_server(rows, latency_ms, jitter_ms, seed):
+    """Start mock_snow_server.py in a child process; return (process, base URL)."""
+    command = [sys.executable, os.path.join(TOOLS_PATH, 'mock_snow_server.py'), '--port', '0',
+               '--rows', str(rows), '--latency-ms', str(latency_ms), '--jitter-ms', str(jitter_ms),
+               '--seed', str(seed)]
+    proc = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                            universal_newlines=True)
+    url = proc.stdout.readline().strip()
+    if not url.startswith('http://'):
+        proc.kill()
+        raise RuntimeError('mock_snow_server.py did not start (got {!r})'.format(url))
+    return proc, url
+
+
+def server_stats(base_url):
+    with urllib.request.urlopen(base_url + '/stats', timeout=5) as response:
+        return json.loads(response.read().decode('utf-8'))
+
+
+def redirecting_urlopen(base_url):
+    """Return a urlopen() that sends *.service-now.com requests to *base_url*."""
+    real_urlopen = urllib.request.urlopen
+
+    def urlopen(req, data=None, timeout=None, context=None):
+        parts = urlsplit(req.full_url)
+        if (parts.hostname or '').endswith('.service-now.com'):
+            req.full_url = base_url + parts.path + ('?' + parts.query if parts.query else '')
+            context = None
+        return real_urlopen(req, data=data, timeout=timeout, context=context)
+    return urlopen
+
+
+def snow_config(auth):
+    if auth == 'oauth':
+        return {'configured': True, 'auth_type': 'oauth', 'auth_subtype': 'oauth_client_creds',
+                'instance': INSTANCE, 'url': 'https://{}.service-now.com'.format(INSTANCE),
+                'client_id': 'bench', 'client_secret': 'bench', 'username': 'bench',
+                'password': 'bench', 'access_token': None, 'token_expires': 0}
+    return {'configured': True, 'auth_type': 'basic', 'instance': INSTANCE,
+            'url': 'https://{}.service-now.com'.format(INSTANCE), 'username': 'bench',
+            'password': 'bench'}
+
+
+DISCOVERY_CONFIG = {
+    'ai_system_table': SYSTEM_TABLE,
+    'ai_system_match_field': 'display_name',
+    'ai_system_approval_field': 'approval',
+    'ai_system_approved_values_list': ['approved'],
+    'ai_model_table': MODEL_TABLE,
+    'ai_model_match_field': 'display_name',
+    'ai_model_approval_field': 'approval',
+    'ai_model_approved_values_list': ['approved'],
+}
+
+
+class Measurement(object):
+    """Wall time, ServiceNow requests, KV operations and stage timings of one phase."""
+
+    def __init__(self, perf, base_url, service, name):
+        self._perf = perf
+        self._base_url = base_url
+        self._service = service
+        self._name = name
+
+    def __enter__(self):
+        self._requests = sum(server_stats(self._base_url).values())
+        self._service.reset_stats()
+        self._run = self._perf.start_run('bench_snow_' + self._name)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.elapsed = time.perf_counter() - self._start
+        event = self._run.finish()
+        self.stages = {name: stage['ms'] for name, stage in (event or {}).get('stages', {}).items()}
+        self.requests = sum(server_stats(self._base_url).values()) - self._requests
+        self.kv = self._service.stats()
+        return False
+
+    def result(self, units, unit_name, **extra):
+        per = float(units) if units else 1.0
+        result = {
+            'phase': self._name,
+            unit_name: units,
+            'elapsed_s': round(self.elapsed, 3),
+            'ms_per_{}'.format(unit_name.rstrip('s')): round(self.elapsed * 1000.0 / per, 2),
+            'snow_requests': self.requests,
+            'snow_requests_per_{}'.format(unit_name.rstrip('s')): round(self.requests / per, 3),
+            'kv_operations': self.kv['total_operations'],
+            'kv_operations_per_{}'.format(unit_name.rstrip('s')): round(self.kv['total_operations'] / per, 3),
+            'splunkd_connects': self.kv['connects'],
+            'stage_ms': self.stages,
+        }
+        result.update(extra)
+        return result
+
+
+def bench_inventory_pull(modules, perf, base_url, rows, auth, seed):
+    pull = modules['pull_snow_inventory']
+    service = StubService()
+    pull.splunkd_connect = modules['sync_snow_asset'].splunkd_connect = service.connect
+    collection = service.kvstore['gen_ai_app_asset_map']
+    derive = modules['sync_snow_asset'].derive_inventory_status
+    rng = random.Random(seed)
+    # Same rows the mock server generated from this seed
+    for i, row in enumerate(build_tables(rows, seed)[SYSTEM_TABLE].rows):
+        roll = rng.random()
+        if roll >= 0.6:
+            continue
+        approval = 'approved' if row['approval'] == 'approved' else 'unapproved'
+        if roll >= 0.5:
+            approval = 'unapproved' if approval == 'approved' else 'approved'
+        key = 'k{}'.format(i)
+        collection._records[key] = {
+            '_key': key, 'gen_ai_app_name': row['display_name'], 'service_now_sys_id': row['sys_id'],
+            'sync_status': 'found', 'approval_status': approval,
+            'inventory_status': derive('found', approval)}
+    config = snow_config(auth)
+    with Measurement(perf, base_url, service, 'inventory_pull') as m:
+        counters = pull.pull_table_inventory(
+            SESSION_KEY, config, table_name=SYSTEM_TABLE, match_field='display_name',
+            approval_field='approval', approved_values_list=['approved'],
+            collection_name='gen_ai_app_asset_map', key_field='gen_ai_app_name', label='AI System')
+    return [m.result(rows, 'assets', page_size=pull.PAGE_SIZE, outcome=counters)]
+
+
+def bench_asset_sync(modules, perf, base_url, rows, assets, auth, seed):
+    sync = modules['sync_snow_asset']
+    service = StubService()
+    sync.splunkd_connect = service.connect
+    rng = random.Random(seed)
+    listed = min(rows, int(assets * 0.8))
+    names = [system_name(i) for i in rng.sample(range(rows), listed)]
+    names += ['unlisted-app-{:05d}'.format(i) for i in range(assets - listed)]
+    rng.shuffle(names)
+    config = snow_config(auth)
+    results = []
+    for phase in ('new', 'reverify'):
+        outcome = {}
+        with Measurement(perf, base_url, service, 'asset_sync_' + phase) as m:
+            for name in names:
+                status = sync.process_app_name(name, SESSION_KEY, config, DISCOVERY_CONFIG)
+                key = '{}/{}'.format(status['status'], status['sync_status'])
+                outcome[key] = outcome.get(key, 0) + 1
+        results.append(m.result(len(names), 'assets', outcome=outcome))
+    return results
+
+
+def bench_case_escalation(modules, perf, base_url, cases, auth):
+    case = modules['create_snow_case']
+    service = StubService()
+    config = snow_config(auth)
+    event_ids = ['bench-event-{:06d}'.format(i) for i in range(cases)]
+    results = []
+    for phase in ('new', 'existing'):
+        outcome = {'created': 0, 'existing': 0, 'error': 0}
+        with Measurement(perf, base_url, service, 'case_escalation_' + phase) as m:
+            for event_id in event_ids:
+                # Same sequence as create_snow_case.main() after config load
+                if case.check_existing_case(service, event_id):
+                    outcome['existing'] += 1
+                    continue
+                result, error = case.create_snow_case(config, event_id, None)
+                if error or not result or 'result' not in result:
+                    outcome['error'] += 1
+                    continue
+                case.save_case_mapping(service, event_id, result['result'].get('sys_id'),
+                                       config['instance'], config.get('username', 'system'))
+                outcome['created'] += 1
+        results.append(m.result(cases, 'cases', outcome=outcome))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--scenario', choices=SCENARIOS, action='append',
+                        help='scenario to run (repeatable; default all)')
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000],
+                        help='rows in the mock AI System table (one server per value)')
+    parser.add_argument('--assets', type=int, default=500)
+    parser.add_argument('--cases', type=int, default=100)
+    parser.add_argument('--latency-ms', type=float, default=50.0,
+                        help='mock ServiceNow response latency')
+    parser.add_argument('--jitter-ms', type=float, default=10.0)
+    parser.add_argument('--auth', choices=('basic', 'oauth'), default='basic')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--output', help='write the JSON report to this file')
+    args = parser.parse_args()
+
+    splunk_home = tempfile.mkdtemp(prefix='bench_snow_scripts_')
+    os.makedirs(os.path.join(splunk_home, 'var', 'log', 'splunk'))
+    os.environ['SPLUNK_HOME'] = splunk_home
+    sys.path.insert(0, BIN_PATH)
+    import sync_snow_asset
+    import pull_snow_inventory
+    import create_snow_case
+    import ta_gen_ai_cim_perf as perf
+    perf.configure(enabled=True, log_path=os.path.join(splunk_home, 'perf.log'))
+    modules = {'sync_snow_asset': sync_snow_asset, 'pull_snow_inventory': pull_snow_inventory,
+               'create_snow_case': create_snow_case}
+
+    scenarios = args.scenario or list(SCENARIOS)
+    report = {
+        'benchmark': 'snow_scripts',
+        'generated_at': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'latency_ms': args.latency_ms,
+        'jitter_ms': args.jitter_ms,
+        'auth': args.auth,
+        'seed': args.seed,
+        'results': [],
+    }
+    for rows in args.rows:
+        proc, base_url = start_mock_server(rows, args.latency_ms, args.jitter_ms, args.seed)
+        sync_snow_asset.urlopen = redirecting_urlopen(base_url)
+        try:
+            results = []
+            if 'inventory_pull' in scenarios:
+                results += bench_inventory_pull(modules, perf, base_url, rows, args.auth, args.seed)
+            if 'asset_sync' in scenarios:
+                results += bench_asset_sync(modules, perf, base_url, rows, args.assets, args.auth, args.seed)
+            if 'case_escalation' in scenarios:
+                results += bench_case_escalation(modules, perf, base_url, args.cases, args.auth)
+        finally:
+            proc.terminate()
+            proc.wait()
+        for result in results:
+            result = dict({'table_rows': rows}, **result)
+            report['results'].append(result)
+            unit = 'asset' if 'assets' in result else 'case'
+            print('rows={:<7} {:<26} {:>8.2f} ms/{:<5} {:>6.3f} snow req/{:<5} {:>6.3f} kv ops/{:<5} '
+                  'connects {:>5}'.format(
+                      rows, result['phase'], result['ms_per_' + unit], unit,
+                      result['snow_requests_per_' + unit], unit, result['kv_operations_per_' + unit], unit,
+                      result['splunkd_connects']), file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
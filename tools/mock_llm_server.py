@@ -0,0 +1,517 @@
+#!/usr/bin/env python3
+# encoding=utf-8
+"""
+mock_llm_server.py - Developer-only stand-in for the LLM providers genaiscore calls
+
+Answers the request shapes genaiscore._build_llm_request sends, so scoring
+throughput can be measured without provider quota:
+
+    OpenAI / Groq / Ollama  POST .../chat/completions
+    Azure OpenAI            POST .../openai/deployments/<d>/chat/completions?api-version=...
+    Anthropic               POST .../v1/messages
+    Gemini                  POST .../models/<model>:generateContent
+
+Each reply is a valid scoring JSON object in the provider's response
+envelope, with usage counts and a request id header. Latency, HTTP 500
+errors, HTTP 429 rate limiting and malformed (truncated, non-JSON) scoring
+text are injected at configurable rates; outcomes are drawn from a seeded
+RNG so runs are repeatable. GET /stats returns request counts by shape and
+outcome.
+
+Requests that ask for structured output (response_format, an Anthropic
+forced tool call, or a Gemini responseSchema) always get well-formed
+scoring JSON, as a constrained-decoding provider would return; Anthropic
+gets it as a record_score tool_use block. --reject-structured answers them
+HTTP 400 instead, as a model without structured output support does.
+
+Prompt caching is modelled on token counts (about 4 characters a token):
+OpenAI-shaped requests report prompt_tokens_details.cached_tokens for the
+longest earlier-seen prefix, in 128-token steps from 1024 tokens;
+Anthropic reports cache_creation_input_tokens / cache_read_input_tokens up
+to the last cache_control breakpoint (1024-token minimum); Gemini serves
+.../cachedContents (create, list, get, ttl update, delete) and reports
+cachedContentTokenCount for requests naming a cachedContent.
+--prefill-us-per-token adds that much latency per uncached prompt token,
+so cache hits answer sooner as with a real provider.
+
+This is NOT shipped in the Splunkbase / Splunk Cloud package
+(excluded by ../package.sh).
+
+Usage:
+    python3 tools/mock_llm_server.py --port 8900 --latency-ms 800 --jitter-ms 200
+    python3 tools/mock_llm_server.py --port 0 --error-rate 0.02 --rate-limit-rate 0.05 \\
+        --malformed-rate 0.01
+    python3 tools/mock_llm_server.py --port 0 --malformed-rate 0.05 --reject-structured
+    python3 tools/mock_llm_server.py --port 0 --latency-ms 300 --prefill-us-per-token 150
+
+    from mock_llm_server import MockLLMServer
+    server = MockLLMServer(latency_ms=50).start()
+    server.url, server.stats()
+    server.stop()
+
+Copyright 2026 Splunk Inc.
+Licensed under Apache License 2.0
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+SCORE = {
+    'risk_score': 0.12,
+    'genai_detected': False,
+    'confidence': 'high',
+    'explanation': 'No sensitive content found in the prompt or response.',
+    'types': [],
+}
+
+# Prompt caching: minimum cacheable prefix and OpenAI's cache granularity
+CACHE_MIN_TOKENS = 1024
+CACHE_STEP_TOKENS = 128
+CHARS_PER_TOKEN = 4
+
+
+def _shape(path, query, headers):
+    """Return the provider shape a request path targets, or None."""
+    if path.endswith('/chat/completions'):
+        return 'azure' if 'api-version=' in query or headers.get('api-key') else 'openai'
+    if path.endswith('/messages'):
+        return 'anthropic'
+    if path.endswith(':generateContent'):
+        return 'gemini'
+    if path.endswith('/cachedContents') or '/cachedContents/' in path:
+        return 'gemini_cache'
+    return None
+
+
+def _tokens(text):
+    return len(text) // CHARS_PER_TOKEN
+
+
+def _openai_prompt(request):
+    """Return the prompt text of an OpenAI-shaped request, in prompt order."""
+    text = json.dumps(request.get('response_format')) if request.get('response_format') else ''
+    for message in request.get('messages') or []:
+        content = message.get('content')
+        text += content if isinstance(content, str) else json.dumps(content)
+    return text
+
+
+def _anthropic_prefix(request):
+    """Return the text of an Anthropic request up to its last cache_control
+    breakpoint (tools, then system, then messages), or ''."""
+    parts = [(json.dumps(request['tools']), False)] if request.get('tools') else []
+    system = request.get('system')
+    if isinstance(system, list):
+        parts += [(block.get('text', ''), 'cache_control' in block) for block in system]
+    elif system:
+        parts.append((system, False))
+    for message in request.get('messages') or []:
+        content = message.get('content')
+        if isinstance(content, list):
+            parts += [(block.get('text', ''), 'cache_control' in block) for block in content]
+        else:
+            parts.append((content or '', False))
+    breakpoints = [i for i, (_, cached) in enumerate(parts) if cached]
+    if not breakpoints:
+        return ''
+    return ''.join(text for text, _ in parts[:breakpoints[-1] + 1])
+
+
+def _rfc3339(epoch):
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+
+def _structured(request):
+    """Return the tool name (Anthropic) or True if *request* asks for
+    structured output, else None."""
+    tool_choice = request.get('tool_choice')
+    if isinstance(tool_choice, dict) and tool_choice.get('name'):
+        return tool_choice['name']
+    if (request.get('response_format') or {}).get('type') in ('json_schema', 'json_object'):
+        return True
+    if (request.get('generationConfig') or {}).get('responseSchema'):
+        return True
+    return None
+
+
+def _envelope(shape, model, text, input_tokens, output_tokens, tool_name=None,
+              cached_tokens=0, cache_write_tokens=0):
+    """Return (body, headers) of a successful reply carrying *text*, or
+    for *tool_name* (Anthropic) a tool_use block with it as the input.
+    *input_tokens* includes *cached_tokens* and *cache_write_tokens*;
+    each provider's usage block reports them its own way."""
+    request_id = uuid.uuid4().hex
+    if shape == 'anthropic':
+        if tool_name:
+            content = [{'type': 'tool_use', 'id': 'toolu_' + request_id[:24],
+                        'name': tool_name, 'input': json.loads(text)}]
+        else:
+            content = [{'type': 'text', 'text': text}]
+        return {
+            'id': 'msg_' + request_id,
+            'type': 'message',
+            'role': 'assistant',
+            'model': model,
+            'content': content,
+            'stop_reason': 'tool_use' if tool_name else 'end_turn',
+            'usage': {'input_tokens': input_tokens - cached_tokens - cache_write_tokens,
+                      'cache_creation_input_tokens': cache_write_tokens,
+                      'cache_read_input_tokens': cached_tokens,
+                      'output_tokens': output_tokens},
+        }, {'request-id': 'req_' + request_id}
+    if shape == 'gemini':
+        usage = {'promptTokenCount': input_tokens,
+                 'candidatesTokenCount': output_tokens,
+                 'totalTokenCount': input_tokens + output_tokens}
+        if cached_tokens:
+            usage['cachedContentTokenCount'] = cached_tokens
+        return {
+            'candidates': [{'content': {'role': 'model', 'parts': [{'text': text}]},
+                            'finishReason': 'STOP'}],
+            'usageMetadata': usage,
+            'modelVersion': model,
+            'responseId': request_id,
+        }, {}
+    return {
+        'id': 'chatcmpl-' + request_id,
+        'object': 'chat.completion',
+        'model': model,
+        'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': text},
+                     'finish_reason': 'stop'}],
+        'usage': {'prompt_tokens': input_tokens, 'completion_tokens': output_tokens,
+                  'total_tokens': input_tokens + output_tokens,
+                  'prompt_tokens_details': {'cached_tokens': cached_tokens}},
+    }, {'apim-request-id' if shape == 'azure' else 'x-request-id': request_id}
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'MockLLM/1.0'
+    # Headers and body go out in separate writes; with Nagle on, the body
+    # waits for the client's delayed ACK (~40 ms) and skews every latency
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, body, headers=None):
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        if parts.path == '/stats':
+            self._reply(200, self.server.stats())
+        elif _shape(parts.path, parts.query, {}) == 'gemini_cache':
+            self._cached_contents('GET', parts, None)
+        else:
+            self._reply(404, {'error': 'not found'})
+
+    def do_PATCH(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        parts = urlsplit(self.path)
+        if _shape(parts.path, parts.query, {}) != 'gemini_cache':
+            self._reply(404, {'error': 'not found'})
+            return
+        self._cached_contents('PATCH', parts, json.loads(body.decode('utf-8') or '{}'))
+
+    def do_DELETE(self):
+        parts = urlsplit(self.path)
+        if _shape(parts.path, parts.query, {}) != 'gemini_cache':
+            self._reply(404, {'error': 'not found'})
+            return
+        self._cached_contents('DELETE', parts, None)
+
+    def _cached_contents(self, method, parts, request):
+        """Gemini cachedContents: POST creates, GET lists or gets, PATCH
+        updates the ttl, DELETE deletes."""
+        server = self.server
+        resource_id = parts.path.rsplit('/cachedContents', 1)[-1].strip('/')
+        name = 'cachedContents/' + resource_id
+        server.count('gemini', 'cache_' + method.lower())
+        if method == 'POST':
+            text = ''.join(part.get('text', '') for content in request.get('contents') or []
+                           for part in content.get('parts') or [])
+            text += ''.join(part.get('text', '') for part in
+                            (request.get('systemInstruction') or {}).get('parts') or [])
+            if _tokens(text) < CACHE_MIN_TOKENS:
+                self._reply(400, {'error': {'code': 400, 'status': 'INVALID_ARGUMENT', 'message':
+                                            'Cached content is too small. total_token_count={}, '
+                                            'min_total_token_count={}'.format(
+                                                _tokens(text), CACHE_MIN_TOKENS)}})
+                return
+            self._reply(200, server.cache_create(request, _tokens(text)))
+        elif method == 'GET' and not resource_id:
+            self._reply(200, {'cachedContents': server.cache_list()})
+        elif method == 'PATCH' and 'ttl' in parse_qs(parts.query).get('updateMask', [''])[0]:
+            resource = server.cache_update(name, request.get('ttl'))
+            self._reply(200 if resource else 404, resource or {'error': {'code': 404}})
+        elif method in ('GET', 'DELETE'):
+            resource = server.cache_get(name, delete=method == 'DELETE')
+            self._reply(200 if resource else 404, {} if method == 'DELETE' and resource
+                        else resource or {'error': {'code': 404}})
+        else:
+            self._reply(400, {'error': {'code': 400, 'message': 'Unsupported cachedContents call'}})
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        parts = urlsplit(self.path)
+        shape = _shape(parts.path, parts.query, {k.lower(): v for k, v in self.headers.items()})
+        if shape == 'gemini_cache':
+            self._cached_contents('POST', parts, json.loads(body.decode('utf-8') or '{}'))
+            return
+        if shape is None:
+            server.count('unknown', 'not_found')
+            self._reply(404, {'error': {'message': 'No mock route for {}'.format(parts.path)}})
+            return
+        try:
+            request = json.loads(body.decode('utf-8'))
+        except ValueError:
+            server.count(shape, 'bad_request')
+            self._reply(400, {'error': {'message': 'Request body is not JSON'}})
+            return
+
+        structured = _structured(request)
+        if structured and server.reject_structured:
+            server.count(shape, 'structured_rejected')
+            self._reply(400, {'error': {'type': 'invalid_request_error',
+                                        'message': 'Structured output is not supported by this model'}})
+            return
+
+        input_tokens = max(1, len(body) // CHARS_PER_TOKEN)
+        cached_tokens = cache_write_tokens = 0
+        if shape == 'anthropic':
+            prefix = _anthropic_prefix(request)
+            if _tokens(prefix) >= CACHE_MIN_TOKENS:
+                if server.cache_seen(prefix):
+                    cached_tokens = _tokens(prefix)
+                else:
+                    cache_write_tokens = _tokens(prefix)
+        elif shape == 'gemini':
+            if request.get('cachedContent'):
+                cached_tokens = server.cache_tokens(request['cachedContent'])
+                if cached_tokens is None:
+                    server.count(shape, 'cache_not_found')
+                    self._reply(403, {'error': {'code': 403, 'status': 'PERMISSION_DENIED', 'message':
+                                                'CachedContent not found (or permission denied)'}})
+                    return
+                input_tokens += cached_tokens
+        else:
+            cached_tokens = server.openai_cached_tokens(_openai_prompt(request))
+
+        outcome, delay = server.draw()
+        if outcome != 'rate_limited' and server.prefill_us_per_token:
+            delay += (input_tokens - cached_tokens) * server.prefill_us_per_token / 1e6
+        if delay:
+            time.sleep(delay)
+        server.count(shape, outcome)
+        if outcome == 'rate_limited':
+            self._reply(429, {'error': {'type': 'rate_limit_error', 'message': 'Rate limit reached'}},
+                        {'Retry-After': '1'})
+            return
+        if outcome == 'error':
+            self._reply(500, {'error': {'type': 'server_error', 'message': 'Mock upstream failure'}})
+            return
+
+        text = json.dumps(SCORE)
+        if outcome == 'malformed' and not structured:
+            # Cut inside the explanation string: not recoverable by
+            # genaiscore's fence stripping or brace patching.
+            text = 'Here is the score: ' + text[:text.index('No sensitive') + 6]
+        model = request.get('model') or parts.path.rsplit('/', 1)[-1].split(':')[0] or 'mock'
+        output_tokens = max(1, _tokens(text))
+        tool_name = structured if shape == 'anthropic' and structured is not True else None
+        reply, headers = _envelope(shape, model, text, input_tokens, output_tokens, tool_name,
+                                   cached_tokens, cache_write_tokens)
+        self._reply(200, reply, headers)
+
+
+class MockLLMServer(ThreadingHTTPServer):
+    """Threaded mock provider; one handler thread per connection."""
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, host='127.0.0.1', port=0, latency_ms=0.0, jitter_ms=0.0,
+                 error_rate=0.0, rate_limit_rate=0.0, malformed_rate=0.0, seed=1,
+                 reject_structured=False, prefill_us_per_token=0.0):
+        super(MockLLMServer, self).__init__((host, port), _Handler)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.malformed_rate = malformed_rate
+        self.reject_structured = reject_structured
+        self.prefill_us_per_token = prefill_us_per_token
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._counts = {}
+        # Prompt caching: prefix hashes seen (OpenAI-shaped and Anthropic)
+        # and Gemini cachedContents resources by name
+        self._prefixes = set()
+        self._cached_contents = {}
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return 'http://{}:{}'.format(host, port)
+
+    def draw(self):
+        """Return (outcome, delay seconds) for the next request."""
+        with self._lock:
+            roll = self._rng.random()
+            jitter = self._rng.gauss(0.0, self.jitter_ms) if self.jitter_ms else 0.0
+        delay = max(0.0, self.latency_ms + jitter) / 1000.0
+        if roll < self.rate_limit_rate:
+            # Rate limits are answered before any generation work
+            return 'rate_limited', min(delay, 0.005)
+        roll -= self.rate_limit_rate
+        if roll < self.error_rate:
+            return 'error', delay
+        roll -= self.error_rate
+        if roll < self.malformed_rate:
+            return 'malformed', delay
+        return 'ok', delay
+
+    def openai_cached_tokens(self, text):
+        """Return the cached tokens of an OpenAI-shaped prompt: the longest
+        earlier-seen prefix of at least CACHE_MIN_TOKENS, in
+        CACHE_STEP_TOKENS steps. Records the prompt's prefixes."""
+        step = CACHE_STEP_TOKENS * CHARS_PER_TOKEN
+        ends = range(CACHE_MIN_TOKENS * CHARS_PER_TOKEN, len(text) + 1, step)
+        hashes = [(end, hashlib.sha1(text[:end].encode('utf-8')).digest()) for end in ends]
+        cached = 0
+        with self._lock:
+            for end, digest in hashes:
+                if digest in self._prefixes:
+                    cached = end
+                else:
+                    self._prefixes.add(digest)
+        return cached // CHARS_PER_TOKEN
+
+    def cache_seen(self, prefix):
+        """Return True if *prefix* was cached by an earlier request (and
+        cache it)."""
+        digest = hashlib.sha1(prefix.encode('utf-8')).digest()
+        with self._lock:
+            if digest in self._prefixes:
+                return True
+            self._prefixes.add(digest)
+            return False
+
+    def _cache_resource(self, name):
+        entry = self._cached_contents[name]
+        return {'name': name, 'model': entry['model'], 'displayName': entry['displayName'],
+                'usageMetadata': {'totalTokenCount': entry['tokens']},
+                'expireTime': _rfc3339(entry['expires'])}
+
+    def cache_create(self, request, tokens):
+        ttl = float(str(request.get('ttl') or '3600s').rstrip('s'))
+        name = 'cachedContents/' + uuid.uuid4().hex[:12]
+        with self._lock:
+            self._cached_contents[name] = {
+                'model': request.get('model'), 'displayName': request.get('displayName', ''),
+                'tokens': tokens, 'expires': time.time() + ttl}
+            return self._cache_resource(name)
+
+    def cache_list(self):
+        now = time.time()
+        with self._lock:
+            return [self._cache_resource(name) for name, entry in self._cached_contents.items()
+                    if entry['expires'] > now]
+
+    def cache_get(self, name, delete=False):
+        with self._lock:
+            entry = self._cached_contents.get(name)
+            if entry is None or entry['expires'] <= time.time():
+                return None
+            resource = self._cache_resource(name)
+            if delete:
+                del self._cached_contents[name]
+            return resource
+
+    def cache_update(self, name, ttl):
+        with self._lock:
+            entry = self._cached_contents.get(name)
+            if entry is None or entry['expires'] <= time.time():
+                return None
+            entry['expires'] = time.time() + float(str(ttl or '3600s').rstrip('s'))
+            return self._cache_resource(name)
+
+    def cache_tokens(self, name):
+        """Return the token count of cachedContents *name*, or None."""
+        resource = self.cache_get(name)
+        return resource['usageMetadata']['totalTokenCount'] if resource else None
+
+    def count(self, shape, outcome):
+        with self._lock:
+            by_outcome = self._counts.setdefault(shape, {})
+            by_outcome[outcome] = by_outcome.get(outcome, 0) + 1
+
+    def stats(self):
+        """Return {shape: {outcome: requests}}."""
+        with self._lock:
+            return {shape: dict(by_outcome) for shape, by_outcome in self._counts.items()}
+
+    def start(self):
+        """Serve on a daemon thread and return self."""
+        self._thread = threading.Thread(target=self.serve_forever, name='mock-llm', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8900, help='0 picks a free port')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='mean reply latency')
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help='latency standard deviation')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction answered HTTP 500')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='fraction answered HTTP 429')
+    parser.add_argument('--malformed-rate', type=float, default=0.0,
+                        help='fraction answered with unparseable scoring text')
+    parser.add_argument('--prefill-us-per-token', type=float, default=0.0,
+                        help='added latency per uncached prompt token')
+    parser.add_argument('--reject-structured', action='store_true',
+                        help='answer structured-output requests HTTP 400')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    server = MockLLMServer(args.host, args.port, args.latency_ms, args.jitter_ms, args.error_rate,
+                           args.rate_limit_rate, args.malformed_rate, args.seed,
+                           args.reject_structured, args.prefill_us_per_token)
+    # First stdout line is the base URL, for scripts that started it with --port 0
+    print(server.url, flush=True)
+    print('Mock LLM server listening on {}'.format(server.url), file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+# encoding=utf-8
+"""
+mock_snow_server.py - Developer-only stand-in for the ServiceNow Table API
+
+Serves the endpoints sync_snow_asset.py, pull_snow_inventory.py,
+create_snow_case.py and aicase.py call, from synthetic in-memory tables:
+
+    GET  /api/now/table/<table>    sysparm_query (field=value, !=, LIKE,
+                                   STARTSWITH, joined with ^), sysparm_fields,
+                                   sysparm_limit (default 10000),
+                                   sysparm_offset; X-Total-Count header
+    POST /api/now/table/<table>    creates a record (201) with a sys_id and,
+                                   for sn_ai_case_mgmt_ai_case, a number
+    POST /oauth_token.do           password and client_credentials grants
+    GET  /stats                    request counts by method and table
+
+The AI System table (alm_ai_system_digital_asset) and AI Model table
+(cmdb_ci_ai_model) are filled with --rows records each: display_name
+"ai-system-000042" / "ai-model-000042", name and approval (about 70%
+approved). Equality queries on display_name, name and sys_id use an index,
+so 100k-row tables answer as fast as small ones. Requests without an
+Authorization header get 401. --latency-ms and --jitter-ms delay every
+Table API and token response.
+
+The scripts build https://<instance>.service-now.com URLs; the benchmark
+(bench_snow_scripts.py) rewrites them to this server.
+
+This is NOT shipped in the Splunkbase / Splunk Cloud package
+(excluded by ../package.sh).
+
+Usage:
+    python3 tools/mock_snow_server.py --port 8901 --rows 10000 --latency-ms 120
+
+    from mock_snow_server import MockServiceNowServer
+    server = MockServiceNowServer(rows=1000).start()
+    server.url, server.stats()
+    server.stop()
+
+Copyright 2026 Splunk Inc.
+Licensed under Apache License 2.0
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+SYSTEM_TABLE = 'alm_ai_system_digital_asset'
+MODEL_TABLE = 'cmdb_ci_ai_model'
+CASE_TABLE = 'sn_ai_case_mgmt_ai_case'
+DEFAULT_LIMIT = 10000
+INDEXED_FIELDS = ('sys_id', 'display_name', 'name')
+
+
+def _sys_id(seed):
+    return hashlib.md5(seed.encode('utf-8')).hexdigest()
+
+
+def system_name(i):
+    return 'ai-system-{:06d}'.format(i)
+
+
+def model_name(i):
+    return 'ai-model-{:06d}'.format(i)
+
+
+class Table(object):
+    """Rows of one table, with equality indexes on INDEXED_FIELDS."""
+
+    def __init__(self, name):
+        self.name = name
+        self.rows = []
+        self._index = {field: {} for field in INDEXED_FIELDS}
+
+    def insert(self, row):
+        self.rows.append(row)
+        for field in INDEXED_FIELDS:
+            value = row.get(field)
+            if value:
+                self._index[field].setdefault(value, []).append(row)
+
+    def query(self, conditions):
+        """Return rows matching every (field, operator, value) condition."""
+        rows = self.rows
+        for field, operator, value in conditions:
+            if operator == '=' and field in self._index and rows is self.rows:
+                rows = self._index[field].get(value, [])
+                continue
+            rows = [row for row in rows if _matches(row.get(field, ''), operator, value)]
+        return rows
+
+
+def _matches(actual, operator, value):
+    actual = str(actual)
+    if operator == '=':
+        return actual == value
+    if operator == '!=':
+        return actual != value
+    if operator == 'LIKE':
+        return value.lower() in actual.lower()
+    if operator == 'STARTSWITH':
+        return actual.lower().startswith(value.lower())
+    return False
+
+
+def parse_sysparm_query(query):
+    """Parse an encoded query into (field, operator, value) conditions."""
+    conditions = []
+    for term in filter(None, query.split('^')):
+        for operator in ('STARTSWITH', 'LIKE', '!=', '='):
+            field, found, value = term.partition(operator)
+            if found and field:
+                conditions.append((field, operator, value))
+                break
+        else:
+            raise ValueError('Unsupported sysparm_query term: {}'.format(term))
+    return conditions
+
+
+def build_tables(rows, seed=1):
+    """Return {table name: Table} with *rows* AI Systems and AI Models."""
+    rng = random.Random(seed)
+    tables = {SYSTEM_TABLE: Table(SYSTEM_TABLE), MODEL_TABLE: Table(MODEL_TABLE),
+              CASE_TABLE: Table(CASE_TABLE)}
+    for table, naming in ((SYSTEM_TABLE, system_name), (MODEL_TABLE, model_name)):
+        for i in range(rows):
+            name = naming(i)
+            tables[table].insert({
+                'sys_id': _sys_id(table + name),
+                'display_name': name,
+                'name': name,
+                'approval': 'approved' if rng.random() < 0.7 else rng.choice(['requested', 'rejected']),
+                'sys_created_on': '2026-01-01 00:00:00',
+            })
+    return tables
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'MockServiceNow/1.0'
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, body, headers=None):
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json;charset=UTF-8')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _error(self, status, message):
+        self._reply(status, {'error': {'message': message, 'detail': ''}, 'status': 'failure'})
+
+    def _table(self, path):
+        prefix = '/api/now/table/'
+        return path[len(prefix):].strip('/') if path.startswith(prefix) else None
+
+    def _authorized(self):
+        if self.headers.get('Authorization'):
+            return True
+        self._error(401, 'User Not Authenticated')
+        return False
+
+    def do_GET(self):
+        server = self.server
+        parts = urlsplit(self.path)
+        if parts.path == '/stats':
+            self._reply(200, server.stats())
+            return
+        table_name = self._table(parts.path)
+        if table_name is None:
+            self._error(404, 'Requested URI does not represent any resource')
+            return
+        server.count('GET', table_name)
+        if not self._authorized():
+            return
+        server.delay()
+        table = server.tables.get(table_name)
+        if table is None:
+            self._error(400, 'Invalid table {}'.format(table_name))
+            return
+        params = {k: v[-1] for k, v in parse_qs(parts.query, keep_blank_values=True).items()}
+        try:
+            rows = table.query(parse_sysparm_query(params.get('sysparm_query', '')))
+            limit = int(params.get('sysparm_limit') or DEFAULT_LIMIT)
+            offset = int(params.get('sysparm_offset') or 0)
+        except ValueError as e:
+            self._error(400, str(e))
+            return
+        fields = [f for f in params.get('sysparm_fields', '').split(',') if f]
+        page = rows[offset:offset + limit]
+        if fields:
+            page = [{f: row.get(f, '') for f in fields} for row in page]
+        self._reply(200, {'result': page}, {'X-Total-Count': str(len(rows))})
+
+    def do_POST(self):
+        server = self.server
+        parts = urlsplit(self.path)
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        if parts.path == '/oauth_token.do':
+            server.count('POST', 'oauth_token.do')
+            server.delay()
+            form = {k: v[-1] for k, v in parse_qs(body.decode('utf-8')).items()}
+            if form.get('grant_type') not in ('password', 'client_credentials') or not form.get('client_id'):
+                self._reply(401, {'error': 'access_denied', 'error_description': 'access_denied'})
+                return
+            self._reply(200, {'access_token': 'mock-' + _sys_id(str(time.time())), 'token_type': 'Bearer',
+                              'expires_in': 1799, 'scope': 'useraccount'})
+            return
+        table_name = self._table(parts.path)
+        if table_name is None:
+            self._error(404, 'Requested URI does not represent any resource')
+            return
+        server.count('POST', table_name)
+        if not self._authorized():
+            return
+        server.delay()
+        try:
+            record = json.loads(body.decode('utf-8') or '{}')
+        except ValueError:
+            self._error(400, 'Exception while reading request')
+            return
+        self._reply(201, {'result': server.create(table_name, record)})
+
+
+class MockServiceNowServer(ThreadingHTTPServer):
+    """Threaded ServiceNow Table API stand-in over synthetic tables."""
+
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, host='127.0.0.1', port=0, rows=1000, latency_ms=0.0, jitter_ms=0.0, seed=1):
+        super(MockServiceNowServer, self).__init__((host, port), _Handler)
+        self.tables = build_tables(rows, seed)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._counts = {}
+        self._case_number = 1000
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return 'http://{}:{}'.format(host, port)
+
+    def delay(self):
+        with self._lock:
+            jitter = self._rng.gauss(0.0, self.jitter_ms) if self.jitter_ms else 0.0
+        seconds = max(0.0, self.latency_ms + jitter) / 1000.0
+        if seconds:
+            time.sleep(seconds)
+
+    def count(self, method, table):
+        key = '{} {}'.format(method, table)
+        with self._lock:
+            self._counts[key] = self._counts.get(key, 0) + 1
+
+    def stats(self):
+        """Return {"<METHOD> <table>": requests}."""
+        with self._lock:
+            return dict(self._counts)
+
+    def create(self, table_name, record):
+        with self._lock:
+            table = self.tables.setdefault(table_name, Table(table_name))
+            self._case_number += 1
+            row = dict(record)
+            row['sys_id'] = _sys_id('{}{}{}'.format(table_name, self._case_number, time.time()))
+            row['sys_created_on'] = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime())
+            if table_name == CASE_TABLE:
+                row['number'] = 'AICASE{:07d}'.format(self._case_number)
+            table.insert(row)
+        return row
+
+    def start(self):
+        """Serve on a daemon thread and return self."""
+        threading.Thread(target=self.serve_forever, name='mock-snow', daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8901, help='0 picks a free port')
+    parser.add_argument('--rows', type=int, default=1000, help='rows in each AI System / AI Model table')
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    server = MockServiceNowServer(args.host, args.port, args.rows, args.latency_ms, args.jitter_ms, args.seed)
+    # First stdout line is the base URL, for scripts that started it with --port 0
+    print(server.url, flush=True)
+    print('Mock ServiceNow listening on {} ({} rows per table)'.format(server.url, args.rows), file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
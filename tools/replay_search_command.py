@@ -0,0 +1,538 @@
+#!/usr/bin/env python3
+# encoding=utf-8
+"""
+replay_search_command.py - Developer-only offline replay harness for the custom search commands
+
+Replays chunked protocol v2 input (the getinfo chunk and every execute
+chunk) against a StreamingCommand from bin/ outside Splunk, and reports:
+
+    per chunk   records and bytes in/out, wall time from sending the chunk
+                to the command's last reply chunk, RSS and peak RSS
+    per run     getinfo time, total wall time, bytes in/out, peak RSS,
+                splunkd REST calls, ERROR/WARN messages from the command
+
+The command runs in a child process exactly as splunkd starts it for
+chunked = true (no command-line arguments, chunks on stdin/stdout). Its
+splunkd REST calls go to stub_splunkd.py: searchinfo.splunkd_uri is
+rewritten to the stub, which answers from --fixtures (or proxies to a real
+splunkd with --proxy and saves fixtures with --save-fixtures). LLM and
+ServiceNow calls are made as configured in those fixtures, so point the
+AI Toolkit connection at mock_llm_server.py for a fully offline run;
+replay_fixtures_genaiscore.json does this for pipeline_1 and an OpenAI
+connection at http://127.0.0.1:8900 (mock_llm_server.py's default port).
+Its other pipelines have one invalid key each (pipeline_2:
+gate_sample_rate = 2, pipeline_3: max_concurrency = 0, pipeline_4:
+max_tokens = abc, pipeline_5: priority_fields weight "high"); every event
+replayed against them must come back with a "Config load failed"
+genai_scoring_error.
+
+Recording input from a real search:
+    Add record=t to the command on a development instance, e.g.
+        index=gen_ai_log | head 5000 | genaiscore pipeline=pipeline_1 record=t
+    splunklib writes the input and the command's output to
+        $SPLUNK_HOME/var/run/splunklib.searchcommands/recordings/
+            <Class>-<time>.getinfo.input.gz / .output.gz
+    The recording's command class selects the bin/ script. With
+    --compare-output the replay's records per chunk are checked against
+    the recorded .output.gz (exit 1 on a mismatch), which makes a recording
+    a regression test for the SDK transport in lib/splunklib/searchcommands.
+
+Without a Splunk instance, --events builds the input from a JSON lines file
+(one result per line; Splunk export's {"result": {...}} lines also work),
+split into --chunk-size chunks, with --args as the command arguments.
+
+--cprofile writes a cProfile file of the command process (top functions are
+printed), --tracemalloc N adds the N largest allocation sites and the
+traced peak to the report. Results are printed (or written with --output)
+as JSON.
+
+This is NOT shipped in the Splunkbase / Splunk Cloud package
+(excluded by ../package.sh).
+
+Usage:
+    python3 tools/mock_llm_server.py --latency-ms 200 &
+    python3 tools/replay_search_command.py --events events.jsonl --command genaiscore \\
+        --args pipeline=pipeline_1 --fixtures tools/replay_fixtures_genaiscore.json
+    python3 tools/replay_search_command.py GenAIScoreCommand-1792425600.5.getinfo.input.gz \\
+        --fixtures fixtures.json --compare-output
+    python3 tools/replay_search_command.py rec.input.gz --fixtures fixtures.json \\
+        --cprofile /tmp/genaiscore.prof --tracemalloc 20 --repeat 3
+
+Copyright 2026 Splunk Inc.
+Licensed under Apache License 2.0
+"""
+
+import argparse
+import csv
+import glob
+import gzip
+import io
+import json
+import os
+import platform
+import re
+import shlex
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from datetime import datetime, timezone
+
+TA_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BIN_PATH = os.path.join(TA_ROOT, 'bin')
+TOOLS_PATH = os.path.dirname(os.path.abspath(__file__))
+
+HEADER = re.compile(br'chunked\s+1\.0\s*,\s*(\d+)\s*,\s*(\d+)\s*\n')
+
+
+# ---------------------------------------------------------------------------
+# Chunked protocol v2 streams
+# ---------------------------------------------------------------------------
+
+def read_stream(path):
+    """Return the bytes of a recording; .gz files may lack the gzip trailer
+    (splunklib flushes but never closes its recorder)."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if path.endswith('.gz'):
+        return zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(data)
+    return data
+
+
+def iter_chunks(data):
+    """Yield (metadata dict, body bytes) for each chunk in *data*."""
+    offset = 0
+    while offset < len(data):
+        match = HEADER.match(data, offset)
+        if match is None:
+            raise ValueError('No chunk header at byte {}: {!r}'.format(offset, data[offset:offset + 40]))
+        metadata_length, body_length = int(match.group(1)), int(match.group(2))
+        start = match.end()
+        metadata = data[start:start + metadata_length]
+        body = data[start + metadata_length:start + metadata_length + body_length]
+        offset = start + metadata_length + body_length
+        yield json.loads(metadata.decode('utf-8')) if metadata else {}, body
+
+
+def encode_chunk(metadata, body=b''):
+    metadata = json.dumps(metadata, separators=(',', ':')).encode('utf-8')
+    return 'chunked 1.0,{},{}\n'.format(len(metadata), len(body)).encode('utf-8') + metadata + body
+
+
+def read_reply_chunk(stream, copy=None):
+    """Read one chunk from the command; return (metadata, body, bytes read) or None at EOF."""
+    header = stream.readline()
+    if not header:
+        return None
+    match = HEADER.match(header)
+    if match is None:
+        raise RuntimeError('Command wrote a non-chunk line: {!r}'.format(header[:200]))
+    metadata = stream.read(int(match.group(1)))
+    body = stream.read(int(match.group(2)))
+    if copy is not None:
+        copy.write(header + metadata + body)
+    return (json.loads(metadata.decode('utf-8')) if metadata else {}, body,
+            len(header) + len(metadata) + len(body))
+
+
+def count_records(body):
+    if not body:
+        return 0
+    rows = sum(1 for _ in csv.reader(io.TextIOWrapper(io.BytesIO(body), encoding='utf-8', newline='')))
+    return max(0, rows - 1)
+
+
+def _mv_encode(values):
+    return '$' + '$;$'.join(str(v).replace('$', '$$') for v in values) + '$'
+
+
+def csv_body(records):
+    """Encode records the way splunkd sends them (multivalue fields as value + __mv_ field)."""
+    fieldnames = []
+    seen = set()
+    for record in records:
+        for name in record:
+            if name not in seen:
+                seen.add(name)
+                fieldnames.append(name)
+    columns = []
+    for name in fieldnames:
+        columns += [name, '__mv_' + name]
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator='\r\n')
+    writer.writerow(columns)
+    for record in records:
+        row = []
+        for name in fieldnames:
+            value = record.get(name, '')
+            if isinstance(value, list):
+                row += ['\n'.join(str(v) for v in value), _mv_encode(value) if len(value) > 1 else '']
+            else:
+                row += ['' if value is None else str(value), '']
+        writer.writerow(row)
+    return out.getvalue().encode('utf-8')
+
+
+def getinfo_metadata(command, args):
+    return {
+        'action': 'getinfo',
+        'preview': False,
+        'searchinfo': {
+            'args': args,
+            'raw_args': args,
+            'app': 'TA-gen_ai_cim',
+            'owner': 'admin',
+            'username': 'admin',
+            'session_key': 'replay-session-key',
+            'splunkd_uri': 'https://127.0.0.1:8089',
+            'splunk_version': '9.3.0',
+            'search': '| {} {}'.format(command, ' '.join(args)),
+            'earliest_time': '0',
+            'latest_time': '0',
+            'maxresultrows': 50000,
+            'sid': 'replay',
+            'dispatch_dir': '',
+        },
+    }
+
+
+def events_stream(path, command, args, chunk_size):
+    """Build a protocol v2 input stream from a JSON lines file of results."""
+    records = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if isinstance(record.get('result'), dict):
+                record = record['result']
+            records.append(record)
+    parts = [encode_chunk(getinfo_metadata(command, args))]
+    starts = list(range(0, len(records), chunk_size)) or [0]
+    for i, start in enumerate(starts):
+        parts.append(encode_chunk({'action': 'execute', 'finished': i == len(starts) - 1},
+                                  csv_body(records[start:start + chunk_size])))
+    return b''.join(parts)
+
+
+def find_script(command=None, class_name=None):
+    """Return the bin/ script for a command name or a StreamingCommand class name."""
+    if command:
+        script = os.path.join(BIN_PATH, command if command.endswith('.py') else command + '.py')
+        if not os.path.isfile(script):
+            raise SystemExit('No such command script: {}'.format(script))
+        return script
+    pattern = re.compile(r'^class\s+{}\s*\('.format(re.escape(class_name or '')), re.MULTILINE)
+    for script in sorted(glob.glob(os.path.join(BIN_PATH, '*.py'))):
+        with open(script, encoding='utf-8') as f:
+            if pattern.search(f.read()):
+                return script
+    raise SystemExit('No bin/ script defines class {!r}; pass --command'.format(class_name))
+
+
+# ---------------------------------------------------------------------------
+# Command process
+# ---------------------------------------------------------------------------
+
+def run_child(script, cprofile_path, tracemalloc_top, tracemalloc_path):
+    """Run *script* as splunkd would, optionally under cProfile/tracemalloc."""
+    import runpy
+    import tracemalloc
+    sys.argv = [script]
+    sys.path.insert(0, os.path.dirname(script))
+    if tracemalloc_top:
+        tracemalloc.start()
+    profiler = None
+    if cprofile_path:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    code = 0
+    try:
+        runpy.run_path(script, run_name='__main__')
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(cprofile_path)
+        if tracemalloc_top:
+            peak = tracemalloc.get_traced_memory()[1]
+            top = tracemalloc.take_snapshot().statistics('lineno')[:tracemalloc_top]
+            tracemalloc.stop()
+            with open(tracemalloc_path, 'w', encoding='utf-8') as f:
+                json.dump({'traced_peak_mb': round(peak / (1024.0 * 1024.0), 2), 'top': [
+                    {'location': '{}:{}'.format(stat.traceback[0].filename, stat.traceback[0].lineno),
+                     'size_kb': round(stat.size / 1024.0, 1), 'count': stat.count} for stat in top]}, f)
+        sys.stdout.flush()
+    sys.exit(code)
+
+
+def _proc_memory_mb(pid):
+    """Return (VmRSS, VmHWM) of *pid* in MB, or (None, None) off Linux."""
+    try:
+        with open('/proc/{}/status'.format(pid)) as f:
+            status = dict(line.split(':', 1) for line in f if ':' in line)
+        return (round(int(status['VmRSS'].split()[0]) / 1024.0, 1),
+                round(int(status['VmHWM'].split()[0]) / 1024.0, 1))
+    except (OSError, KeyError, ValueError):
+        return None, None
+
+
+def _messages(metadata):
+    return [{'type': m[0], 'text': m[1]} for m in (metadata.get('inspector') or {}).get('messages', [])
+            if isinstance(m, list) and len(m) == 2]
+
+
+def replay(script, getinfo, executes, splunkd_url, splunk_home, profile=None, output=None):
+    """Run one replay; return the run report and the records out per execute chunk.
+    The command's output stream is written to *output* (a binary file) when given."""
+    profile = profile or {}
+    dispatch_dir = tempfile.mkdtemp(prefix='dispatch_', dir=os.path.join(splunk_home, 'var', 'run', 'splunk'))
+    getinfo = json.loads(json.dumps(getinfo))
+    getinfo['searchinfo']['splunkd_uri'] = splunkd_url
+    getinfo['searchinfo']['dispatch_dir'] = dispatch_dir
+    command = [sys.executable, os.path.abspath(__file__), '--child', script]
+    if profile.get('cprofile'):
+        command += ['--cprofile', profile['cprofile']]
+    if profile.get('tracemalloc'):
+        command += ['--tracemalloc', str(profile['tracemalloc']), '--tracemalloc-file', profile['tracemalloc_file']]
+    stderr_path = os.path.join(dispatch_dir, 'command.stderr')
+    env = dict(os.environ, SPLUNK_HOME=splunk_home)
+    run = {'chunks': [], 'messages': []}
+    records_out_per_chunk = []
+    with open(stderr_path, 'wb') as stderr:
+        start = time.perf_counter()
+        proc = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=stderr, env=env)
+        try:
+            data = encode_chunk(getinfo)
+            proc.stdin.write(data)
+            proc.stdin.flush()
+            reply = read_reply_chunk(proc.stdout, output)
+            run['getinfo_ms'] = round((time.perf_counter() - start) * 1000.0, 2)
+            run['bytes_in'], run['bytes_out'] = len(data), reply[2] if reply else 0
+            if reply:
+                run['messages'] += _messages(reply[0])
+            alive = bool(reply) and not reply[0].get('finished')
+            for index, (metadata, body) in enumerate(executes if alive else []):
+                data = encode_chunk(metadata, body)
+                chunk_start = time.perf_counter()
+                proc.stdin.write(data)
+                proc.stdin.flush()
+                bytes_out = records_out = 0
+                while True:
+                    reply = read_reply_chunk(proc.stdout, output)
+                    if reply is None:
+                        break
+                    bytes_out += reply[2]
+                    records_out += count_records(reply[1])
+                    run['messages'] += _messages(reply[0])
+                    if not reply[0].get('partial'):
+                        break
+                elapsed = time.perf_counter() - chunk_start
+                rss, peak = _proc_memory_mb(proc.pid)
+                run['chunks'].append({
+                    'index': index,
+                    'records_in': count_records(body),
+                    'records_out': records_out,
+                    'bytes_in': len(data),
+                    'bytes_out': bytes_out,
+                    'wall_ms': round(elapsed * 1000.0, 2),
+                    'rss_mb': rss,
+                    'peak_rss_mb': peak,
+                })
+                records_out_per_chunk.append(records_out)
+                run['bytes_in'] += len(data)
+                run['bytes_out'] += bytes_out
+                if reply is None or reply[0].get('finished'):
+                    break
+            proc.stdin.close()
+        except BrokenPipeError:
+            pass
+        finally:
+            proc.stdout.read()
+            _, status, usage = os.wait4(proc.pid, 0)
+            proc.returncode = os.waitstatus_to_exitcode(status)
+        run['wall_s'] = round(time.perf_counter() - start, 3)
+    run['exit_code'] = proc.returncode
+    # ru_maxrss is KB on Linux, bytes on macOS
+    run['peak_rss_mb'] = round(usage.ru_maxrss / (1024.0 * 1024.0 if sys.platform == 'darwin' else 1024.0), 1)
+    run['records_in'] = sum(c['records_in'] for c in run['chunks'])
+    run['records_out'] = sum(c['records_out'] for c in run['chunks'])
+    if proc.returncode != 0 or len(run['chunks']) < len(executes):
+        with open(stderr_path, 'rb') as f:
+            run['stderr_tail'] = f.read()[-4000:].decode('utf-8', errors='replace')
+    return run, records_out_per_chunk
+
+
+def recorded_output(path):
+    """Return records out per execute chunk from a recorded .output.gz (partial chunks merged)."""
+    counts, current = [], 0
+    chunks = iter_chunks(read_stream(path))
+    next(chunks, None)  # getinfo reply
+    for metadata, body in chunks:
+        current += count_records(body)
+        if not metadata.get('partial'):
+            counts.append(current)
+            current = 0
+    return counts
+
+
+def print_profile(path, limit):
+    import pstats
+    print('\ncProfile of the command process (top {} by cumulative time):'.format(limit), file=sys.stderr)
+    pstats.Stats(path, stream=sys.stderr).sort_stats('cumulative').print_stats(limit)
+
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == '--child':
+        child = argparse.ArgumentParser()
+        child.add_argument('--child', dest='script')
+        child.add_argument('--cprofile')
+        child.add_argument('--tracemalloc', type=int, default=0)
+        child.add_argument('--tracemalloc-file')
+        options = child.parse_args()
+        run_child(options.script, options.cprofile, options.tracemalloc, options.tracemalloc_file)
+
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('recording', nargs='?', help='chunked v2 input (.input.gz from record=t, or plain)')
+    parser.add_argument('--events', help='JSON lines results to replay instead of a recording')
+    parser.add_argument('--command', help='bin/ command script (default: from the recording class name)')
+    parser.add_argument('--args', help='command arguments, replacing the recorded ones')
+    parser.add_argument('--chunk-size', type=int, default=5000, help='records per chunk with --events')
+    parser.add_argument('--save-input', help='write the replayed input stream (gzip) here')
+    parser.add_argument('--save-output', help="write the command's output stream (gzip) of the first run here")
+    parser.add_argument('--fixtures', help='stub_splunkd.py fixture file')
+    parser.add_argument('--proxy', help='send splunkd calls to this splunkd instead of fixtures')
+    parser.add_argument('--session-key', help='session key for --proxy')
+    parser.add_argument('--save-fixtures', help='with --proxy, save the splunkd replies here')
+    parser.add_argument('--compare-output', nargs='?', const='', metavar='OUTPUT_GZ',
+                        help='check records per chunk against the recorded output '
+                             '(default: the .output.gz next to the recording)')
+    parser.add_argument('--repeat', type=int, default=1, help='replays; profiling covers the first')
+    parser.add_argument('--cprofile', metavar='FILE', help='write a cProfile file of the command process')
+    parser.add_argument('--profile-top', type=int, default=25)
+    parser.add_argument('--tracemalloc', type=int, default=0, metavar='N', help='report the N largest allocation sites')
+    parser.add_argument('--splunk-home', help='SPLUNK_HOME for the command (default: a temp dir)')
+    parser.add_argument('--output', help='write the JSON report to this file')
+    args = parser.parse_args()
+    if bool(args.recording) == bool(args.events):
+        parser.error('pass a recording or --events, not both')
+    if args.events and not args.command:
+        parser.error('--events needs --command')
+
+    sys.path.insert(0, TOOLS_PATH)
+    from stub_splunkd import StubSplunkd, load_fixtures, save_fixtures
+
+    command_args = shlex.split(args.args) if args.args is not None else None
+    if args.events:
+        data = events_stream(args.events, args.command, command_args or [], args.chunk_size)
+    else:
+        data = read_stream(args.recording)
+    if args.save_input:
+        with gzip.open(args.save_input, 'wb') as f:
+            f.write(data)
+    chunks = list(iter_chunks(data))
+    getinfo, executes = chunks[0][0], chunks[1:]
+    if getinfo.get('action') != 'getinfo':
+        raise SystemExit('Input does not start with a getinfo chunk')
+    if command_args is not None:
+        getinfo['searchinfo']['args'] = getinfo['searchinfo']['raw_args'] = command_args
+    class_name = os.path.basename(args.recording or '').split('-', 1)[0]
+    script = find_script(args.command, class_name)
+
+    splunk_home = args.splunk_home or tempfile.mkdtemp(prefix='replay_search_command_')
+    for sub in (('var', 'log', 'splunk'), ('var', 'run', 'splunk')):
+        os.makedirs(os.path.join(splunk_home, *sub), exist_ok=True)
+    stub = StubSplunkd(fixtures=load_fixtures(args.fixtures), proxy=args.proxy,
+                       session_key=args.session_key).start()
+
+    report = {
+        'harness': 'replay_search_command',
+        'generated_at': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'script': os.path.relpath(script, TA_ROOT),
+        'input': args.recording or args.events,
+        'args': getinfo['searchinfo'].get('args'),
+        'execute_chunks': len(executes),
+        'runs': [],
+    }
+    profile = {}
+    if args.cprofile:
+        profile['cprofile'] = os.path.abspath(args.cprofile)
+    if args.tracemalloc:
+        profile['tracemalloc'] = args.tracemalloc
+        profile['tracemalloc_file'] = os.path.join(splunk_home, 'tracemalloc.json')
+    out_counts = None
+    try:
+        for i in range(max(1, args.repeat)):
+            before = stub.stats()['total']
+            output = gzip.open(args.save_output, 'wb') if args.save_output and i == 0 else None
+            try:
+                run, out_counts_run = replay(script, getinfo, executes, stub.url, splunk_home,
+                                             profile if i == 0 else None, output)
+            finally:
+                if output is not None:
+                    output.close()
+            run['splunkd_requests'] = stub.stats()['total'] - before
+            out_counts = out_counts if out_counts is not None else out_counts_run
+            report['runs'].append(dict({'run': i + 1}, **run))
+            print('run {}: exit {} getinfo {:.1f} ms, {} chunks, {} -> {} records, {:.3f} s, '
+                  '{:.1f} MB in, {:.1f} MB out, peak RSS {} MB, {} splunkd calls'.format(
+                      i + 1, run['exit_code'], run['getinfo_ms'], len(run['chunks']), run['records_in'],
+                      run['records_out'], run['wall_s'], run['bytes_in'] / 1048576.0,
+                      run['bytes_out'] / 1048576.0, run['peak_rss_mb'], run['splunkd_requests']),
+                  file=sys.stderr)
+            for chunk in run['chunks']:
+                print('  chunk {index:>4}: {records_in:>6} -> {records_out:>6} records  {wall_ms:>10.1f} ms  '
+                      'rss {rss_mb} MB (peak {peak_rss_mb} MB)'.format(**chunk), file=sys.stderr)
+            if run.get('stderr_tail'):
+                print('command stderr (tail):\n' + run['stderr_tail'], file=sys.stderr)
+    finally:
+        stub.stop()
+    stats = stub.stats()
+    report['splunkd'] = stats
+    if stats['unmatched']:
+        print('splunkd calls without a fixture: {}'.format(', '.join(sorted(stats['unmatched']))), file=sys.stderr)
+    if args.save_fixtures:
+        save_fixtures(args.save_fixtures, dict(load_fixtures(args.fixtures), **stub.saved))
+    walls = [run['wall_s'] for run in report['runs']]
+    report['wall_s'] = {'min': min(walls), 'median': round(statistics.median(walls), 3), 'max': max(walls)}
+    if args.cprofile:
+        report['cprofile'] = profile['cprofile']
+        print_profile(profile['cprofile'], args.profile_top)
+    if args.tracemalloc and os.path.exists(profile['tracemalloc_file']):
+        with open(profile['tracemalloc_file'], encoding='utf-8') as f:
+            report['tracemalloc'] = json.load(f)
+
+    failed = any(run['exit_code'] != 0 for run in report['runs'])
+    if args.compare_output is not None:
+        expected_path = args.compare_output or re.sub(r'\.input(\.gz)?$', r'.output\1', args.recording or '')
+        if not os.path.isfile(expected_path):
+            raise SystemExit('No recorded output to compare with: {!r}'.format(expected_path))
+        expected = recorded_output(expected_path)
+        mismatches = [{'chunk': i, 'expected': e, 'replayed': r}
+                      for i, (e, r) in enumerate(zip(expected, out_counts)) if e != r]
+        if len(expected) != len(out_counts):
+            mismatches.append({'chunks_expected': len(expected), 'chunks_replayed': len(out_counts)})
+        report['output_mismatches'] = mismatches
+        print('output vs {}: {}'.format(os.path.basename(expected_path),
+                                         'match' if not mismatches else '{} mismatch(es)'.format(len(mismatches))),
+              file=sys.stderr)
+        failed = failed or bool(mismatches)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
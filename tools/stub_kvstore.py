@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# encoding=utf-8
+"""
+stub_kvstore.py - Developer-only in-memory KV Store for benchmarks
+
+Implements the part of splunklib's KV Store client the ServiceNow scripts
+and aicase use: service.kvstore[<collection>].data.query(query=<json>),
+query(), insert(<json>), update(<key>, <json>), batch_save(*<dict>) and
+delete(query=<json>).
+Queries support field equality only, as the scripts send them. Every call
+is counted per collection and operation, and an optional per-call delay
+stands in for the splunkd round trip.
+
+StubService also counts connects, so a benchmark that replaces
+ta_gen_ai_cim_splunkd.connect with StubService.connect can report how many
+splunkd connections a script opens.
+
+This is NOT shipped in the Splunkbase / Splunk Cloud package
+(excluded by ../package.sh).
+
+Usage:
+    from stub_kvstore import StubService
+    service = StubService(delay_ms=2)
+    module.splunkd_connect = service.connect
+    service.kvstore['gen_ai_app_asset_map'].data.insert(json.dumps(record))
+    service.stats()
+
+Copyright 2026 Splunk Inc.
+Licensed under Apache License 2.0
+"""
+
+import copy
+import json
+import time
+import uuid
+
+
+class StubCollection(object):
+    """One collection; .data is the collection itself, as in splunklib."""
+
+    def __init__(self, name, service):
+        self.name = name
+        self._service = service
+        self._records = {}
+        self.data = self
+
+    def _op(self, operation):
+        self._service.record_op(self.name, operation)
+
+    @staticmethod
+    def _filter(query):
+        if not query:
+            return {}
+        return json.loads(query) if isinstance(query, str) else dict(query)
+
+    def query(self, query=None, **kwargs):
+        self._op('query')
+        conditions = self._filter(query)
+        return [copy.deepcopy(record) for record in self._records.values()
+                if all(record.get(field) == value for field, value in conditions.items())]
+
+    def query_by_id(self, key):
+        self._op('query_by_id')
+        return copy.deepcopy(self._records[key])
+
+    def insert(self, data):
+        self._op('insert')
+        record = json.loads(data) if isinstance(data, str) else dict(data)
+        key = record.get('_key') or uuid.uuid4().hex
+        record['_key'] = key
+        self._records[key] = record
+        return {'_key': key}
+
+    def update(self, key, data):
+        self._op('update')
+        if key not in self._records:
+            raise KeyError('Record {} not found in {}'.format(key, self.name))
+        record = json.loads(data) if isinstance(data, str) else dict(data)
+        record['_key'] = key
+        self._records[key] = record
+        return {'_key': key}
+
+    def batch_save(self, *documents):
+        self._op('batch_save')
+        keys = []
+        for document in documents:
+            record = copy.deepcopy(document)
+            record['_key'] = record.get('_key') or uuid.uuid4().hex
+            self._records[record['_key']] = record
+            keys.append(record['_key'])
+        return keys
+
+    def delete(self, query=None):
+        self._op('delete')
+        conditions = self._filter(query)
+        for key in [k for k, r in self._records.items()
+                    if all(r.get(f) == v for f, v in conditions.items())]:
+            del self._records[key]
+
+    def __len__(self):
+        return len(self._records)
+
+
+class _KVStore(dict):
+
+    def __init__(self, service):
+        super(_KVStore, self).__init__()
+        self._service = service
+
+    def __missing__(self, name):
+        collection = self[name] = StubCollection(name, self._service)
+        return collection
+
+
+class StubService(object):
+    """Stand-in for the splunklib Service returned by ta_gen_ai_cim_splunkd.connect."""
+
+    def __init__(self, delay_ms=0.0):
+        self.delay_ms = delay_ms
+        self.kvstore = _KVStore(self)
+        self.connects = 0
+        self._ops = {}
+
+    def connect(self, session_key=None, *args, **kwargs):
+        self.connects += 1
+        return self
+
+    def record_op(self, collection, operation):
+        key = '{} {}'.format(operation, collection)
+        self._ops[key] = self._ops.get(key, 0) + 1
+        if self.delay_ms:
+            time.sleep(self.delay_ms / 1000.0)
+
+    def reset_stats(self):
+        self.connects = 0
+        self._ops = {}
+
+    def stats(self):
+        """Return {'connects': n, 'operations': {"<op> <collection>": n}, 'total_operations': n}."""
+        return {'connects': self.connects, 'operations': dict(self._ops),
+                'total_operations': sum(self._ops.values())}
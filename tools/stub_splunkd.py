@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# encoding=utf-8
+"""
+stub_splunkd.py - Developer-only splunkd REST stand-in for offline command runs
+
+Answers the splunkd management API calls genaiscore, aicase and the alert
+actions make (conf reads, KV Store queries and writes, storage passwords,
+server settings) from a JSON fixture file, over plain HTTP, so a search
+command can run outside Splunk with searchinfo.splunkd_uri pointed here.
+
+Fixtures map "<METHOD> <path>[?<query>]" to a reply:
+
+    {
+      "GET /servicesNS/nobody/TA-gen_ai_cim/configs/conf-ta_gen_ai_cim_genai_scoring":
+          {"status": 200, "content_type": "application/json", "body": {...}},
+      "GET /servicesNS/nobody/Splunk_ML_Toolkit/storage/collections/data/mltk_ai_commander_collection":
+          {"status": 200, "body": [...]}
+    }
+
+A request matches the key with its exact query string first, then the key
+without a query; trailing slashes are ignored. "body" is JSON, or a string
+sent as is (Atom XML replies). Unmatched POSTs to storage/collections/data
+answer 201 with a new _key (KV writes succeed); anything else unmatched
+gets splunkd's 404 message and is listed under "unmatched" in
+GET /__stub__/stats.
+
+With --proxy https://localhost:8089 every request is forwarded to a real
+splunkd (certificate checks off, optional --session-key replacing an
+expired recorded one) and the replies are saved with --save-fixtures, so a
+later run can be fully offline.
+
+This is NOT shipped in the Splunkbase / Splunk Cloud package
+(excluded by ../package.sh).
+
+Usage:
+    python3 tools/stub_splunkd.py --port 8910 --fixtures fixtures.json
+    python3 tools/stub_splunkd.py --port 0 --proxy https://localhost:8089 \\
+        --session-key "$KEY" --save-fixtures fixtures.json
+
+    from stub_splunkd import StubSplunkd
+    stub = StubSplunkd(fixtures=json.load(f)).start()
+    stub.url, stub.stats()
+    stub.stop()
+
+Copyright 2026 Splunk Inc.
+Licensed under Apache License 2.0
+"""
+
+import argparse
+import json
+import ssl
+import sys
+import threading
+import urllib.request
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.error import HTTPError
+from urllib.parse import urlsplit
+
+KV_DATA_SEGMENT = '/storage/collections/data/'
+STATS_PATH = '/__stub__/stats'
+
+
+def _normalize(path):
+    # splunklib sends collection reads with a trailing slash
+    return path.rstrip('/') or '/'
+
+
+def _fixture_key(key):
+    method, _, target = key.partition(' ')
+    path, mark, query = target.partition('?')
+    return '{} {}{}{}'.format(method, _normalize(path), mark, query)
+
+
+def _not_found(path):
+    return {'status': 404, 'content_type': 'application/json',
+            'body': {'messages': [{'type': 'ERROR', 'text': 'Not Found: {} (stub_splunkd)'.format(path)}]}}
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'StubSplunkd/1.0'
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, reply):
+        body = reply.get('body', '')
+        if not isinstance(body, str):
+            body = json.dumps(body)
+        payload = body.encode('utf-8')
+        self.send_response(reply.get('status', 200))
+        self.send_header('Content-Type', reply.get('content_type') or 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _handle(self, method):
+        server = self.server
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        parts = urlsplit(self.path)
+        if method == 'GET' and parts.path == STATS_PATH:
+            self._reply({'body': server.stats()})
+            return
+        key = '{} {}'.format(method, _normalize(parts.path))
+        full_key = key + ('?' + parts.query if parts.query else '')
+        if server.proxy:
+            reply = server.forward(method, self.path, body, self.headers)
+            server.save(full_key, reply)
+        else:
+            reply = server.fixtures.get(full_key) or server.fixtures.get(key)
+            if reply is None:
+                reply = server.default_reply(method, parts.path, full_key)
+        server.count(key)
+        self._reply(reply)
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def do_DELETE(self):
+        self._handle('DELETE')
+
+
+class StubSplunkd(ThreadingHTTPServer):
+    """Fixture-backed (or recording proxy) splunkd management API."""
+
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=0, fixtures=None, proxy=None, session_key=None):
+        super(StubSplunkd, self).__init__((host, port), _Handler)
+        self.fixtures = {_fixture_key(key): reply for key, reply in (fixtures or {}).items()}
+        self.proxy = proxy.rstrip('/') if proxy else None
+        self.session_key = session_key
+        self.saved = {}
+        self._lock = threading.Lock()
+        self._counts = {}
+        self._unmatched = {}
+        self._context = ssl.create_default_context()
+        self._context.check_hostname = False
+        self._context.verify_mode = ssl.CERT_NONE
+
+    def handle_error(self, request, client_address):
+        # Commands drop their keep-alive connections when they exit
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super(StubSplunkd, self).handle_error(request, client_address)
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return 'http://{}:{}'.format(host, port)
+
+    def count(self, key):
+        with self._lock:
+            self._counts[key] = self._counts.get(key, 0) + 1
+
+    def default_reply(self, method, path, full_key):
+        if method == 'POST' and KV_DATA_SEGMENT in path:
+            return {'status': 201, 'body': {'_key': uuid.uuid4().hex}}
+        with self._lock:
+            self._unmatched[full_key] = self._unmatched.get(full_key, 0) + 1
+        return _not_found(path)
+
+    def forward(self, method, path, body, headers):
+        """Send the request to the --proxy splunkd; return the reply as a fixture."""
+        forward_headers = {name: value for name, value in headers.items()
+                           if name.lower() in ('authorization', 'content-type', 'accept')}
+        if self.session_key:
+            forward_headers['Authorization'] = 'Splunk {}'.format(self.session_key)
+        request = urllib.request.Request(self.proxy + path, data=body or None,
+                                         headers=forward_headers, method=method)
+        try:
+            with urllib.request.urlopen(request, context=self._context, timeout=60) as response:
+                status, content_type, payload = response.status, response.headers.get('Content-Type'), response.read()
+        except HTTPError as e:
+            status, content_type, payload = e.code, e.headers.get('Content-Type'), e.read()
+        text = payload.decode('utf-8', errors='replace')
+        reply = {'status': status, 'content_type': content_type, 'body': text}
+        if content_type and 'json' in content_type:
+            try:
+                reply['body'] = json.loads(text)
+            except ValueError:
+                pass
+        return reply
+
+    def save(self, key, reply):
+        with self._lock:
+            self.saved[key] = reply
+
+    def stats(self):
+        """Return {'requests': {"<METHOD> <path>": n}, 'total': n, 'unmatched': {key: n}}."""
+        with self._lock:
+            return {'requests': dict(self._counts), 'total': sum(self._counts.values()),
+                    'unmatched': dict(self._unmatched)}
+
+    def start(self):
+        """Serve on a daemon thread and return self."""
+        threading.Thread(target=self.serve_forever, name='stub-splunkd', daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def load_fixtures(path):
+    if not path:
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_fixtures(path, fixtures):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(fixtures, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8910, help='0 picks a free port')
+    parser.add_argument('--fixtures', help='JSON fixture file to serve')
+    parser.add_argument('--proxy', help='forward to this splunkd instead, e.g. https://localhost:8089')
+    parser.add_argument('--session-key', help='session key sent to the --proxy splunkd')
+    parser.add_argument('--save-fixtures', help='with --proxy, write the replies here on exit')
+    args = parser.parse_args()
+
+    server = StubSplunkd(args.host, args.port, load_fixtures(args.fixtures), args.proxy, args.session_key)
+    # First stdout line is the base URL, for scripts that started it with --port 0
+    print(server.url, flush=True)
+    print('Stub splunkd listening on {}{}'.format(
+        server.url, ' (proxy to {})'.format(args.proxy) if args.proxy else ''), file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if args.save_fixtures:
+            save_fixtures(args.save_fixtures, dict(load_fixtures(args.fixtures), **server.saved))
+
+
+if __name__ == '__main__':
+    main()